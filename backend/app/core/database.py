@@ -1,61 +1,281 @@
 """
 Database Connection and Session Management
+Engines and the MongoDB client are resolved on first use (or in the background
+from the app lifespan), never at import time, so importing this module does
+not wait on PostgreSQL or MongoDB.
 """
 
-from sqlalchemy import create_engine
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 import logging
-import os
 
 logger = logging.getLogger(__name__)
 
-# PostgreSQL / SQLite Setup
-db_url = settings.DATABASE_URL
+SQLITE_FALLBACK_URL = "sqlite:///./local_dev.db"
 
-# Fallback to SQLite for local development if PostgreSQL is unavailable
-if db_url.startswith("postgresql"):
-    try:
-        _test_engine = create_engine(db_url, pool_pre_ping=True)
-        with _test_engine.connect() as conn:
-            pass
-        engine = _test_engine
-        logger.info("Connected to PostgreSQL")
-    except Exception as e:
-        logger.warning(f"PostgreSQL unavailable ({e}), falling back to SQLite")
-        db_url = "sqlite:///./local_dev.db"
-        engine = create_engine(db_url, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(db_url, pool_pre_ping=True, echo=settings.DEBUG)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-# MongoDB Setup (optional - graceful fallback)
-mongodb = None
-try:
-    from pymongo import MongoClient
-    mongo_client = MongoClient(settings.MONGODB_URL, serverSelectionTimeoutMS=3000)
-    mongo_client.admin.command('ping')
-    mongodb = mongo_client[settings.MONGODB_DATABASE]
-    logger.info("Connected to MongoDB")
-except Exception as e:
-    logger.warning(f"MongoDB unavailable ({e}), running without MongoDB")
+
+def _engine_options(url: str) -> Dict:
+    """Pool sizing for server databases; SQLite keeps SQLAlchemy's defaults"""
+    options = {"pool_pre_ping": True, "echo": settings.DB_ECHO}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+def _async_url(url: str) -> str:
+    """Map a sync database URL onto its async driver (asyncpg / aiosqlite)"""
+    scheme, sep, rest = url.partition("://")
+    driver = {"postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+    return driver.get(scheme.split("+")[0], scheme) + sep + rest
+
+
+def _register_listeners():
+    """Attach the read-model and counter flush hooks before the first session opens"""
+    from app.services import lead_read_model, stats_service
+    lead_read_model.register_listeners()
+    stats_service.register_listeners()
+
+
+class DatabaseRegistry:
+    """Lazily resolved SQL engines and MongoDB handle, with background health probes"""
+
+    def __init__(self):
+        self.url: Optional[str] = None
+        self.engine: Optional[Engine] = None
+        self.async_engine: Optional[AsyncEngine] = None
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False)
+        self.async_session_factory: Optional[async_sessionmaker] = None
+        self.mongo_client = None
+        self.mongodb = None
+        self.health: Dict[str, Dict] = {
+            "database": {"status": "unknown"},
+            "mongodb": {"status": "unknown"},
+        }
+        self._lock = threading.RLock()
+        self._initialized = False
+        self._probe_task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Resolution
+    # ------------------------------------------------------------------
+
+    def _resolve_url(self) -> str:
+        url = settings.DATABASE_URL
+        if not url.startswith("postgresql"):
+            return url
+
+        # Fallback to SQLite for local development if PostgreSQL is unavailable
+        candidate = create_engine(
+            url,
+            **_engine_options(url),
+            connect_args={"connect_timeout": int(settings.DB_CONNECT_TIMEOUT)}
+        )
+        try:
+            with candidate.connect():
+                pass
+            self.engine = candidate
+            logger.info("Connected to PostgreSQL")
+            return url
+        except Exception as e:
+            candidate.dispose()
+            logger.warning(f"PostgreSQL unavailable ({e}), falling back to SQLite")
+            return SQLITE_FALLBACK_URL
+
+    def get_engine(self) -> Engine:
+        """Resolve the sync engine on first call; later calls are free"""
+        if self.engine is None:
+            with self._lock:
+                if self.engine is None:
+                    url = self._resolve_url()
+                    if self.engine is None:
+                        self.engine = create_engine(url, **_engine_options(url))
+                    self.url = url
+                    self.session_factory.configure(bind=self.engine)
+                    _register_listeners()
+        return self.engine
+
+    def get_async_engine(self) -> AsyncEngine:
+        """Create the async engine for the resolved database on first call"""
+        if self.async_engine is None:
+            self.get_engine()
+            with self._lock:
+                if self.async_engine is None:
+                    self.async_engine = create_async_engine(_async_url(self.url), **_engine_options(self.url))
+                    self.async_session_factory = async_sessionmaker(
+                        self.async_engine, autoflush=False, expire_on_commit=False
+                    )
+        return self.async_engine
+
+    def initialize(self):
+        """Resolve the engine and apply schema migrations once per process"""
+        if self._initialized:
+            return
+        with self._lock:
+            if not self._initialized:
+                from app.core.migrations import run_migrations
+                run_migrations(self.get_engine())
+                self._initialized = True
+                logger.info("Database initialized successfully")
+
+    async def ensure_initialized(self):
+        """initialize() without blocking the event loop"""
+        if not self._initialized:
+            await asyncio.to_thread(self.initialize)
+
+    def get_mongo_client(self):
+        """Create the MongoDB client (it connects lazily, so this never blocks)"""
+        if self.mongo_client is None:
+            with self._lock:
+                if self.mongo_client is None:
+                    from pymongo import MongoClient
+                    self.mongo_client = MongoClient(
+                        settings.MONGODB_URL,
+                        serverSelectionTimeoutMS=int(settings.MONGODB_TIMEOUT * 1000),
+                        connect=False
+                    )
+        return self.mongo_client
+
+    # ------------------------------------------------------------------
+    # Health probing
+    # ------------------------------------------------------------------
+
+    def _probe_database(self):
+        with self.get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    def _probe_mongodb(self):
+        self.get_mongo_client().admin.command("ping")
+
+    async def _probe(self, name: str, probe) -> bool:
+        start = time.perf_counter()
+        previous = self.health[name]["status"]
+        try:
+            await asyncio.to_thread(probe)
+            self.health[name] = {
+                "status": "up",
+                "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+                "checked_at": datetime.utcnow().isoformat(),
+            }
+            if previous != "up":
+                logger.info(f"{name} is up")
+            return True
+        except Exception as e:
+            self.health[name] = {
+                "status": "down",
+                "error": str(e),
+                "checked_at": datetime.utcnow().isoformat(),
+            }
+            if previous != "down":
+                logger.warning(f"{name} unavailable ({e})")
+            return False
+
+    async def probe_once(self):
+        """Probe SQL and MongoDB concurrently and update health"""
+        _, mongodb_up = await asyncio.gather(
+            self._probe("database", self._probe_database),
+            self._probe("mongodb", self._probe_mongodb),
+        )
+        self.health["database"]["backend"] = self.engine.dialect.name if self.engine else None
+        # MongoDB is optional - only hand it out while it answers
+        self.mongodb = self.get_mongo_client()[settings.MONGODB_DATABASE] if mongodb_up else None
+
+    async def _run(self):
+        try:
+            await self.ensure_initialized()
+        except Exception as e:
+            logger.error(f"Database initialization failed: {str(e)}")
+        while True:
+            try:
+                await self.probe_once()
+            except Exception as e:
+                logger.error(f"Database health probe error: {str(e)}")
+            await asyncio.sleep(settings.DB_HEALTH_CHECK_INTERVAL)
+
+    async def start(self):
+        """Resolve, initialize and probe in the background (called from the app lifespan)"""
+        if self._probe_task is None:
+            self._probe_task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            await asyncio.gather(self._probe_task, return_exceptions=True)
+            self._probe_task = None
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+            self.async_engine = None
+            self.async_session_factory = None
+        if self.mongo_client is not None:
+            self.mongo_client.close()
+            self.mongo_client = None
+            self.mongodb = None
+
+    def status(self) -> Dict:
+        return {"initialized": self._initialized, **self.health}
+
+
+_registry = DatabaseRegistry()
+
+def get_database_registry() -> DatabaseRegistry:
+    """Get the process-wide database registry"""
+    return _registry
+
+def get_engine() -> Engine:
+    """Get the sync engine, resolving it on first use"""
+    return _registry.get_engine()
+
+def SessionLocal() -> Session:
+    """New Session on the resolved database"""
+    _registry.get_engine()
+    return _registry.session_factory()
 
 def get_db():
     """Get database session"""
+    # Requests can arrive before the lifespan's background init has finished
+    _registry.initialize()
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+def get_async_engine() -> AsyncEngine:
+    """Get or create the async engine for the active database"""
+    return _registry.get_async_engine()
+
+def AsyncSessionLocal() -> AsyncSession:
+    """New AsyncSession bound to the async engine"""
+    _registry.get_async_engine()
+    return _registry.async_session_factory()
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Get async database session"""
+    await _registry.ensure_initialized()
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database initialized successfully")
+    """Initialize database tables (runs pending migrations)"""
+    _registry.initialize()
 
 def get_mongodb():
-    """Get MongoDB database"""
-    return mongodb
+    """Get MongoDB database, or None while MongoDB is unavailable or not yet probed"""
+    return _registry.mongodb
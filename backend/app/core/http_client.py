@@ -0,0 +1,144 @@
+"""
+Outbound HTTP Client Pool
+Long-lived, per-host keep-alive clients shared by the CRM and mail integrations
+(GoHighLevel, Trello, Airtable, Zoho). Started and closed by the app lifespan.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class _HostPool:
+    """One keep-alive client plus usage counters for a single origin."""
+
+    def __init__(self, origin: str):
+        self.origin = origin
+        self.client = httpx.AsyncClient(
+            http2=settings.HTTP_ENABLE_HTTP2 and HTTP2_AVAILABLE,
+            timeout=settings.HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_PER_HOST,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        # Gate requests ourselves so time spent queueing for a connection is measurable
+        self.slots = asyncio.Semaphore(settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+        self.in_use = 0
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def idle_connections(self) -> Optional[int]:
+        """Idle keep-alive connections, read from the httpcore pool when exposed."""
+        try:
+            pool = self.client._transport._pool
+            return sum(1 for conn in pool.connections if conn.is_idle())
+        except Exception:
+            return None
+
+    def stats(self) -> Dict:
+        return {
+            "in_use": self.in_use,
+            "idle": self.idle_connections(),
+            "requests": self.requests,
+            "avg_wait_ms": round(self.total_wait / self.requests * 1000, 3) if self.requests else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+class HTTPClientPool:
+    """Registry of per-host keep-alive clients."""
+
+    def __init__(self):
+        self._hosts: Dict[str, _HostPool] = {}
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _host_pool(self, url: str) -> _HostPool:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        host_pool = self._hosts.get(origin)
+        if host_pool is None:
+            host_pool = _HostPool(origin)
+            self._hosts[origin] = host_pool
+            logger.info(f"HTTP pool opened for {origin}")
+        return host_pool
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Mark the pool as accepting requests (called from the app lifespan)."""
+        self._closed = False
+        logger.info(
+            f"HTTP client pool ready (per-host limit={settings.HTTP_MAX_CONNECTIONS_PER_HOST}, "
+            f"http2={settings.HTTP_ENABLE_HTTP2 and HTTP2_AVAILABLE})"
+        )
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request over the shared keep-alive client for the URL's host."""
+        if self._closed:
+            raise RuntimeError("HTTP client pool is closed")
+
+        host_pool = self._host_pool(url)
+        queued_at = time.perf_counter()
+        async with host_pool.slots:
+            waited = time.perf_counter() - queued_at
+            host_pool.requests += 1
+            host_pool.total_wait += waited
+            host_pool.max_wait = max(host_pool.max_wait, waited)
+            host_pool.in_use += 1
+            try:
+                return await host_pool.client.request(method, url, **kwargs)
+            finally:
+                host_pool.in_use -= 1
+
+    def stats(self) -> Dict:
+        """Per-host pool statistics for sizing."""
+        return {
+            "http2": settings.HTTP_ENABLE_HTTP2 and HTTP2_AVAILABLE,
+            "max_connections_per_host": settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            "hosts": {origin: host_pool.stats() for origin, host_pool in self._hosts.items()},
+        }
+
+    async def close(self):
+        """Close every host client (called from the app lifespan)."""
+        self._closed = True
+        for host_pool in self._hosts.values():
+            await host_pool.client.aclose()
+        self._hosts.clear()
+        logger.info("HTTP client pool closed")
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_http_pool: Optional[HTTPClientPool] = None
+
+
+def get_http_pool() -> HTTPClientPool:
+    global _http_pool
+    if _http_pool is None:
+        _http_pool = HTTPClientPool()
+    return _http_pool
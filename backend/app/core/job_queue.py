@@ -0,0 +1,428 @@
+"""
+Durable Background Job Queue
+Redis-backed queue (REDIS_URL) with a SQLite fallback for local runs.
+Jobs are reserved with a visibility timeout, retried with exponential backoff
+and dead-lettered after JOB_MAX_ATTEMPTS.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict], Awaitable[None]]
+
+
+class QueueBackend(ABC):
+    """Abstract base class for job queue storage (Redis, SQLite)"""
+
+    name = "base"
+
+    @abstractmethod
+    async def enqueue(self, job: Dict, delay: float = 0) -> None:
+        """Store a job, due after delay seconds"""
+        pass
+
+    @abstractmethod
+    async def reserve(self, visibility_timeout: float) -> Optional[Dict]:
+        """Claim the next due job; it reappears if not acked before the timeout."""
+        pass
+
+    @abstractmethod
+    async def ack(self, job: Dict) -> None:
+        """Remove a finished job"""
+        pass
+
+    @abstractmethod
+    async def retry(self, job: Dict, delay: float, error: str) -> None:
+        """Put a failed job back, due after delay seconds"""
+        pass
+
+    @abstractmethod
+    async def dead_letter(self, job: Dict, error: str) -> None:
+        """Move a job that ran out of attempts to the dead-letter list"""
+        pass
+
+    @abstractmethod
+    async def stats(self) -> Dict:
+        """Queued, delayed, reserved and dead-lettered counts"""
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Redis backend
+# ---------------------------------------------------------------------------
+
+# Promote due delayed jobs and expired reservations, then pop one job and
+# mark it in-flight - all atomically so a crashed worker never loses a job.
+_RESERVE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, id in ipairs(due) do
+    redis.call('ZREM', KEYS[3], id)
+    redis.call('LPUSH', KEYS[1], id)
+end
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('LPUSH', KEYS[1], id)
+end
+local id = redis.call('RPOP', KEYS[1])
+if id then
+    redis.call('ZADD', KEYS[2], ARGV[2], id)
+end
+return id
+"""
+
+
+class RedisQueueBackend(QueueBackend):
+    """Lists + sorted sets: ready list, in-flight zset, delayed zset, dead list."""
+
+    name = "redis"
+
+    def __init__(self, client, prefix: str = "jobs"):
+        self.client = client
+        self.ready = f"{prefix}:ready"
+        self.processing = f"{prefix}:processing"
+        self.delayed = f"{prefix}:delayed"
+        self.dead = f"{prefix}:dead"
+        self.data = f"{prefix}:data"
+        self._reserve = client.register_script(_RESERVE_SCRIPT)
+
+    async def enqueue(self, job: Dict, delay: float = 0) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(self.data, job["id"], json.dumps(job))
+            if delay > 0:
+                pipe.zadd(self.delayed, {job["id"]: time.time() + delay})
+            else:
+                pipe.lpush(self.ready, job["id"])
+            await pipe.execute()
+
+    async def reserve(self, visibility_timeout: float) -> Optional[Dict]:
+        now = time.time()
+        job_id = await self._reserve(
+            keys=[self.ready, self.processing, self.delayed],
+            args=[now, now + visibility_timeout],
+        )
+        if not job_id:
+            return None
+        raw = await self.client.hget(self.data, job_id)
+        if raw is None:
+            await self.client.zrem(self.processing, job_id)
+            return None
+        job = json.loads(raw)
+        job["attempts"] += 1
+        await self.client.hset(self.data, job["id"], json.dumps(job))
+        return job
+
+    async def ack(self, job: Dict) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.processing, job["id"])
+            pipe.hdel(self.data, job["id"])
+            await pipe.execute()
+
+    async def retry(self, job: Dict, delay: float, error: str) -> None:
+        job["last_error"] = error
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.processing, job["id"])
+            pipe.hset(self.data, job["id"], json.dumps(job))
+            pipe.zadd(self.delayed, {job["id"]: time.time() + delay})
+            await pipe.execute()
+
+    async def dead_letter(self, job: Dict, error: str) -> None:
+        job["last_error"] = error
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.processing, job["id"])
+            pipe.hdel(self.data, job["id"])
+            pipe.lpush(self.dead, json.dumps(job))
+            await pipe.execute()
+
+    async def stats(self) -> Dict:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.llen(self.ready)
+            pipe.zcard(self.processing)
+            pipe.zcard(self.delayed)
+            pipe.llen(self.dead)
+            ready, processing, delayed, dead = await pipe.execute()
+        return {"ready": ready, "processing": processing, "delayed": delayed, "dead": dead}
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+# ---------------------------------------------------------------------------
+# SQLite backend
+# ---------------------------------------------------------------------------
+
+class SQLiteQueueBackend(QueueBackend):
+    """Single-table queue in a local SQLite file; blocking calls run in a thread."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = asyncio.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_queue (
+                id TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                status TEXT NOT NULL,
+                available_at REAL NOT NULL,
+                last_error TEXT
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_job_queue_status_available ON job_queue (status, available_at)"
+        )
+
+    async def _run(self, fn, *args):
+        async with self._lock:
+            return await asyncio.to_thread(fn, *args)
+
+    def _enqueue(self, job: Dict, delay: float) -> None:
+        self._conn.execute(
+            "INSERT INTO job_queue (id, body, status, available_at) VALUES (?, ?, 'ready', ?)",
+            (job["id"], json.dumps(job), time.time() + delay),
+        )
+
+    def _reserve(self, visibility_timeout: float) -> Optional[Dict]:
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired reservations are treated as ready again
+            row = self._conn.execute(
+                "SELECT id, body FROM job_queue "
+                "WHERE status IN ('ready', 'processing') AND available_at <= ? "
+                "ORDER BY available_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                self._conn.execute("COMMIT")
+                return None
+            job = json.loads(row[1])
+            job["attempts"] += 1
+            self._conn.execute(
+                "UPDATE job_queue SET status = 'processing', available_at = ?, body = ? WHERE id = ?",
+                (now + visibility_timeout, json.dumps(job), row[0]),
+            )
+            self._conn.execute("COMMIT")
+            return job
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _ack(self, job: Dict) -> None:
+        self._conn.execute("DELETE FROM job_queue WHERE id = ?", (job["id"],))
+
+    def _retry(self, job: Dict, delay: float, error: str) -> None:
+        self._conn.execute(
+            "UPDATE job_queue SET status = 'ready', available_at = ?, body = ?, last_error = ? WHERE id = ?",
+            (time.time() + delay, json.dumps(job), error, job["id"]),
+        )
+
+    def _dead_letter(self, job: Dict, error: str) -> None:
+        self._conn.execute(
+            "UPDATE job_queue SET status = 'dead', body = ?, last_error = ? WHERE id = ?",
+            (json.dumps(job), error, job["id"]),
+        )
+
+    def _stats(self) -> Dict:
+        now = time.time()
+        counts = {"ready": 0, "processing": 0, "delayed": 0, "dead": 0}
+        for status, due, count in self._conn.execute(
+            "SELECT status, available_at <= ?, COUNT(*) FROM job_queue GROUP BY 1, 2", (now,)
+        ):
+            if status == "ready":
+                counts["ready" if due else "delayed"] += count
+            elif status in counts:
+                counts[status] += count
+        return counts
+
+    async def enqueue(self, job: Dict, delay: float = 0) -> None:
+        await self._run(self._enqueue, job, delay)
+
+    async def reserve(self, visibility_timeout: float) -> Optional[Dict]:
+        return await self._run(self._reserve, visibility_timeout)
+
+    async def ack(self, job: Dict) -> None:
+        await self._run(self._ack, job)
+
+    async def retry(self, job: Dict, delay: float, error: str) -> None:
+        await self._run(self._retry, job, delay, error)
+
+    async def dead_letter(self, job: Dict, error: str) -> None:
+        await self._run(self._dead_letter, job, error)
+
+    async def stats(self) -> Dict:
+        return await self._run(self._stats)
+
+    async def close(self) -> None:
+        self._conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Queue + workers
+# ---------------------------------------------------------------------------
+
+class JobQueue:
+    """Job registry, enqueue API and in-process worker pool."""
+
+    def __init__(self):
+        self.handlers: Dict[str, JobHandler] = {}
+        self.backend: Optional[QueueBackend] = None
+        self._workers: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    def register(self, job_type: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator registering the coroutine that processes a job type."""
+        def decorator(handler: JobHandler) -> JobHandler:
+            self.handlers[job_type] = handler
+            return handler
+        return decorator
+
+    async def _connect(self) -> QueueBackend:
+        backend = settings.JOB_QUEUE_BACKEND.lower()
+        if backend in ("redis", "auto"):
+            try:
+                import redis.asyncio as aioredis
+                client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+                await client.ping()
+                logger.info("Job queue using Redis")
+                return RedisQueueBackend(client)
+            except Exception as e:
+                if backend == "redis":
+                    raise
+                logger.warning(f"Redis unavailable ({e}), job queue falling back to SQLite")
+        logger.info(f"Job queue using SQLite at {settings.JOB_QUEUE_SQLITE_PATH}")
+        return SQLiteQueueBackend(settings.JOB_QUEUE_SQLITE_PATH)
+
+    async def get_backend(self) -> QueueBackend:
+        if self.backend is None:
+            self.backend = await self._connect()
+        return self.backend
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: Dict,
+        delay: float = 0,
+        max_attempts: Optional[int] = None
+    ) -> str:
+        """
+        Enqueue a job
+
+        Args:
+            job_type: Registered handler name
+            payload: JSON-serializable job arguments
+            delay: Seconds before the job becomes visible
+            max_attempts: Attempts before dead-lettering (defaults to JOB_MAX_ATTEMPTS)
+
+        Returns:
+            Job ID
+        """
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": job_type,
+            "payload": payload,
+            "attempts": 0,
+            "max_attempts": max_attempts or settings.JOB_MAX_ATTEMPTS,
+            "enqueued_at": time.time(),
+        }
+        backend = await self.get_backend()
+        await backend.enqueue(job, delay)
+        return job["id"]
+
+    async def process_one(self) -> bool:
+        """Reserve and run a single job; returns False when the queue is idle."""
+        backend = await self.get_backend()
+        job = await backend.reserve(settings.JOB_VISIBILITY_TIMEOUT)
+        if job is None:
+            return False
+
+        if job["attempts"] > job["max_attempts"]:
+            # The last attempt's worker stopped mid-job (crash, redeploy); running it
+            # again could repeat side effects the job was limited to one attempt for
+            await backend.dead_letter(job, "Worker stopped during the final attempt")
+            logger.error(f"Job {job['id']} ({job['type']}) dead-lettered: worker stopped during the final attempt")
+            return True
+
+        handler = self.handlers.get(job["type"])
+        if handler is None:
+            await backend.dead_letter(job, f"No handler registered for {job['type']}")
+            return True
+
+        try:
+            await asyncio.wait_for(handler(job["payload"]), timeout=settings.JOB_VISIBILITY_TIMEOUT)
+            await backend.ack(job)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if job["attempts"] >= job["max_attempts"]:
+                logger.error(f"Job {job['id']} ({job['type']}) dead-lettered after {job['attempts']} attempts: {error}")
+                await backend.dead_letter(job, error)
+            else:
+                delay = settings.JOB_RETRY_BACKOFF * (2 ** (job["attempts"] - 1))
+                logger.warning(f"Job {job['id']} ({job['type']}) failed, retrying in {delay:.0f}s: {error}")
+                await backend.retry(job, delay, error)
+        return True
+
+    async def _worker(self, index: int):
+        while not self._stopping.is_set():
+            try:
+                if not await self.process_one():
+                    await asyncio.sleep(settings.JOB_POLL_INTERVAL)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {index} error: {str(e)}")
+                await asyncio.sleep(settings.JOB_POLL_INTERVAL)
+
+    async def start(self, workers: Optional[int] = None):
+        """Connect the backend and spawn worker tasks (called from the app lifespan)."""
+        await self.get_backend()
+        count = settings.JOB_WORKERS if workers is None else workers
+        self._stopping.clear()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(count)]
+        logger.info(f"Job queue started with {count} worker(s)")
+
+    async def stop(self):
+        """Stop workers; in-flight jobs reappear after their visibility timeout."""
+        self._stopping.set()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self.backend is not None:
+            await self.backend.close()
+            self.backend = None
+
+    async def stats(self) -> Dict:
+        backend = await self.get_backend()
+        return {"backend": backend.name, "workers": len(self._workers), **await backend.stats()}
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
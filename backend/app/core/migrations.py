@@ -0,0 +1,51 @@
+"""
+Schema Migrations
+Applies the Alembic revisions in backend/migrations on startup. Databases
+created by the old Base.metadata.create_all path have the baseline tables but
+no alembic_version; they are stamped at the baseline before upgrading.
+"""
+
+import logging
+import os
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BASELINE_REVISION = "0001"
+
+# Arbitrary constant shared by every replica racing to migrate PostgreSQL
+_PG_LOCK_KEY = 7301923
+
+
+def _alembic_config():
+    from alembic.config import Config
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return config
+
+
+def run_migrations(engine: Engine, revision: str = "head"):
+    """
+    Upgrade the database to a revision
+
+    Args:
+        engine: Engine for the target database
+        revision: Target revision (default: latest)
+    """
+    from alembic import command
+
+    config = _alembic_config()
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Serialize concurrent replicas; released when the transaction ends
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        if "customers" in tables and "alembic_version" not in tables:
+            logger.info(f"Stamping existing schema at baseline revision {BASELINE_REVISION}")
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
@@ -3,7 +3,7 @@ Database Models
 ORM models for SQLAlchemy
 """
 
-from sqlalchemy import Column, String, DateTime, Boolean, Float, Integer, Text, JSON, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, Boolean, Float, Integer, BigInteger, Text, JSON, ForeignKey, Enum, Index, text, func, literal_column
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -34,9 +34,24 @@ class TaskStatus(str, enum.Enum):
     COMPLETED = "completed"
     CLOSED = "closed"
 
+def email_key(column):
+    """Case-insensitive email match key (SQL side of lead_import.normalize_email)"""
+    return func.lower(func.trim(column))
+
+def phone_key(column):
+    """Phone match key without the usual separators (SQL side of lead_import.normalize_phone)"""
+    # Literals, not bound parameters, so the expression matches its index
+    for separator in (" ", "-", "(", ")", "."):
+        column = func.replace(column, literal_column(f"'{separator}'"), literal_column("''"))
+    return column
+
 class Customer(Base):
     """Customer model"""
     __tablename__ = "customers"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_customers_created_at_id", "created_at", "id"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String(255), nullable=False)
@@ -54,13 +69,27 @@ class Customer(Base):
     messages = relationship("Message", back_populates="customer")
     leads = relationship("Lead", back_populates="customer")
 
+# Lookups of stored contacts by normalized email / phone (bulk import)
+Index("ix_customers_email_key", email_key(Customer.email))
+Index("ix_customers_phone_key", phone_key(Customer.phone))
+
 class Lead(Base):
     """Lead model"""
     __tablename__ = "leads"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_leads_created_at_id", "created_at", "id"),
+        # Filtered list views, newest first
+        Index("ix_leads_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_leads_priority_created_at_id", "priority", "created_at", "id"),
+        Index("ix_leads_assigned_to_created_at_id", "assigned_to", "created_at", "id"),
+        # Customer -> leads lookups and joins
+        Index("ix_leads_customer_id", "customer_id"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     customer_id = Column(String, ForeignKey("customers.id"), nullable=False)
-    status = Column(Enum(LeadStatus), default=LeadStatus.NEW, index=True)
+    status = Column(Enum(LeadStatus), default=LeadStatus.NEW)
     quality_score = Column(Float, default=0.0)
     requirements = Column(Text)
     timeline = Column(String(100))
@@ -78,6 +107,12 @@ class Lead(Base):
 class Message(Base):
     """Message model"""
     __tablename__ = "messages"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_messages_created_at_id", "created_at", "id"),
+        # Customer history / per-customer message list
+        Index("ix_messages_customer_id_created_at_id", "customer_id", "created_at", "id"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     customer_id = Column(String, ForeignKey("customers.id"), nullable=False)
@@ -94,12 +129,19 @@ class Message(Base):
 class Task(Base):
     """Task model"""
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        # Filtered task lists, newest first
+        Index("ix_tasks_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tasks_assigned_to_created_at_id", "assigned_to", "created_at", "id"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     lead_id = Column(String, ForeignKey("leads.id"), nullable=True)
     title = Column(String(255), nullable=False)
     description = Column(Text)
-    status = Column(Enum(TaskStatus), default=TaskStatus.OPEN, index=True)
+    status = Column(Enum(TaskStatus), default=TaskStatus.OPEN)
     assigned_to = Column(String(255))
     task_type = Column(String(50))  # sales, support, technical
     priority = Column(String(20))  # high, medium, low
@@ -113,6 +155,12 @@ class Task(Base):
 class Booking(Base):
     """Appointment Booking model"""
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_bookings_scheduled_time_id", "scheduled_time", "id"),
+        # Per-customer booking list, in schedule order
+        Index("ix_bookings_customer_id_scheduled_time_id", "customer_id", "scheduled_time", "id"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     lead_id = Column(String, ForeignKey("leads.id"), nullable=True)
@@ -124,10 +172,25 @@ class Booking(Base):
     status = Column(String(20))  # scheduled, completed, cancelled
     notes = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    customer = relationship("Customer")
 
 class FollowUp(Base):
     """Follow-up Automation model"""
     __tablename__ = "follow_ups"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_follow_ups_scheduled_time_id", "scheduled_time", "id"),
+        # Due-row claims: only unsent rows, in dispatch order
+        Index(
+            "ix_follow_ups_unsent_scheduled_time_id", "scheduled_time", "id",
+            postgresql_where=text("sent = false"),
+            sqlite_where=text("sent = 0")
+        ),
+        # Enrollment / personalization lookups by lead and sequence
+        Index("ix_follow_ups_lead_id_message_type", "lead_id", "message_type"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     lead_id = Column(String, ForeignKey("leads.id"), nullable=False)
@@ -137,3 +200,70 @@ class FollowUp(Base):
     sent = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     sent_at = Column(DateTime)
+    claimed_until = Column(DateTime)  # dispatch lease: being sent by a worker until then
+    
+    # Relationships
+    lead = relationship("Lead")
+
+class LeadListing(Base):
+    """Read model: one row per lead, flattened with its customer's contact fields"""
+    __tablename__ = "lead_listings"
+    __table_args__ = (
+        # Same list views as leads, served without the customer join
+        Index("ix_lead_listings_created_at_lead_id", "created_at", "lead_id"),
+        Index("ix_lead_listings_status_created_at_lead_id", "status", "created_at", "lead_id"),
+        Index("ix_lead_listings_priority_created_at_lead_id", "priority", "created_at", "lead_id"),
+        Index("ix_lead_listings_assigned_to_created_at_lead_id", "assigned_to", "created_at", "lead_id"),
+        # Customer edits fan out to that customer's rows
+        Index("ix_lead_listings_customer_id", "customer_id"),
+    )
+    
+    lead_id = Column(String, primary_key=True)
+    customer_id = Column(String, nullable=False)
+    status = Column(Enum(LeadStatus))
+    quality_score = Column(Float)
+    requirements = Column(Text)
+    timeline = Column(String(100))
+    budget = Column(String(100))
+    priority = Column(String(20))
+    assigned_to = Column(String(255))
+    name = Column(String(255))
+    company = Column(String(255))
+    email = Column(String(255))
+    phone = Column(String(20))
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+class LeadCount(Base):
+    """Read model: number of leads per status / priority value"""
+    __tablename__ = "lead_counts"
+    
+    dimension = Column(String(20), primary_key=True)  # status, priority
+    value = Column(String(50), primary_key=True)  # "none" when unset
+    count = Column(Integer, nullable=False, default=0)
+
+class StatCounter(Base):
+    """Incremental counter behind /api/stats: an all-time total or one time bucket"""
+    __tablename__ = "stat_counters"
+    
+    metric = Column(String(50), primary_key=True)  # e.g. tasks.status, follow_ups.sent
+    dimension = Column(String(50), primary_key=True, default="")  # e.g. a status value
+    bucket = Column(DateTime, primary_key=True)  # bucket start; 1970-01-01 for totals
+    value = Column(BigInteger, nullable=False, default=0)
+
+class IdempotencyKey(Base):
+    """Webhook / API delivery seen before: in progress, or done with its stored response"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Purge of expired keys
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+    
+    key = Column(String(64), primary_key=True)  # sha256 of scope + client key
+    scope = Column(String(50), nullable=False)  # e.g. n8n.process, messages.receive
+    state = Column(String(20), nullable=False)  # pending, done
+    status_code = Column(Integer)
+    response = Column(Text)  # JSON body replayed to duplicates
+    locked_until = Column(DateTime)  # pending claim expiry (crashed handler)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
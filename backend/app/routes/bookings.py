@@ -3,11 +3,12 @@ Booking API Routes
 Appointment scheduling endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, joinedload
 from typing import List
 from datetime import datetime
 from app.core.database import get_db
+from app.utils.pagination import paginate, NEXT_CURSOR_HEADER
 from app.schemas import BookingCreate, BookingUpdate, BookingResponse
 from app.models import Booking, Lead, Customer
 import logging
@@ -18,13 +19,9 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def _booking_with_customer(booking, db):
-    """Build booking response with customer_name"""
-    customer_name = None
-    if booking.customer_id:
-        customer = db.query(Customer).filter(Customer.id == booking.customer_id).first()
-        if customer:
-            customer_name = customer.name
+def _booking_with_customer(booking):
+    """Build booking response with customer_name (eager-load Booking.customer for lists)"""
+    customer_name = booking.customer.name if booking.customer else None
     return {
         "id": booking.id,
         "lead_id": booking.lead_id,
@@ -63,7 +60,7 @@ async def create_booking(
         db.commit()
         db.refresh(db_booking)
 
-        return _booking_with_customer(db_booking, db)
+        return _booking_with_customer(db_booking)
     except HTTPException:
         raise
     except Exception as e:
@@ -73,15 +70,17 @@ async def create_booking(
 
 @router.get("/", response_model=List[BookingResponse])
 async def list_bookings(
+    response: Response,
     lead_id: str = Query(None),
     customer_id: str = Query(None),
     status: str = Query(None),
     limit: int = Query(50, le=100),
+    cursor: str = Query(None),
     db: Session = Depends(get_db)
 ):
     """List bookings with customer names"""
     try:
-        query = db.query(Booking)
+        query = db.query(Booking).options(joinedload(Booking.customer))
         
         if lead_id:
             query = query.filter(Booking.lead_id == lead_id)
@@ -90,9 +89,12 @@ async def list_bookings(
         if status:
             query = query.filter(Booking.status == status)
         
-        bookings = query.order_by(Booking.scheduled_time).limit(limit).all()
+        bookings, next_cursor = paginate(query, Booking.scheduled_time, Booking.id, limit, cursor, descending=False)
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor or ""
 
-        return [_booking_with_customer(b, db) for b in bookings]
+        return [_booking_with_customer(b) for b in bookings]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing bookings: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -136,7 +138,7 @@ async def update_booking(
         db.commit()
         db.refresh(booking)
 
-        return _booking_with_customer(booking, db)
+        return _booking_with_customer(booking)
     except HTTPException:
         raise
     except Exception as e:
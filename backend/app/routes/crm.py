@@ -3,10 +3,11 @@ CRM API Routes
 Customer and CRM data management endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
+from app.utils.pagination import paginate, NEXT_CURSOR_HEADER
 from app.schemas import CustomerCreate, CustomerUpdate, CustomerResponse
 from app.models import Customer, Message
 from app.services.crm_service import get_crm_service
@@ -47,9 +48,11 @@ async def create_customer(
 
 @router.get("/customers", response_model=List[CustomerResponse])
 async def list_customers(
+    response: Response,
     company: str = Query(None),
     business_type: str = Query(None),
     limit: int = Query(50, le=100),
+    cursor: str = Query(None),
     db: Session = Depends(get_db)
 ):
     """List customers with optional filtering"""
@@ -61,9 +64,12 @@ async def list_customers(
         if business_type:
             query = query.filter(Customer.business_type == business_type)
         
-        customers = query.order_by(Customer.created_at.desc()).limit(limit).all()
+        customers, next_cursor = paginate(query, Customer.created_at, Customer.id, limit, cursor)
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor or ""
         
         return customers
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing customers: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
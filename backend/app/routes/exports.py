@@ -0,0 +1,66 @@
+"""
+Export API Routes
+Streaming bulk exports (CSV, NDJSON, Parquet) of leads, customers, messages and follow-ups
+"""
+
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.services.data_export import DATASETS, Export, ExportUnavailable
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query("csv", description="csv, ndjson or parquet"),
+    since: datetime = Query(None, description="Rows at or after this time (created / scheduled)"),
+    until: datetime = Query(None, description="Rows before this time"),
+    status: str = Query(None),
+    priority: str = Query(None),
+    assigned_to: str = Query(None),
+    customer_id: str = Query(None),
+    lead_id: str = Query(None),
+    channel: str = Query(None),
+    direction: str = Query(None),
+    message_type: str = Query(None),
+    tier: str = Query(None),
+    sent: bool = Query(None)
+):
+    """
+    Stream a full export as a chunked download
+
+    Datasets: leads (with customer fields), customers, messages, follow_ups.
+    Rows are read through a server-side cursor in index order, so memory
+    use stays flat however many rows are exported.
+    """
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {dataset} (expected one of {', '.join(DATASETS)})")
+    filters = {
+        name: value for name, value in {
+            "status": status, "priority": priority, "assigned_to": assigned_to, "customer_id": customer_id,
+            "lead_id": lead_id, "channel": channel, "direction": direction, "message_type": message_type,
+            "tier": tier, "sent": sent,
+        }.items() if value is not None
+    }
+    try:
+        export = Export(dataset, format.lower(), filters, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error preparing {dataset} export: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        export.stream(),
+        media_type=export.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{export.filename}"',
+            "X-Accel-Buffering": "no"
+        }
+    )
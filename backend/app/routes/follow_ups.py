@@ -3,12 +3,17 @@ Follow-up API Routes
 Automated follow-up and engagement endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from app.core.database import get_db
-from app.schemas import FollowUpCreate, FollowUpResponse
+import json
+from app.core.database import get_db, get_async_db, SessionLocal
+from app.utils.pagination import paginate_async, NEXT_CURSOR_HEADER
+from app.schemas import FollowUpCreate, FollowUpResponse, SequenceEnrollmentRequest, FollowUpPersonalizeRequest
 from app.models import FollowUp
 from app.services.follow_up_service import get_follow_up_service
 import logging
@@ -50,26 +55,31 @@ async def schedule_follow_up(
 
 @router.get("/", response_model=List[FollowUpResponse])
 async def list_follow_ups(
+    response: Response,
     lead_id: str = Query(None),
     message_type: str = Query(None),
     sent: bool = Query(None),
     limit: int = Query(50, le=100),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List follow-ups with optional filtering"""
     try:
-        query = db.query(FollowUp)
+        stmt = select(FollowUp)
         
         if lead_id:
-            query = query.filter(FollowUp.lead_id == lead_id)
+            stmt = stmt.where(FollowUp.lead_id == lead_id)
         if message_type:
-            query = query.filter(FollowUp.message_type == message_type)
+            stmt = stmt.where(FollowUp.message_type == message_type)
         if sent is not None:
-            query = query.filter(FollowUp.sent == sent)
+            stmt = stmt.where(FollowUp.sent == sent)
         
-        follow_ups = query.order_by(FollowUp.scheduled_time).limit(limit).all()
+        follow_ups, next_cursor = await paginate_async(db, stmt, FollowUp.scheduled_time, FollowUp.id, limit, cursor, descending=False)
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor or ""
         
         return follow_ups
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing follow-ups: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -77,11 +87,11 @@ async def list_follow_ups(
 @router.get("/{follow_up_id}", response_model=FollowUpResponse)
 async def get_follow_up(
     follow_up_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get specific follow-up details"""
     try:
-        follow_up = db.query(FollowUp).filter(FollowUp.id == follow_up_id).first()
+        follow_up = await db.get(FollowUp, follow_up_id)
         
         if not follow_up:
             raise HTTPException(status_code=404, detail="Follow-up not found")
@@ -120,15 +130,103 @@ async def create_follow_up_sequence(
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/sequence/bulk")
+async def bulk_enroll_sequence(
+    request: SequenceEnrollmentRequest,
+    stream: bool = Query(False, description="Stream progress as NDJSON"),
+    db: Session = Depends(get_db)
+):
+    """
+    Enroll many leads into a follow-up sequence
+    
+    Leads come from lead_ids, or from the status/priority/assigned_to
+    filters. With stream=true, one progress line per committed batch is
+    returned as NDJSON (application/x-ndjson).
+    """
+    try:
+        follow_up_service = get_follow_up_service()
+        if request.sequence_type not in follow_up_service.follow_up_sequences:
+            raise HTTPException(status_code=400, detail=f"Unknown sequence type: {request.sequence_type}")
+        
+        filters = {
+            "status": request.status,
+            "priority": request.priority,
+            "assigned_to": request.assigned_to
+        }
+        
+        if stream:
+            async def progress():
+                # The request session closes before the stream finishes
+                stream_db = SessionLocal()
+                try:
+                    async for event in follow_up_service.iter_bulk_enrollment(
+                        stream_db,
+                        request.sequence_type,
+                        request.lead_ids,
+                        filters,
+                        request.skip_enrolled
+                    ):
+                        yield json.dumps(event) + "\n"
+                finally:
+                    stream_db.close()
+            
+            return StreamingResponse(progress(), media_type="application/x-ndjson")
+        
+        result = await follow_up_service.bulk_enroll_in_sequence(
+            db,
+            request.sequence_type,
+            request.lead_ids,
+            filters,
+            request.skip_enrolled
+        )
+        
+        if not result.get("success"):
+            raise HTTPException(status_code=400, detail=result.get("error"))
+        
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in bulk sequence enrollment: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/personalize")
+async def personalize_follow_ups(
+    request: FollowUpPersonalizeRequest,
+    db: Session = Depends(get_db)
+):
+    """Generate AI-personalized content for unsent follow-ups in batches"""
+    try:
+        follow_up_service = get_follow_up_service()
+        
+        result = await follow_up_service.personalize_follow_ups(
+            db,
+            follow_up_ids=request.follow_up_ids,
+            lead_ids=request.lead_ids,
+            message_type=request.message_type
+        )
+        
+        if not result.get("success"):
+            raise HTTPException(status_code=500, detail=result.get("error"))
+        
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error personalizing follow-ups: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/send/pending")
 async def send_pending_follow_ups(
+    max_chunks: Optional[int] = Query(None, ge=1),
     db: Session = Depends(get_db)
 ):
-    """Send all pending follow-ups that are due"""
+    """Send pending follow-ups that are due, in independently committed chunks"""
     try:
         follow_up_service = get_follow_up_service()
         
-        result = await follow_up_service.send_pending_follow_ups(db)
+        result = await follow_up_service.send_pending_follow_ups(db, max_chunks=max_chunks)
         
         return result
     except Exception as e:
@@ -138,22 +236,22 @@ async def send_pending_follow_ups(
 @router.delete("/{follow_up_id}")
 async def cancel_follow_up(
     follow_up_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Cancel follow-up"""
     try:
-        follow_up = db.query(FollowUp).filter(FollowUp.id == follow_up_id).first()
+        follow_up = await db.get(FollowUp, follow_up_id)
         
         if not follow_up:
             raise HTTPException(status_code=404, detail="Follow-up not found")
         
-        db.delete(follow_up)
-        db.commit()
+        await db.delete(follow_up)
+        await db.commit()
         
         return {"status": "cancelled", "follow_up_id": follow_up_id}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error cancelling follow-up: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
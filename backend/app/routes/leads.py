@@ -3,15 +3,24 @@ Lead API Routes
 Lead management and qualification endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_async_db, get_database_registry
+from app.utils.pagination import paginate_async, NEXT_CURSOR_HEADER
 from app.schemas import LeadCreate, LeadUpdate, LeadResponse, LeadQualificationRequest, LeadQualificationResponse
-from app.models import Lead, Customer
+from app.models import Lead, Customer, LeadListing
 from app.services.lead_service import get_qualification_service
+from app.services.lead_read_model import get_lead_summary, listing_response, rebuild
+from app.services.lead_import import FORMATS as IMPORT_FORMATS, import_leads
 from app.services.ai_service import get_ai_service
+import io
 import logging
+import tempfile
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +29,7 @@ router = APIRouter()
 @router.post("/", response_model=LeadResponse)
 async def create_lead(
     lead: LeadCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create new lead - optionally auto-creates customer from inline fields"""
     try:
@@ -30,9 +39,9 @@ async def create_lead(
         if not customer_id and (lead.name or lead.email):
             existing = None
             if lead.email:
-                existing = db.query(Customer).filter(Customer.email == lead.email).first()
+                existing = await db.scalar(select(Customer).where(Customer.email == lead.email).limit(1))
             if not existing and lead.phone:
-                existing = db.query(Customer).filter(Customer.phone == lead.phone).first()
+                existing = await db.scalar(select(Customer).where(Customer.phone == lead.phone).limit(1))
 
             if existing:
                 customer_id = existing.id
@@ -44,7 +53,7 @@ async def create_lead(
                     company=lead.company or "",
                 )
                 db.add(new_customer)
-                db.flush()
+                await db.flush()
                 customer_id = new_customer.id
 
         if not customer_id:
@@ -62,17 +71,17 @@ async def create_lead(
         }
         db_lead = Lead(**lead_data)
         db.add(db_lead)
-        db.commit()
-        db.refresh(db_lead)
+        await db.commit()
+        await db.refresh(db_lead)
 
         # Attach customer info for response
-        customer = db.query(Customer).filter(Customer.id == customer_id).first()
+        customer = await db.get(Customer, customer_id)
         return _lead_with_customer(db_lead, customer)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error creating lead: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -99,42 +108,96 @@ def _lead_with_customer(lead, customer=None):
 
 @router.get("/", response_model=List[LeadResponse])
 async def list_leads(
+    response: Response,
     status: str = Query(None),
     priority: str = Query(None),
     assigned_to: str = Query(None),
     limit: int = Query(50, le=100),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List leads with customer info"""
+    """List leads with customer info (served from the lead_listings read model)"""
     try:
-        query = db.query(Lead)
+        stmt = select(LeadListing)
         
         if status:
-            query = query.filter(Lead.status == status)
+            stmt = stmt.where(LeadListing.status == status)
         if priority:
-            query = query.filter(Lead.priority == priority)
+            stmt = stmt.where(LeadListing.priority == priority)
         if assigned_to:
-            query = query.filter(Lead.assigned_to == assigned_to)
+            stmt = stmt.where(LeadListing.assigned_to == assigned_to)
         
-        leads = query.order_by(Lead.created_at.desc()).limit(limit).all()
+        rows, next_cursor = await paginate_async(db, stmt, LeadListing.created_at, LeadListing.lead_id, limit, cursor)
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor or ""
 
-        result = []
-        for lead in leads:
-            customer = db.query(Customer).filter(Customer.id == lead.customer_id).first()
-            result.append(_lead_with_customer(lead, customer))
-        return result
+        return [listing_response(row) for row in rows]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing leads: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/summary")
+async def lead_summary(
+    recent: int = Query(5, ge=0, le=50),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Lead totals by status and priority plus the newest leads, for the dashboard"""
+    try:
+        return await get_lead_summary(db, recent)
+    except Exception as e:
+        logger.error(f"Error getting lead summary: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/summary/rebuild")
+async def rebuild_lead_summary(db: AsyncSession = Depends(get_async_db)):
+    """Recreate the lead read model from the leads and customers tables"""
+    try:
+        result = await db.run_sync(lambda session: rebuild(session.connection()))
+        await db.commit()
+        return result
+    except Exception as e:
+        logger.error(f"Error rebuilding lead read model: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/import")
+async def import_leads_file(
+    request: Request,
+    format: str = Query(None, description="csv or ndjson (default: from Content-Type)"),
+    batch_size: int = Query(None, ge=1, le=10000)
+):
+    """
+    Bulk import leads from a CSV (header row) or NDJSON request body
+    
+    Customers are matched on normalized email / phone and updated, leads
+    are created or updated per customer. The upload is spooled to disk past
+    IMPORT_SPOOL_SIZE and parsed row by row; the report lists row-level errors.
+    """
+    content_type = request.headers.get("content-type", "")
+    fmt = (format or ("ndjson" if "json" in content_type else "csv")).lower()
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
+    try:
+        await get_database_registry().ensure_initialized()
+        with tempfile.SpooledTemporaryFile(max_size=settings.IMPORT_SPOOL_SIZE) as spool:
+            async for chunk in request.stream():
+                spool.write(chunk)
+            spool.seek(0)
+            lines = io.TextIOWrapper(spool, encoding="utf-8-sig", errors="replace", newline="")
+            return await run_in_threadpool(import_leads, lines, fmt, batch_size)
+    except Exception as e:
+        logger.error(f"Error importing leads: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{lead_id}", response_model=LeadResponse)
 async def get_lead(
     lead_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get specific lead details"""
     try:
-        lead = db.query(Lead).filter(Lead.id == lead_id).first()
+        lead = await db.get(Lead, lead_id)
         
         if not lead:
             raise HTTPException(status_code=404, detail="Lead not found")
@@ -150,11 +213,11 @@ async def get_lead(
 async def update_lead(
     lead_id: str,
     lead_update: LeadUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update lead information"""
     try:
-        lead = db.query(Lead).filter(Lead.id == lead_id).first()
+        lead = await db.get(Lead, lead_id)
         
         if not lead:
             raise HTTPException(status_code=404, detail="Lead not found")
@@ -163,38 +226,38 @@ async def update_lead(
         for field, value in update_data.items():
             setattr(lead, field, value)
         
-        db.commit()
-        db.refresh(lead)
+        await db.commit()
+        await db.refresh(lead)
         
         return lead
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error updating lead: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{lead_id}")
 async def delete_lead(
     lead_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete lead"""
     try:
-        lead = db.query(Lead).filter(Lead.id == lead_id).first()
+        lead = await db.get(Lead, lead_id)
         
         if not lead:
             raise HTTPException(status_code=404, detail="Lead not found")
         
-        db.delete(lead)
-        db.commit()
+        await db.delete(lead)
+        await db.commit()
         
         return {"status": "deleted", "lead_id": lead_id}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error deleting lead: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{lead_id}/qualify", response_model=LeadQualificationResponse)
@@ -251,22 +314,22 @@ async def qualify_lead(
 async def assign_lead(
     lead_id: str,
     assigned_to: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Assign lead to team member"""
     try:
-        lead = db.query(Lead).filter(Lead.id == lead_id).first()
+        lead = await db.get(Lead, lead_id)
         
         if not lead:
             raise HTTPException(status_code=404, detail="Lead not found")
         
         lead.assigned_to = assigned_to
-        db.commit()
+        await db.commit()
         
         return {"status": "assigned", "lead_id": lead_id, "assigned_to": assigned_to}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error assigning lead: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
@@ -3,46 +3,78 @@ Message API Routes
 Handles incoming messages and AI responses
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.core.database import get_db
-from app.schemas import MessageCreate, MessageResponse, AIResponseRequest
+from app.core.database import get_async_db, AsyncSessionLocal
+from app.utils.pagination import paginate_async, NEXT_CURSOR_HEADER
+from app.schemas import MessageCreate, MessageResponse, AIResponseRequest, SMSBulkRequest, EmailBatchRequest
 from app.models import Message, Customer
 from app.services.ai_service import get_ai_service
+from app.services.response_cache import get_response_cache
 from app.services.crm_service import get_crm_service
 from app.services.message_channel import ChannelFactory
+from app.services.message_processing import PROCESS_INBOUND_MESSAGE
+from app.services.sms_engine import SEND_BULK_SMS, get_sms_engine
+from app.services.email_engine import SEND_EMAIL_BATCH, get_email_engine
+from app.services.idempotency import REPLAYED_HEADER, IdempotencyConflict, get_idempotency_store, request_key
+from app.core.job_queue import get_job_queue
+import json
 import logging
+from urllib.parse import parse_qsl
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/receive", response_model=MessageResponse)
+
+async def _get_or_create_customer(db: AsyncSession, email: str) -> Customer:
+    """Find the sending customer by email, creating a placeholder if new"""
+    customer = await db.scalar(select(Customer).where(Customer.email == email).limit(1))
+    
+    if not customer:
+        # Create new customer (basic info)
+        customer = Customer(
+            email=email,
+            name="New Customer",
+            phone="Pending"
+        )
+        db.add(customer)
+        await db.commit()
+    
+    return customer
+
+
+def _sse(data: dict, event: str = None) -> str:
+    """Format one server-sent event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@router.post("/receive", response_model=MessageResponse, status_code=202)
 async def receive_message(
     message: MessageCreate,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Receive incoming message from customer
     
-    Supports multiple channels: SMS, Email, Chat, Forms
+    Supports multiple channels: SMS, Email, Chat, Forms.
+    The message is stored and queued; the AI reply is generated and sent
+    by the job workers, so this returns 202 immediately.
+    
+    Deliveries are deduplicated on the Idempotency-Key header or the
+    provider's message_id: a retry gets the original response back with
+    Idempotent-Replayed: true and is not stored or queued again. Messages
+    carrying neither are always processed - the same text sent twice is
+    two messages.
     """
-    try:
-        # Get or create customer
-        customer = db.query(Customer).filter(
-            Customer.email == message.customer_id
-        ).first()
-        
-        if not customer:
-            # Create new customer (basic info)
-            customer = Customer(
-                email=message.customer_id,
-                name="New Customer",
-                phone="Pending"
-            )
-            db.add(customer)
-            db.commit()
+    async def process():
+        customer = await _get_or_create_customer(db, message.customer_id)
         
         # Save message to database
         crm_service = get_crm_service()
@@ -57,46 +89,113 @@ async def receive_message(
         if not save_result.get("success"):
             raise HTTPException(status_code=400, detail="Failed to save message")
         
-        # Generate AI response
-        ai_service = get_ai_service()
-        ai_result = await ai_service.process_message(
-            message.content,
-            context={
-                "company": customer.company,
-                "name": customer.name
-            }
+        # Hand AI processing and outbound delivery to the background workers
+        await get_job_queue().enqueue(
+            PROCESS_INBOUND_MESSAGE,
+            {"message_id": save_result["message_id"]}
         )
         
-        # Update message with AI response
-        msg = db.query(Message).filter(Message.id == save_result["message_id"]).first()
-        if msg:
-            msg.ai_response = ai_result.get("response")
-            msg.processed = True
-            db.commit()
-        
-        # Send AI response back to customer
-        if ai_result.get("success"):
-            await ChannelFactory.send_message(
-                channel=message.channel,
-                recipient=customer.email if message.channel == "email" else customer.phone,
-                content=ai_result.get("response")
-            )
+        msg = await db.get(Message, save_result["message_id"])
         
-        return MessageResponse(
+        return jsonable_encoder(MessageResponse(
             id=save_result["message_id"],
             customer_id=customer.id,
             channel=message.channel,
             direction=message.direction,
             content=message.content,
-            ai_response=ai_result.get("response"),
-            processed=True,
+            ai_response=None,
+            processed=False,
             created_at=msg.created_at if msg else None
+        ))
+    
+    try:
+        key, supplied = request_key(request.headers, message.model_dump(), message.message_id, content_hash=False)
+        if key is None:
+            return JSONResponse(await process(), status_code=202)
+        body, status_code, replayed = await get_idempotency_store().run(
+            "messages.receive", key, process, supplied=supplied, status_code=202
         )
+        return JSONResponse(body, status_code=status_code, headers={REPLAYED_HEADER: "true"} if replayed else None)
     
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": str(int(e.retry_after))})
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error receiving message: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/stream")
+async def stream_message(
+    message: MessageCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Receive a chat message and stream the AI reply as server-sent events
+    
+    Emits `data: {"token": ...}` events as the model produces them and a
+    final `event: done` carrying the message ID and full reply, which is
+    also stored on the Message row.
+    """
+    try:
+        customer = await _get_or_create_customer(db, message.customer_id)
+        
+        crm_service = get_crm_service()
+        save_result = await crm_service.save_customer_interaction(
+            db,
+            customer.id,
+            message.content,
+            message.channel,
+            message.direction
+        )
+        
+        if not save_result.get("success"):
+            raise HTTPException(status_code=400, detail="Failed to save message")
+        
+        message_id = save_result["message_id"]
+        context = {"company": customer.company, "name": customer.name}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error receiving streamed message: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def events():
+        ai_service = get_ai_service()
+        final = None
+        async for event in ai_service.stream_message(message.content, context=context):
+            if event["type"] == "token":
+                yield _sse({"token": event["content"]})
+            else:
+                final = event
+        
+        # Persist with a fresh session - the request session may already be closed
+        async with AsyncSessionLocal() as stream_db:
+            try:
+                msg = await stream_db.get(Message, message_id)
+                if msg:
+                    msg.ai_response = final.get("response")
+                    msg.processed = bool(final.get("success"))
+                    await stream_db.commit()
+            except Exception as e:
+                logger.error(f"Error saving streamed AI response: {str(e)}")
+                await stream_db.rollback()
+        
+        yield _sse({
+            "message_id": message_id,
+            "customer_id": customer.id,
+            "success": final.get("success", False),
+            "ai_response": final.get("response"),
+            "intent": final.get("intent"),
+            "cached": final.get("cached", False)
+        }, event="error" if final["type"] == "error" else "done")
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/ai-response")
 async def generate_ai_response(
     request: AIResponseRequest
@@ -117,28 +216,52 @@ async def generate_ai_response(
         logger.error(f"Error generating AI response: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/ai-cache/stats")
+async def ai_cache_stats():
+    """
+    AI response cache hit/miss metrics
+    """
+    return get_response_cache().stats()
+
+@router.post("/ai-cache/invalidate")
+async def invalidate_ai_cache():
+    """
+    Drop all cached AI replies (use after changing business settings)
+    """
+    try:
+        removed = await get_response_cache().invalidate()
+        return {"success": True, "removed": removed}
+    except Exception as e:
+        logger.error(f"Error invalidating AI cache: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/", response_model=List[MessageResponse])
 async def list_messages(
+    response: Response,
     customer_id: str = Query(None),
     channel: str = Query(None),
     limit: int = Query(50, le=100),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List messages with optional filtering
     """
     try:
-        query = db.query(Message)
+        stmt = select(Message)
         
         if customer_id:
-            query = query.filter(Message.customer_id == customer_id)
+            stmt = stmt.where(Message.customer_id == customer_id)
         
         if channel:
-            query = query.filter(Message.channel == channel)
+            stmt = stmt.where(Message.channel == channel)
         
-        messages = query.order_by(Message.created_at.desc()).limit(limit).all()
+        messages, next_cursor = await paginate_async(db, stmt, Message.created_at, Message.id, limit, cursor)
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor or ""
         
         return messages
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing messages: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -146,13 +269,13 @@ async def list_messages(
 @router.get("/{message_id}", response_model=MessageResponse)
 async def get_message(
     message_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get specific message details
     """
     try:
-        message = db.query(Message).filter(Message.id == message_id).first()
+        message = await db.get(Message, message_id)
         
         if not message:
             raise HTTPException(status_code=404, detail="Message not found")
@@ -164,12 +287,106 @@ async def get_message(
         logger.error(f"Error getting message: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/sms/bulk", status_code=202)
+async def send_bulk_sms(request: SMSBulkRequest):
+    """
+    Queue an SMS broadcast
+    
+    Sent by the job workers across the sender pool at TWILIO_MPS_PER_NUMBER
+    per number; delivery results arrive on /sms/status.
+    """
+    try:
+        messages = [message.model_dump() for message in request.messages]
+        if request.recipients:
+            if not request.content:
+                raise HTTPException(status_code=400, detail="content is required with recipients")
+            messages += [{"to": recipient, "body": request.content} for recipient in request.recipients]
+        if not messages:
+            raise HTTPException(status_code=400, detail="No messages to send")
+        
+        engine = get_sms_engine()
+        if not engine.configured:
+            raise HTTPException(status_code=503, detail="Twilio is not configured")
+        
+        # One single-attempt job per chunk: a retry would re-send what already went
+        # out, and a worker that stops mid-job strands only its chunk, which is
+        # dead-lettered with its messages
+        size = engine.chunk_size
+        job_queue = get_job_queue()
+        job_ids = [
+            await job_queue.enqueue(SEND_BULK_SMS, {"messages": messages[start:start + size]}, max_attempts=1)
+            for start in range(0, len(messages), size)
+        ]
+        return {
+            "success": True,
+            "job_ids": job_ids,
+            "queued": len(messages),
+            "estimated_seconds": round(len(messages) / engine.throughput, 1)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error queueing bulk SMS: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/sms/status", status_code=204)
+async def sms_status_callback(request: Request):
+    """Twilio delivery-status webhook (StatusCallback)"""
+    params = dict(parse_qsl((await request.body()).decode(), keep_blank_values=True))
+    engine = get_sms_engine()
+    if not engine.valid_signature(str(request.url), params, request.headers.get("X-Twilio-Signature")):
+        raise HTTPException(status_code=403, detail="Invalid Twilio signature")
+    engine.record_status(params)
+    return Response(status_code=204)
+
+@router.post("/email/batch", status_code=202)
+async def send_email_batch(request: EmailBatchRequest):
+    """
+    Queue an email campaign
+    
+    One template for every recipient; $placeholders in the subject and bodies
+    are filled from each recipient's fields. Sent by the job workers over the
+    SMTP connection pool or in SendGrid batches.
+    """
+    try:
+        if not request.recipients:
+            raise HTTPException(status_code=400, detail="No recipients")
+        missing = sum(1 for recipient in request.recipients if not recipient.get("email"))
+        if missing:
+            raise HTTPException(status_code=400, detail=f"{missing} recipients have no email")
+        
+        engine = get_email_engine()
+        if not engine.configured:
+            raise HTTPException(status_code=503, detail="Email is not configured")
+        
+        # Single-attempt jobs per chunk, as for /sms/bulk
+        size = engine.chunk_size
+        template = request.model_dump(exclude={"recipients"})
+        job_queue = get_job_queue()
+        job_ids = [
+            await job_queue.enqueue(
+                SEND_EMAIL_BATCH, {**template, "recipients": request.recipients[start:start + size]}, max_attempts=1
+            )
+            for start in range(0, len(request.recipients), size)
+        ]
+        return {
+            "success": True,
+            "job_ids": job_ids,
+            "queued": len(request.recipients),
+            "backend": engine.backend
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error queueing email batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/send/{channel}")
 async def send_message(
     channel: str,
     recipient: str,
     content: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Send message through specified channel
@@ -183,9 +400,9 @@ async def send_message(
         
         if result.get("success"):
             # Save outbound message to database
-            customer = db.query(Customer).filter(
-                Customer.email == recipient
-            ).first()
+            customer = await db.scalar(
+                select(Customer).where(Customer.email == recipient).limit(1)
+            )
             
             if customer:
                 message = Message(
@@ -197,7 +414,7 @@ async def send_message(
                     processed=True
                 )
                 db.add(message)
-                db.commit()
+                await db.commit()
         
         return result
     except Exception as e:
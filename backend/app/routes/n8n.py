@@ -4,12 +4,16 @@ General purpose webhook handler for n8n automations
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.services.crm_service import get_crm_service
 from app.services.ai_service import get_ai_service
-from app.models import Customer, Lead, Message
+from app.services.idempotency import REPLAYED_HEADER, IdempotencyConflict, get_idempotency_store, request_key
+from app.models import Customer, Lead, LeadStatus, Message
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,59 +23,75 @@ router = APIRouter()
 @router.post("/process")
 async def process_n8n_webhook(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Handle generalized intake from n8n.
-    Standardized payload: { "trigger": "form", "data": {...}, "customer": {...} }
+    Standardized payload: { "trigger": "form", "data": {...}, "customer": {...}, "idempotency_key": "..." }
+    
+    Retries of the same delivery (same Idempotency-Key header or body
+    idempotency_key, else identical payload) replay the first response
+    instead of creating another lead and re-running the AI analysis.
     """
     try:
         data = await request.json()
         logger.info(f"Received n8n webhook: {data.get('trigger', 'unknown')}")
         
-        trigger_type = data.get("trigger", "general")
-        payload = data.get("data", {})
-        customer_info = data.get("customer", {})
-        
-        # 1. Handle Lead Ingestion
-        if trigger_type == "lead" or trigger_type == "form":
-            email = customer_info.get("email")
-            if not email:
-                return {"success": False, "error": "Email required for lead ingestion"}
+        async def process():
+            trigger_type = data.get("trigger", "general")
+            payload = data.get("data", {})
+            customer_info = data.get("customer", {})
             
-            customer = db.query(Customer).filter(Customer.email == email).first()
-            if not customer:
-                customer = Customer(
-                    email=email,
-                    name=customer_info.get("name", "New Lead"),
-                    phone=customer_info.get("phone", "Pending"),
-                    company=customer_info.get("company", "")
+            # 1. Handle Lead Ingestion
+            if trigger_type == "lead" or trigger_type == "form":
+                email = customer_info.get("email")
+                if not email:
+                    return {"success": False, "error": "Email required for lead ingestion"}
+                
+                customer = await db.scalar(select(Customer).where(Customer.email == email).limit(1))
+                if not customer:
+                    customer = Customer(
+                        email=email,
+                        name=customer_info.get("name", "New Lead"),
+                        phone=customer_info.get("phone", "Pending"),
+                        company=customer_info.get("company", "")
+                    )
+                    db.add(customer)
+                    await db.flush()
+                
+                # Create Lead record (Lead has no source column; keep it in the notes)
+                lead = Lead(
+                    customer_id=customer.id,
+                    status=LeadStatus.NEW,
+                    notes=f"Source: {data.get('source', 'n8n_webhook')}"
                 )
-                db.add(customer)
-                db.flush()
-            
-            # Create Lead record
-            lead = Lead(
-                customer_id=customer.id,
-                status="new",
-                source=data.get("source", "n8n_webhook")
-            )
-            db.add(lead)
-            db.commit()
-            
-            # 2. Trigger AI Analysis (Optional)
-            ai_service = get_ai_service()
-            analysis = await ai_service.qualify_lead(lead.id, str(payload))
-            
-            return {
-                "success": True, 
-                "lead_id": lead.id, 
-                "customer_id": customer.id,
-                "ai_analysis": analysis
-            }
-            
-        return {"success": True, "message": f"Trigger {trigger_type} acknowledged"}
+                db.add(lead)
+                await db.commit()
+                
+                # 2. Trigger AI Analysis (Optional)
+                ai_service = get_ai_service()
+                analysis = await ai_service.qualify_lead(
+                    {"name": customer.name, "company": customer.company, "business_type": customer.business_type},
+                    [{"role": "user", "content": str(payload)}]
+                )
+                
+                return jsonable_encoder({
+                    "success": True, 
+                    "lead_id": lead.id, 
+                    "customer_id": customer.id,
+                    "ai_analysis": analysis
+                })
+                
+            return {"success": True, "message": f"Trigger {trigger_type} acknowledged"}
+        
+        key, supplied = request_key(request.headers, data, data.get("idempotency_key"))
+        body, status_code, replayed = await get_idempotency_store().run(
+            "n8n.process", key, process, supplied=supplied
+        )
+        return JSONResponse(body, status_code=status_code, headers={REPLAYED_HEADER: "true"} if replayed else None)
         
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": str(int(e.retry_after))})
     except Exception as e:
         logger.error(f"Error processing n8n webhook: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -5,9 +5,10 @@ Handles lead scoring, routing, and intelligent follow-ups
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
-from app.services.openclaw_agent import openclaw_agent
+from app.services.openclaw_agent import get_openclaw_agent
 from app.core.database import get_db
 from sqlalchemy.orm import Session
 import logging
@@ -136,6 +137,7 @@ async def score_lead(request: LeadScoreRequest):
     Returns a score (0-100) and ranking (A-F)
     """
     try:
+        openclaw_agent = get_openclaw_agent()
         logger.info(f"Scoring lead: {request.id}")
         
         result = await openclaw_agent.score_lead(request.dict())
@@ -165,6 +167,7 @@ async def route_lead(request: LeadRoutingRequest):
     Returns assigned team member information
     """
     try:
+        openclaw_agent = get_openclaw_agent()
         logger.info(f"Routing lead: {request.lead.id}")
         
         result = await openclaw_agent.route_lead(
@@ -193,6 +196,7 @@ async def generate_followup(request: FollowupRequest):
     that increases conversion probability
     """
     try:
+        openclaw_agent = get_openclaw_agent()
         logger.info(f"Generating follow-up for lead: {request.id}")
         
         result = await openclaw_agent.generate_followup(
@@ -213,24 +217,36 @@ async def generate_followup(request: FollowupRequest):
 
 
 @router.post("/batch-score")
-async def batch_score_leads(leads: List[LeadScoreRequest]):
+async def batch_score_leads(
+    leads: List[LeadScoreRequest],
+    stream: bool = Query(False, description="Stream results as NDJSON")
+):
     """
     Score multiple leads in batch
     
-    More efficient for processing large numbers of leads
+    Scores are computed in one vectorized pass and persisted to S3 as a
+    single object. With stream=true, results are returned as NDJSON
+    (application/x-ndjson), one chunk at a time, for very large batches.
     """
     try:
+        openclaw_agent = get_openclaw_agent()
         logger.info(f"Batch scoring {len(leads)} leads")
         
-        results = []
-        for lead_data in leads:
-            result = await openclaw_agent.score_lead(lead_data.dict())
-            results.append(result)
+        lead_dicts = [lead_data.dict() for lead_data in leads]
+        
+        if stream:
+            return StreamingResponse(
+                openclaw_agent.stream_batch_scores(lead_dicts),
+                media_type="application/x-ndjson"
+            )
+        
+        result = await openclaw_agent.score_leads_batch(lead_dicts)
         
         return {
+            "batch_id": result["batch_id"],
             "total": len(leads),
-            "processed": len(results),
-            "scores": results
+            "processed": len(result["scores"]),
+            "scores": result["scores"]
         }
     
     except Exception as e:
@@ -250,6 +266,7 @@ async def get_agent_status():
     - AWS S3 integration status
     """
     try:
+        openclaw_agent = get_openclaw_agent()
         logger.info("Fetching agent status")
         
         status = await openclaw_agent.get_agent_status()
@@ -274,6 +291,7 @@ async def agent_health_check():
     Verifies agent is running and responsive
     """
     try:
+        openclaw_agent = get_openclaw_agent()
         status = await openclaw_agent.get_agent_status()
         
         return {
@@ -301,9 +319,10 @@ async def save_data_to_s3(
     Useful for persisting agent decisions and analysis
     """
     try:
+        openclaw_agent = get_openclaw_agent()
         logger.info(f"Saving data to S3: {key}")
         
-        success = await openclaw_agent._save_to_s3(key, data)
+        success = await openclaw_agent.store.put(key, data)
         
         return {
             "success": success,
@@ -324,6 +343,7 @@ async def load_data_from_s3(key: str):
     Retrieves previously saved agent data
     """
     try:
+        openclaw_agent = get_openclaw_agent()
         logger.info(f"Loading data from S3: {key}")
         
         data = await openclaw_agent.load_from_s3(key)
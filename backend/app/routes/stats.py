@@ -0,0 +1,55 @@
+"""
+Stats API Routes
+Dashboard totals and chart series served from incremental counters
+"""
+
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.services.stats_service import get_stats_service
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/")
+async def get_stats(
+    upcoming_days: int = Query(7, ge=1, le=90),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Leads and tasks by status, bookings per day, follow-up results and AI token usage"""
+    try:
+        return await get_stats_service().get_stats(db, upcoming_days)
+    except Exception as e:
+        logger.error(f"Error getting stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/series")
+async def get_series(
+    metric: str = Query(..., description="leads.created, bookings.scheduled, follow_ups.sent, follow_ups.failed, ai.tokens, sms.status"),
+    interval: str = Query("day", description="hour or day"),
+    start: datetime = Query(None),
+    end: datetime = Query(None),
+    dimension: str = Query("", description="e.g. prompt / completion for ai.tokens, delivered / failed for sms.status"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Time-bucketed counts for dashboard charts"""
+    try:
+        return await get_stats_service().get_series(db, metric, interval, start, end, dimension)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting stats series: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/reconcile")
+async def reconcile_stats():
+    """Recount current-state counters from the source tables now"""
+    try:
+        return await asyncio.to_thread(get_stats_service().reconcile)
+    except Exception as e:
+        logger.error(f"Error reconciling stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -3,10 +3,11 @@ Task API Routes
 Task management and routing endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
+from app.utils.pagination import paginate, NEXT_CURSOR_HEADER
 from app.schemas import TaskCreate, TaskUpdate, TaskResponse
 from app.models import Task, Lead
 from app.services.task_service import get_task_routing_service
@@ -50,11 +51,13 @@ async def create_task(
 
 @router.get("/", response_model=List[TaskResponse])
 async def list_tasks(
+    response: Response,
     status: str = Query(None),
     assigned_to: str = Query(None),
     task_type: str = Query(None),
     priority: str = Query(None),
     limit: int = Query(50, le=100),
+    cursor: str = Query(None),
     db: Session = Depends(get_db)
 ):
     """List tasks with optional filtering"""
@@ -70,9 +73,12 @@ async def list_tasks(
         if priority:
             query = query.filter(Task.priority == priority)
         
-        tasks = query.order_by(Task.created_at.desc()).limit(limit).all()
+        tasks, next_cursor = paginate(query, Task.created_at, Task.id, limit, cursor)
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor or ""
         
         return tasks
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing tasks: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
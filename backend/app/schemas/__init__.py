@@ -3,7 +3,7 @@ Pydantic Schemas for request/response validation
 """
 
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
 # Customer Schemas
@@ -86,6 +86,8 @@ class MessageBase(BaseModel):
 class MessageCreate(MessageBase):
     customer_id: str
     direction: str = "inbound"
+    # Provider message ID (e.g. Twilio MessageSid); redeliveries carrying it are deduplicated
+    message_id: Optional[str] = None
 
 class MessageResponse(MessageBase):
     id: str
@@ -98,6 +100,24 @@ class MessageResponse(MessageBase):
     class Config:
         from_attributes = True
 
+class SMSMessage(BaseModel):
+    to: str
+    body: str
+    media_url: Optional[str] = None
+
+class SMSBulkRequest(BaseModel):
+    # Either one body for every recipient, or per-recipient messages
+    content: Optional[str] = None
+    recipients: List[str] = []
+    messages: List[SMSMessage] = []
+
+class EmailBatchRequest(BaseModel):
+    # $placeholders are filled from each recipient's fields
+    subject: str
+    text: str
+    html: Optional[str] = None
+    recipients: List[Dict[str, Any]]
+
 # Task Schemas
 class TaskBase(BaseModel):
     title: str
@@ -184,6 +204,20 @@ class FollowUpResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class SequenceEnrollmentRequest(BaseModel):
+    sequence_type: str
+    lead_ids: Optional[List[str]] = None
+    # Lead filters, used when lead_ids is not given
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    assigned_to: Optional[str] = None
+    skip_enrolled: bool = True
+
+class FollowUpPersonalizeRequest(BaseModel):
+    follow_up_ids: Optional[List[str]] = None
+    lead_ids: Optional[List[str]] = None
+    message_type: Optional[str] = None
+
 # AI Response Schemas
 class LeadQualificationRequest(BaseModel):
     customer_id: str
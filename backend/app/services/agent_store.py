@@ -0,0 +1,347 @@
+"""
+Openclaw Agent Persistence Store
+Buffers agent decisions in memory and flushes them (by size or time window)
+as gzip-compressed NDJSON batches. Each batch gets a small manifest mapping
+its keys to line numbers, so any worker can load a decision once the cache
+has moved on by searching recent manifests. Blocking I/O runs in a
+dedicated executor.
+Backends: AWS S3, or a local directory for offline testing.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class S3StoreBackend:
+    """Blocking S3 object I/O (called from the store's executor)."""
+
+    name = "s3"
+
+    def __init__(self, bucket: str):
+        import boto3
+        self.bucket = bucket
+        self.client = boto3.client(
+            's3',
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION
+        )
+        logger.info(f"AWS S3 client initialized for bucket: {bucket}")
+
+    def write(self, key: str, body: bytes, content_type: str, content_encoding: Optional[str] = None):
+        extra = {"ContentEncoding": content_encoding} if content_encoding else {}
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=body, ContentType=content_type, **extra)
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=key)
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return response['Body'].read()
+
+    def list(self, prefix: str) -> List[str]:
+        paginator = self.client.get_paginator('list_objects_v2')
+        return [
+            item['Key']
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix)
+            for item in page.get('Contents', [])
+        ]
+
+
+class FilesystemStoreBackend:
+    """Local directory mirror of the S3 key layout."""
+
+    name = "filesystem"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+        logger.info(f"Agent store using local directory: {self.root}")
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid key: {key}")
+        return path
+
+    def write(self, key: str, body: bytes, content_type: str, content_encoding: Optional[str] = None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def list(self, prefix: str) -> List[str]:
+        """Keys directly under a prefix ending in '/'"""
+        try:
+            names = os.listdir(self._path(prefix))
+        except FileNotFoundError:
+            return []
+        return [prefix + name for name in names if not name.endswith(".tmp")]
+
+
+class AgentStore:
+    """Buffered, batched writer with a read-through LRU cache."""
+
+    def __init__(self):
+        self.backend = self._create_backend()
+        self.batch_size = settings.AGENT_STORE_BATCH_SIZE
+        self.flush_interval = settings.AGENT_STORE_FLUSH_INTERVAL
+        self.cache_size = settings.AGENT_STORE_CACHE_SIZE
+        self.cache_ttl = settings.AGENT_STORE_CACHE_TTL
+        self.max_buffer = settings.AGENT_STORE_MAX_BUFFER
+        self.lookup_days = settings.AGENT_STORE_LOOKUP_DAYS
+        self.dropped = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.AGENT_STORE_IO_WORKERS, thread_name_prefix="agent-store"
+        )
+        self._buffer: List[Dict[str, Any]] = []
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._flush_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _create_backend(self):
+        backend = settings.AGENT_STORE_BACKEND.lower()
+        has_aws = bool(settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY)
+        if backend == "s3" or (backend == "auto" and has_aws):
+            try:
+                return S3StoreBackend(settings.AWS_S3_BUCKET)
+            except Exception as e:
+                logger.error(f"Failed to initialize S3 client: {str(e)}")
+                if backend == "s3":
+                    return None
+        if backend in ("filesystem", "auto"):
+            return FilesystemStoreBackend(settings.AGENT_STORE_PATH)
+        return None
+
+    async def _io(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _cache_put(self, key: str, data: Dict[str, Any]):
+        self._cache[key] = (time.monotonic() + self.cache_ttl, data)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return data
+
+    @staticmethod
+    def _encode_ndjson(records: List[Dict[str, Any]]) -> bytes:
+        return gzip.compress("".join(json.dumps(record) + "\n" for record in records).encode("utf-8"))
+
+    @staticmethod
+    def _decode(body: bytes) -> Dict[str, Any]:
+        """A JSON object, or {"records": [...]} for a gzip NDJSON object (put_records)"""
+        if body[:2] == b"\x1f\x8b":
+            lines = gzip.decompress(body).decode("utf-8").splitlines()
+            return {"records": [json.loads(line) for line in lines if line]}
+        return json.loads(body.decode("utf-8"))
+
+    def _find_batched(self, key: str) -> Optional[Dict[str, Any]]:
+        """Latest decision under key in the last lookup_days of flushes (blocking; newest first)"""
+        today = datetime.utcnow()
+        for days in range(self.lookup_days):
+            day = today - timedelta(days=days)
+            for manifest_key in sorted(self.backend.list(f"decisions/index/{day:%Y/%m/%d}/"), reverse=True):
+                body = self.backend.read(manifest_key)
+                if body is None:
+                    continue
+                manifest = json.loads(body.decode("utf-8"))
+                line = manifest["keys"].get(key)
+                if line is None:
+                    continue
+                batch = self.backend.read(manifest["batch"])
+                if batch is None:
+                    continue
+                return json.loads(gzip.decompress(batch).decode("utf-8").splitlines()[line])["data"]
+        return None
+
+    def _trim_buffer(self):
+        """Drop the oldest decisions while the backend is failing and the buffer is full"""
+        excess = len(self._buffer) - self.max_buffer
+        if excess > 0:
+            del self._buffer[:excess]
+            self.dropped += excess
+            logger.warning(f"Agent store buffer full, dropped {excess} oldest decisions")
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing agent store: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    async def record(self, key: str, data: Dict[str, Any]) -> bool:
+        """Buffer an agent decision; it is written with the next batch."""
+        if not self.enabled:
+            logger.warning("Agent store not available, skipping save")
+            return False
+
+        self._buffer.append({"key": key, "recorded_at": datetime.utcnow().isoformat(), "data": data})
+        self._trim_buffer()
+        self._cache_put(key, data)
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+        return True
+
+    async def flush(self) -> int:
+        """
+        Write buffered decisions as one compressed NDJSON object plus its
+        manifest (key -> line of the key's latest decision); returns records written.
+        """
+        async with self._flush_lock:
+            if not self._buffer or not self.enabled:
+                return 0
+            batch, self._buffer = self._buffer, []
+
+            now = datetime.utcnow()
+            name = f"{now:%Y/%m/%d}/{now:%H%M%S}-{uuid.uuid4().hex[:8]}"
+            key = f"decisions/{name}.ndjson.gz"
+            manifest = {"batch": key, "keys": {record["key"]: line for line, record in enumerate(batch)}}
+            try:
+                await self._io(self.backend.write, key, self._encode_ndjson(batch), "application/x-ndjson", "gzip")
+                # Written second: a manifest only ever points at a complete batch
+                await self._io(
+                    self.backend.write, f"decisions/index/{name}.json", json.dumps(manifest).encode("utf-8"), "application/json"
+                )
+                logger.info(f"Flushed {len(batch)} agent decisions to {key} ({len(manifest['keys'])} keys)")
+                return len(batch)
+            except Exception as e:
+                # Put the batch back so the next flush retries it (the writes are idempotent)
+                self._buffer = batch + self._buffer
+                self._trim_buffer()
+                logger.error(f"Error flushing agent decisions: {str(e)}")
+                return 0
+
+    async def put(self, key: str, data: Dict[str, Any]) -> bool:
+        """Write a single JSON object immediately."""
+        if not self.enabled:
+            logger.warning("Agent store not available, skipping save")
+            return False
+        try:
+            await self._io(self.backend.write, key, json.dumps(data, indent=2).encode("utf-8"), "application/json")
+            self._cache_put(key, data)
+            logger.info(f"Saved data to agent store: {key}")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving to agent store: {str(e)}")
+            return False
+
+    async def put_records(self, key: str, records: List[Dict[str, Any]]) -> bool:
+        """Write a pre-batched list of records as one compressed NDJSON object."""
+        if not self.enabled:
+            logger.warning("Agent store not available, skipping save")
+            return False
+        try:
+            await self._io(self.backend.write, key, self._encode_ndjson(records), "application/x-ndjson", "gzip")
+            logger.info(f"Saved {len(records)} records to agent store: {key}")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving batch to agent store: {str(e)}")
+            return False
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read-through load: the cache (including buffered decisions), then the
+        key's own object (put / put_records), then recent flush manifests.
+        """
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        if not self.enabled:
+            logger.warning("Agent store not available, skipping load")
+            return None
+        try:
+            body = await self._io(self.backend.read, key)
+            if body is not None:
+                data = self._decode(body)
+            else:
+                data = await self._io(self._find_batched, key)
+            if data is None:
+                return None
+            self._cache_put(key, data)
+            logger.info(f"Loaded data from agent store: {key}")
+            return data
+        except Exception as e:
+            logger.error(f"Error loading from agent store: {str(e)}")
+            return None
+
+    async def start(self):
+        """Start the time-window flusher (called from the app lifespan)."""
+        if self._flusher is None and self.enabled:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def close(self):
+        """Flush remaining decisions and stop the executor."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name if self.backend else None,
+            "buffered": len(self._buffer),
+            "dropped": self.dropped,
+            "cached": len(self._cache),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_agent_store: Optional[AgentStore] = None
+
+
+def get_agent_store() -> AgentStore:
+    global _agent_store
+    if _agent_store is None:
+        _agent_store = AgentStore()
+    return _agent_store
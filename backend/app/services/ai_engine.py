@@ -0,0 +1,185 @@
+"""
+AI Inference Engine
+Non-blocking chat completion client shared by every AI caller in the process.
+Wraps AsyncOpenAI with a pooled HTTP transport, per-model concurrency limits
+and per-call timeouts.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_model_limits(raw: str) -> Dict[str, int]:
+    """Parse 'gpt-4=4,gpt-3.5-turbo=16' into a model -> limit mapping."""
+    limits: Dict[str, int] = {}
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        model, _, value = item.partition("=")
+        try:
+            limits[model.strip()] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"Ignoring invalid AI concurrency entry: {item!r}")
+    return limits
+
+
+class AIEngine:
+    """Async chat completion engine with connection pooling and concurrency limits."""
+
+    def __init__(self):
+        self.base_url = settings.AI_BASE_URL or None
+        self.timeout = settings.AI_REQUEST_TIMEOUT
+        self.default_concurrency = max(1, settings.AI_MAX_CONCURRENCY)
+        self.model_concurrency = _parse_model_limits(settings.AI_MODEL_CONCURRENCY)
+        self._client: Optional["AsyncOpenAI"] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        # (prompt|completion, hour) -> tokens, drained into /api/stats counters
+        self._usage: Counter = Counter()
+
+        if self.base_url:
+            logger.info(f"AI engine using custom endpoint: {self.base_url}")
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @property
+    def client(self) -> "AsyncOpenAI":
+        if self._client is None:
+            # Imported here so processes that never call the model skip the SDK
+            from openai import AsyncOpenAI
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.AI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.AI_MAX_CONNECTIONS,
+                ),
+                timeout=self.timeout,
+            )
+            self._client = AsyncOpenAI(
+                # The stub server accepts any key; the SDK refuses an empty one.
+                api_key=settings.OPENAI_API_KEY or "stub",
+                base_url=self.base_url,
+                timeout=self.timeout,
+                max_retries=settings.AI_MAX_RETRIES,
+                http_client=self._http_client,
+            )
+        return self._client
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(model)
+        if sem is None:
+            limit = self.model_concurrency.get(model, self.default_concurrency)
+            sem = asyncio.Semaphore(limit)
+            self._semaphores[model] = sem
+        return sem
+
+    def _record_usage(self, response):
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        self._usage[("prompt", hour)] += usage.prompt_tokens or 0
+        self._usage[("completion", hour)] += usage.completion_tokens or 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Run one chat completion without blocking the event loop.
+
+        Args:
+            model: Model name
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Completion token cap
+            timeout: Per-call timeout in seconds (defaults to AI_REQUEST_TIMEOUT)
+
+        Returns:
+            The OpenAI ChatCompletion response
+        """
+        async with self._semaphore(model):
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout or self.timeout,
+            )
+        self._record_usage(response)
+        return response
+
+    async def stream_chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+
+        The model's concurrency slot is held until the stream finishes.
+        Streamed responses carry no usage, so they are not counted in AI token stats.
+        """
+        async with self._semaphore(model):
+            stream = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout or self.timeout,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    def drain_usage(self) -> Counter:
+        """Token usage since the last call, keyed by (prompt|completion, hour)."""
+        usage, self._usage = self._usage, Counter()
+        return usage
+
+    async def close(self):
+        """Release pooled connections."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._client = None
+        self._http_client = None
+        self._semaphores.clear()
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_ai_engine: Optional[AIEngine] = None
+
+
+def get_ai_engine() -> AIEngine:
+    global _ai_engine
+    if _ai_engine is None:
+        _ai_engine = AIEngine()
+    return _ai_engine
@@ -5,28 +5,46 @@ Handles message understanding and AI responses
 
 import logging
 import json
-from typing import List, Dict, Optional
-from openai import OpenAI
+from typing import AsyncIterator, List, Dict, Optional
 from app.core.config import settings
+from app.services.ai_engine import get_ai_engine
+from app.services.response_cache import get_response_cache
+from app.services.intent_classifier import get_intent_classifier
 
 logger = logging.getLogger(__name__)
 
+FALLBACK_FOLLOW_UP = "We'd love to continue our conversation. Please let us know how we can help!"
+
 class AIService:
     """Service for AI message processing and responses"""
     
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.engine = get_ai_engine()
+        self.cache = get_response_cache()
         self.smart_model = settings.AI_SMART_MODEL
         self.cheap_model = settings.AI_CHEAP_MODEL
         self.temperature = settings.AI_TEMPERATURE
         self.max_tokens = settings.AI_MAX_TOKENS
     
     async def classify_intent(self, message: str) -> str:
+        """
+        Classify intent with the local model, falling back to the cheap LLM
+        when no model is trained or its confidence is below the threshold.
+        """
+        classifier = get_intent_classifier()
+        if classifier is not None:
+            intent, confidence = classifier.predict(message)
+            if confidence >= settings.INTENT_CONFIDENCE_THRESHOLD:
+                return intent
+        return await self.classify_intent_llm(message)
+
+    async def classify_intent_llm(self, message: str, raise_errors: bool = False) -> str:
         """
         Quickly classify intent using the cheap model to save costs.
+        API errors return OTHER unless raise_errors is set (training labels).
         """
         try:
-            response = self.client.chat.completions.create(
+            response = await self.engine.chat(
                 model=self.cheap_model,
                 messages=[
                     {"role": "system", "content": "Classify the user intent into: SALES, SUPPORT, BOOKING, or OTHER. Reply with only one word."},
@@ -37,6 +55,8 @@ class AIService:
             )
             return response.choices[0].message.content.strip().upper()
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error classifying intent: {str(e)}")
             return "OTHER"
 
@@ -44,8 +64,16 @@ class AIService:
         """
         Process incoming customer message and generate AI response
         Uses the two-model logic: cheap for routing, smart for sales.
+        Repeated questions are answered from the response cache without
+        any LLM call.
         """
         try:
+            system_prompt = self._build_system_prompt()
+            cache_key = self.cache.make_key(message, context, system_prompt)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return {**cached, "tokens_used": 0, "cached": True}
+            
             # Step 1: Classify intent with cheap model
             intent = await self.classify_intent(message)
             
@@ -54,10 +82,9 @@ class AIService:
             use_smart = intent in ["SALES", "BOOKING"]
             selected_model = self.smart_model if use_smart else self.cheap_model
             
-            system_prompt = self._build_system_prompt()
             user_message = self._build_user_message(message, context)
             
-            response = self.client.chat.completions.create(
+            response = await self.engine.chat(
                 model=selected_model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -69,7 +96,7 @@ class AIService:
             
             ai_response = response.choices[0].message.content
             
-            return {
+            result = {
                 "success": True,
                 "response": ai_response,
                 "tokens_used": response.usage.total_tokens,
@@ -77,6 +104,8 @@ class AIService:
                 "intent": intent,
                 "tier": "smart" if use_smart else "cheap"
             }
+            await self.cache.set(cache_key, result)
+            return result
         except Exception as e:
             logger.error(f"Error processing message with AI: {str(e)}")
             return {
@@ -85,6 +114,58 @@ class AIService:
                 "response": "I apologize, I'm experiencing technical difficulties. Please try again later."
             }
     
+    async def stream_message(self, message: str, context: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        """
+        Streaming variant of process_message for the chat widget
+        
+        Yields {"type": "token", "content": ...} events as the model produces
+        them, then a final {"type": "done", ...} event with the full response
+        (or {"type": "error", ...} with the fallback reply).
+        """
+        try:
+            system_prompt = self._build_system_prompt()
+            cache_key = self.cache.make_key(message, context, system_prompt)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                yield {"type": "token", "content": cached["response"]}
+                yield {"type": "done", **cached, "cached": True}
+                return
+            
+            intent = await self.classify_intent(message)
+            use_smart = intent in ["SALES", "BOOKING"]
+            selected_model = self.smart_model if use_smart else self.cheap_model
+            
+            parts = []
+            async for token in self.engine.stream_chat(
+                model=selected_model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": self._build_user_message(message, context)}
+                ],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens
+            ):
+                parts.append(token)
+                yield {"type": "token", "content": token}
+            
+            result = {
+                "success": True,
+                "response": "".join(parts),
+                "model": selected_model,
+                "intent": intent,
+                "tier": "smart" if use_smart else "cheap"
+            }
+            await self.cache.set(cache_key, result)
+            yield {"type": "done", **result}
+        except Exception as e:
+            logger.error(f"Error streaming AI response: {str(e)}")
+            yield {
+                "type": "error",
+                "success": False,
+                "error": str(e),
+                "response": "I apologize, I'm experiencing technical difficulties. Please try again later."
+            }
+    
     async def qualify_lead(self, customer_data: Dict, conversation_history: List[Dict]) -> Dict:
         """
         Qualify lead - Uses smart model for intelligence
@@ -92,7 +173,7 @@ class AIService:
         try:
             prompt = self._build_qualification_prompt(customer_data, conversation_history)
             
-            response = self.client.chat.completions.create(
+            response = await self.engine.chat(
                 model=self.smart_model,
                 messages=[
                     {"role": "system", "content": "You are the Digital Dada AI Lead Qualifier. Analyze the customer data and provide a structured JSON response."},
@@ -132,14 +213,32 @@ class AIService:
         """
         Generate personalized follow-up message - Uses cheap model for efficiency
         """
+        result = await self.personalize_follow_up(lead_data, interaction_type)
+        return result["message"] if result["success"] else FALLBACK_FOLLOW_UP
+    
+    async def personalize_follow_up(self, lead_data: Dict, interaction_type: str, draft: Optional[str] = None) -> Dict:
+        """
+        Generate a personalized follow-up, reporting failure explicitly
+        
+        Args:
+            lead_data: Customer name, company and last interaction
+            interaction_type: Follow-up / sequence type
+            draft: The scheduled step's own message, kept as the basis of the result
+            
+        Returns:
+            {"success": True, "message": ...} or {"success": False, "error": ...}
+        """
         try:
+            step = f"""
+            Scheduled message for this step (keep its purpose): {draft}
+            """ if draft else ""
             prompt = f"""
             Generate a professional and personalized follow-up {interaction_type} message for:
             
             Customer: {lead_data.get('name')}
             Company: {lead_data.get('company')}
             Previous Interaction: {lead_data.get('last_interaction')}
-            
+            {step}
             The message should be:
             - Personalized and friendly
             - Professional yet warm
@@ -149,7 +248,7 @@ class AIService:
             Generate the message directly without any preamble.
             """
             
-            response = self.client.chat.completions.create(
+            response = await self.engine.chat(
                 model=self.cheap_model,
                 messages=[
                     {"role": "system", "content": "You are the Digital Dada AI Follow-up Agent."},
@@ -159,10 +258,13 @@ class AIService:
                 max_tokens=300
             )
             
-            return response.choices[0].message.content
+            message = response.choices[0].message.content
+            if not message:
+                return {"success": False, "error": "Empty completion"}
+            return {"success": True, "message": message}
         except Exception as e:
             logger.error(f"Error generating follow-up: {str(e)}")
-            return "We'd love to continue our conversation. Please let us know how we can help!"
+            return {"success": False, "error": str(e)}
     
     def _build_system_prompt(self) -> str:
         """Build system prompt for AI responses with Digital Dada branding, using live config."""
@@ -6,9 +6,8 @@ Syncs leads, tasks, and bookings to Airtable bases for reporting and collaborati
 import logging
 from typing import Dict, List, Optional
 
-import httpx
-
 from app.core.config import settings
+from app.core.http_client import get_http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -37,12 +36,11 @@ class AirtableService:
         if not self._configured:
             return None
 
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.request(
-                method, url, headers=self._headers(), json=json, params=params
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await get_http_pool().request(
+            method, url, headers=self._headers(), json=json, params=params, timeout=15
+        )
+        resp.raise_for_status()
+        return resp.json()
 
     # ------------------------------------------------------------------
     # Bases
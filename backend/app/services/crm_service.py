@@ -5,7 +5,8 @@ Syncs to GoHighLevel for pipeline management.
 """
 
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models import Lead, Customer, Message
 from app.services.ghl_service import get_ghl_service
@@ -18,7 +19,7 @@ class CRMService:
     
     async def save_customer_interaction(
         self,
-        db: Session,
+        db: Union[Session, AsyncSession],
         customer_id: str,
         message_content: str,
         channel: str,
@@ -28,7 +29,7 @@ class CRMService:
         Save customer interaction to CRM
         
         Args:
-            db: Database session
+            db: Database session (sync or async)
             customer_id: Customer ID
             message_content: Message content
             channel: Communication channel
@@ -47,7 +48,10 @@ class CRMService:
             )
             
             db.add(message)
-            db.commit()
+            if isinstance(db, AsyncSession):
+                await db.commit()
+            else:
+                db.commit()
             
             logger.info(f"Message saved: {message.id} from customer {customer_id}")
             
@@ -58,7 +62,10 @@ class CRMService:
             }
         except Exception as e:
             logger.error(f"Error saving customer interaction: {str(e)}")
-            db.rollback()
+            if isinstance(db, AsyncSession):
+                await db.rollback()
+            else:
+                db.rollback()
             return {"success": False, "error": str(e)}
     
     async def update_lead_in_crm(
@@ -0,0 +1,284 @@
+"""
+Bulk Data Export
+Streams leads (with customer fields), customers, messages and follow-ups as
+CSV, NDJSON or Parquet. Rows come off a server-side cursor EXPORT_CHUNK_SIZE
+at a time through the async engine and each chunk is encoded and handed to
+the response as soon as it is read, so an export of millions of rows holds
+one chunk in memory and never blocks the event loop on the database.
+
+Leads are read from the lead_listings read model, which already carries the
+customer's name, company, email and phone, so the export needs no join.
+Parquet output needs pyarrow (loaded on first use).
+"""
+
+import csv
+import enum
+import io
+import json
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_database_registry
+from app.models import Customer, FollowUp, LeadListing, Message
+
+logger = logging.getLogger(__name__)
+
+
+class ExportUnavailable(Exception):
+    """The requested format needs an optional dependency that is not installed"""
+
+
+class _Dataset:
+    """Columns, export order (an index), time-range column and equality filters of one export"""
+
+    def __init__(self, model, columns: List[str], order_by: List[str], time_column: str, filters: List[str]):
+        self.model = model
+        self.columns = [getattr(model, name) for name in columns]
+        self.order_by = [getattr(model, name) for name in order_by]
+        self.time_column = getattr(model, time_column)
+        self.filters = {name: getattr(model, name) for name in filters}
+
+    def statement(self, filters: Dict, since: Optional[datetime], until: Optional[datetime]):
+        stmt = select(*self.columns).order_by(*self.order_by)
+        if since:
+            stmt = stmt.where(self.time_column >= since)
+        if until:
+            stmt = stmt.where(self.time_column < until)
+        for name, value in filters.items():
+            if name not in self.filters:
+                raise ValueError(f"Unsupported filter for this export: {name}")
+            column = self.filters[name]
+            enum_class = getattr(column.type, "enum_class", None)
+            if enum_class is not None:
+                try:
+                    value = enum_class(str(value).lower())
+                except ValueError:
+                    raise ValueError(f"Invalid {name}: {value}")
+            stmt = stmt.where(column == value)
+        return stmt
+
+
+DATASETS = {
+    "leads": _Dataset(
+        LeadListing,
+        ["lead_id", "customer_id", "status", "quality_score", "requirements", "timeline", "budget", "priority",
+         "assigned_to", "name", "company", "email", "phone", "created_at", "updated_at"],
+        order_by=["created_at", "lead_id"], time_column="created_at",
+        filters=["status", "priority", "assigned_to", "customer_id"],
+    ),
+    "customers": _Dataset(
+        Customer,
+        ["id", "name", "email", "phone", "company", "business_type", "location", "status", "tier",
+         "created_at", "updated_at"],
+        order_by=["created_at", "id"], time_column="created_at",
+        filters=["status", "tier"],
+    ),
+    "messages": _Dataset(
+        Message,
+        ["id", "customer_id", "channel", "direction", "content", "ai_response", "processed", "created_at"],
+        order_by=["created_at", "id"], time_column="created_at",
+        filters=["customer_id", "channel", "direction"],
+    ),
+    "follow_ups": _Dataset(
+        FollowUp,
+        ["id", "lead_id", "message_type", "scheduled_time", "message_content", "sent", "sent_at", "created_at"],
+        order_by=["scheduled_time", "id"], time_column="scheduled_time",
+        filters=["lead_id", "message_type", "sent"],
+    ),
+}
+
+
+def _plain(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _text(value):
+    """Value for the text formats (timestamps as ISO 8601)"""
+    return value.isoformat() if isinstance(value, datetime) else _plain(value)
+
+
+# ---------------------------------------------------------------------------
+# Encoders
+# ---------------------------------------------------------------------------
+
+class _Encoder(ABC):
+    """start / encode(rows) / finish, each returning bytes for the response"""
+
+    media_type = "application/octet-stream"
+    extension = "bin"
+
+    def __init__(self, dataset: _Dataset):
+        self.names = [column.key for column in dataset.columns]
+
+    def start(self) -> bytes:
+        return b""
+
+    @abstractmethod
+    def encode(self, rows) -> bytes:
+        """Encode one chunk of rows"""
+        pass
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class CsvEncoder(_Encoder):
+    media_type = "text/csv"
+    extension = "csv"
+
+    def _write(self, rows) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(rows)
+        return buffer.getvalue().encode()
+
+    def start(self) -> bytes:
+        return self._write([self.names])
+
+    def encode(self, rows) -> bytes:
+        return self._write(map(_text, row) for row in rows)
+
+
+class NdjsonEncoder(_Encoder):
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def encode(self, rows) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(self.names, map(_text, row))), default=str) + "\n" for row in rows
+        ).encode()
+
+
+class _Sink:
+    """Write-only file for pyarrow that hands back the bytes written so far"""
+
+    closed = False
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+class ParquetEncoder(_Encoder):
+    """One row group per cursor chunk"""
+
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self, dataset: _Dataset):
+        super().__init__(dataset)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportUnavailable("Parquet export requires pyarrow (pip install pyarrow)")
+        self.pa = pa
+        self.schema = pa.schema([(column.key, self._arrow_type(column.type)) for column in dataset.columns])
+        self.sink = _Sink()
+        self.writer = pq.ParquetWriter(self.sink, self.schema, compression="snappy")
+
+    def _arrow_type(self, column_type):
+        if isinstance(column_type, DateTime):
+            return self.pa.timestamp("us")
+        if isinstance(column_type, Boolean):
+            return self.pa.bool_()
+        if isinstance(column_type, Float):
+            return self.pa.float64()
+        if isinstance(column_type, Integer):
+            return self.pa.int64()
+        return self.pa.string()
+
+    def encode(self, rows) -> bytes:
+        columns = list(zip(*rows)) if rows else [[] for _ in self.names]
+        batch = self.pa.RecordBatch.from_arrays(
+            [self.pa.array([_plain(value) for value in values], type=field.type)
+             for values, field in zip(columns, self.schema)],
+            schema=self.schema
+        )
+        self.writer.write_batch(batch)
+        return self.sink.drain()
+
+    def finish(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+
+ENCODERS = {"csv": CsvEncoder, "ndjson": NdjsonEncoder, "parquet": ParquetEncoder}
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+class Export:
+    """
+    One prepared export; validation happens here so errors surface before
+    the response starts
+    """
+
+    def __init__(
+        self,
+        dataset: str,
+        fmt: str = "csv",
+        filters: Optional[Dict] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ):
+        if dataset not in DATASETS:
+            raise KeyError(dataset)
+        if fmt not in ENCODERS:
+            raise ValueError(f"Unsupported export format: {fmt} (expected one of {', '.join(ENCODERS)})")
+        self.dataset = dataset
+        self.statement = DATASETS[dataset].statement(filters or {}, since, until).execution_options(
+            yield_per=settings.EXPORT_CHUNK_SIZE
+        )
+        self.encoder: _Encoder = ENCODERS[fmt](DATASETS[dataset])
+        self.rows = 0
+
+    @property
+    def media_type(self) -> str:
+        return self.encoder.media_type
+
+    @property
+    def filename(self) -> str:
+        return f"{self.dataset}-{datetime.utcnow():%Y%m%dT%H%M%SZ}.{self.encoder.extension}"
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """Encoded chunks, read through a server-side cursor"""
+        await get_database_registry().ensure_initialized()
+        head = self.encoder.start()
+        if head:
+            yield head
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(self.statement)
+            async for rows in result.partitions():
+                self.rows += len(rows)
+                yield self.encoder.encode(rows)
+        tail = self.encoder.finish()
+        if tail:
+            yield tail
+        logger.info(f"Exported {self.rows} {self.dataset} rows")
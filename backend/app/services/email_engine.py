@@ -0,0 +1,448 @@
+"""
+Email Engine
+Delivers email over one of two backends without blocking the event loop:
+
+- smtp: a pool of SMTP_POOL_SIZE persistent aiosmtplib connections. The
+  connect / STARTTLS / AUTH handshake is paid once per connection instead of
+  once per message, and a connection is recycled after
+  SMTP_MAX_MESSAGES_PER_CONNECTION messages (providers cap messages per
+  session). A connection the server dropped while idle is reopened and the
+  message retried once.
+- sendgrid: /v3/mail/send over the shared keep-alive HTTP pool, with up to
+  SENDGRID_BATCH_SIZE recipients per request as personalizations; template
+  placeholders become per-recipient substitutions.
+
+Campaign sends go through EmailTemplate: the MIME framing (sender, content
+types, boundary) and any placeholder-free part are rendered once, so a
+recipient costs only the substitution and quoted-printable encoding of its
+own fields. Batch sends are paced by EMAIL_RATE_LIMIT.
+"""
+
+import asyncio
+import logging
+import quopri
+import time
+from email.header import Header
+from email.utils import formatdate, make_msgid
+from string import Template
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.job_queue import get_job_queue
+from app.utils.rate_limit import TokenBucket, post_with_retry
+
+logger = logging.getLogger(__name__)
+
+SEND_EMAIL_BATCH = "send_email_batch"
+
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+SENDGRID_MAX_RETRIES = 3  # retries on 429 responses and connection errors
+SENDGRID_CONCURRENCY = 4  # batch requests in flight
+SMTP_IDLE_CHECK = 1.0  # seconds idle before a pooled session is probed with NOOP
+
+job_queue = get_job_queue()
+
+
+class DeliveryRejected(Exception):
+    """The provider refused the message for good (bad address, 5xx SMTP reply, 4xx API error)"""
+
+
+def _header_value(value: str) -> str:
+    """Header-safe value: no line breaks, RFC 2047 encoded when not ASCII"""
+    value = " ".join(value.splitlines())
+    if value.isascii():
+        return value
+    return Header(value, "utf-8").encode()
+
+
+def _quoted_printable(text: str) -> bytes:
+    lines = text.replace("\r\n", "\n").encode("utf-8")
+    return quopri.encodestring(lines).replace(b"\n", b"\r\n")
+
+
+class EmailTemplate:
+    """
+    Subject, text and optional HTML body with $placeholders, prepared once
+    and rendered per recipient
+
+    Placeholders use string.Template syntax ($name or ${name}); unknown
+    placeholders are left as they are.
+    """
+
+    def __init__(self, subject: str, text: str, html: Optional[str] = None, sender: Optional[str] = None):
+        self.sender = sender or settings.EMAIL_FROM or settings.SMTP_USER
+        self.subject = Template(subject)
+        self.text = Template(text)
+        self.html = Template(html) if html else None
+        self._domain = self.sender.rpartition("@")[2] or None
+
+        part_headers = b'Content-Type: text/%s; charset="utf-8"\r\nContent-Transfer-Encoding: quoted-printable\r\n\r\n'
+        head = [f"From: {_header_value(self.sender)}".encode(), b"MIME-Version: 1.0"]
+        if self.html:
+            boundary = make_msgid(domain="boundary").strip("<>").encode()
+            head.append(b'Content-Type: multipart/alternative; boundary="' + boundary + b'"')
+            self._head = b"\r\n".join(head) + b"\r\n\r\n"
+            self._frame = [
+                b"--" + boundary + b"\r\n" + part_headers % b"plain",
+                b"\r\n--" + boundary + b"\r\n" + part_headers % b"html",
+                b"\r\n--" + boundary + b"--\r\n",
+            ]
+        else:
+            self._head = b"\r\n".join(head) + b"\r\n" + part_headers % b"plain"
+            self._frame = [b"", b"\r\n"]
+
+        # Parts without placeholders are encoded once for every recipient
+        self._static: Dict[str, bytes] = {}
+        for name, template in (("text", self.text), ("html", self.html)):
+            if template is not None and not template.get_identifiers():
+                self._static[name] = _quoted_printable(template.template)
+
+    def _part(self, name: str, template: Template, context: Dict) -> bytes:
+        static = self._static.get(name)
+        return static if static is not None else _quoted_printable(template.safe_substitute(context))
+
+    def render(self, to: str, context: Optional[Dict] = None) -> bytes:
+        """Complete RFC 5322 message for one recipient"""
+        context = context or {}
+        headers = (
+            f"To: {_header_value(to)}\r\n"
+            f"Subject: {_header_value(self.subject.safe_substitute(context))}\r\n"
+            f"Date: {formatdate(usegmt=True)}\r\n"
+            f"Message-ID: {make_msgid(domain=self._domain)}\r\n"
+        ).encode()
+        body = [self._frame[0], self._part("text", self.text, context)]
+        if self.html:
+            body += [self._frame[1], self._part("html", self.html, context), self._frame[2]]
+        else:
+            body.append(self._frame[1])
+        return headers + self._head + b"".join(body)
+
+    def substitutions(self, context: Dict) -> Dict[str, str]:
+        """SendGrid substitution tags for one recipient ($name and ${name} forms)"""
+        tags = {}
+        for key, value in context.items():
+            if key == "email":
+                continue
+            tags[f"${key}"] = tags[f"${{{key}}}"] = str(value)
+        return tags
+
+
+# ---------------------------------------------------------------------------
+# SMTP connection pool
+# ---------------------------------------------------------------------------
+
+class _Connection:
+    """One pool slot; the SMTP session is opened lazily"""
+
+    def __init__(self):
+        self.smtp = None
+        self.sent = 0
+        self.used_at = 0.0
+
+
+class SMTPConnectionPool:
+    """Fixed set of persistent SMTP sessions, each used by one send at a time"""
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self.max_messages = settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+        self._slots = [_Connection() for _ in range(self.size)]
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
+        self.metrics = {"connections_opened": 0, "reconnects": 0}
+
+    async def _open(self, connection: _Connection) -> None:
+        import aiosmtplib
+
+        await self._quit(connection)
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            use_tls=settings.SMTP_USE_TLS,
+            start_tls=settings.SMTP_START_TLS and not settings.SMTP_USE_TLS,
+            timeout=settings.SMTP_TIMEOUT
+        )
+        await smtp.connect()
+        if settings.SMTP_USER and settings.SMTP_PASSWORD:
+            await smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        connection.smtp = smtp
+        connection.sent = 0
+        connection.used_at = time.monotonic()
+        self.metrics["connections_opened"] += 1
+
+    async def _quit(self, connection: _Connection) -> None:
+        smtp, connection.smtp = connection.smtp, None
+        if smtp is None or not smtp.is_connected:
+            return
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    async def _checkout(self, connection: _Connection) -> None:
+        """Open, recycle or probe a session before any part of a transaction is sent"""
+        import aiosmtplib
+
+        smtp = connection.smtp
+        if smtp is None or not smtp.is_connected or connection.sent >= self.max_messages:
+            await self._open(connection)
+            return
+        if time.monotonic() - connection.used_at < SMTP_IDLE_CHECK:
+            return
+        try:
+            await smtp.noop()
+        except (aiosmtplib.SMTPException, OSError):
+            # Dropped while idle; reconnecting here cannot duplicate a message
+            smtp.close()
+            connection.smtp = None
+            self.metrics["reconnects"] += 1
+            await self._open(connection)
+
+    async def send(self, sender: str, recipients: List[str], message: bytes) -> None:
+        """Send a rendered message on an idle session (waits for one when all are busy)"""
+        import aiosmtplib
+
+        connection = await self._idle.get()
+        try:
+            await self._checkout(connection)
+            try:
+                await connection.smtp.sendmail(sender, recipients, message)
+            except aiosmtplib.SMTPRecipientsRefused as e:
+                # Rejected message; the session is still usable
+                raise DeliveryRejected(str(e)) from e
+            except aiosmtplib.SMTPResponseException as e:
+                if e.code >= 500:
+                    raise DeliveryRejected(str(e)) from e
+                raise
+            except Exception:
+                # Not resent: a disconnect after DATA may follow the server accepting the message
+                await self._quit(connection)
+                raise
+            connection.sent += 1
+            connection.used_at = time.monotonic()
+        finally:
+            self._idle.put_nowait(connection)
+
+    @property
+    def open_connections(self) -> int:
+        return sum(1 for slot in self._slots if slot.smtp is not None and slot.smtp.is_connected)
+
+    async def close(self) -> None:
+        await asyncio.gather(*[self._quit(slot) for slot in self._slots])
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+class EmailEngine:
+    """Pooled SMTP / batched SendGrid delivery"""
+
+    def __init__(self):
+        self.sendgrid_key = settings.SENDGRID_API_KEY
+        self.backend = settings.EMAIL_BACKEND.lower()
+        if self.backend == "auto":
+            self.backend = "sendgrid" if self.sendgrid_key else "smtp"
+        if self.backend not in ("smtp", "sendgrid"):
+            raise ValueError(f"Unknown EMAIL_BACKEND: {settings.EMAIL_BACKEND}")
+        self.sender = settings.EMAIL_FROM or settings.SMTP_USER
+        self.sendgrid_url = f"{settings.SENDGRID_API_BASE_URL.rstrip('/')}/v3/mail/send"
+        self.batch_size = min(settings.SENDGRID_BATCH_SIZE, SENDGRID_MAX_PERSONALIZATIONS)
+        self.rate = settings.EMAIL_RATE_LIMIT
+        self.bucket = TokenBucket(self.rate, burst=1) if self.rate > 0 else None
+        self.smtp_pool = SMTPConnectionPool(settings.SMTP_POOL_SIZE)
+        self.metrics = {"sent": 0, "failed": 0, "requests": 0, "retries": 0}
+
+    @property
+    def chunk_size(self) -> int:
+        """Recipients per campaign job: under a rate limit, what it allows in half the job timeout"""
+        if self.rate <= 0:
+            return max(1, settings.EMAIL_BATCH_CHUNK_SIZE)
+        return max(1, min(settings.EMAIL_BATCH_CHUNK_SIZE, int(self.rate * settings.JOB_VISIBILITY_TIMEOUT / 2)))
+
+    @property
+    def configured(self) -> bool:
+        if self.backend == "sendgrid":
+            return bool(self.sendgrid_key and self.sender)
+        return bool(settings.SMTP_HOST and self.sender)
+
+    async def _throttle(self) -> None:
+        if self.bucket is not None:
+            await self.bucket.acquire()
+
+    async def _sendgrid_post(self, payload: Dict) -> httpx.Response:
+        """POST /v3/mail/send; retried on 429 and connection errors only"""
+        headers = {"Authorization": f"Bearer {self.sendgrid_key}"}
+        return await post_with_retry(
+            self.sendgrid_url, SENDGRID_MAX_RETRIES, metrics=self.metrics, json=payload, headers=headers
+        )
+
+    async def _sendgrid_batch(self, template: EmailTemplate, recipients: List[Dict]) -> None:
+        """
+        One /v3/mail/send request for up to SENDGRID_BATCH_SIZE recipients
+
+        Raises:
+            DeliveryRejected: SendGrid refused the request (4xx other than 429)
+        """
+        payload = {
+            "personalizations": [
+                {
+                    "to": [{"email": recipient["email"]}],
+                    "subject": template.subject.safe_substitute(recipient),
+                    **({"substitutions": template.substitutions(recipient)} if len(recipient) > 1 else {})
+                }
+                for recipient in recipients
+            ],
+            "from": {"email": template.sender},
+            "content": [{"type": "text/plain", "value": template.text.template}]
+            + ([{"type": "text/html", "value": template.html.template}] if template.html else [])
+        }
+        response = await self._sendgrid_post(payload)
+        if response.status_code >= 400:
+            error = f"SendGrid error {response.status_code}: {response.text[:200]}"
+            if response.status_code < 500 and response.status_code != 429:
+                raise DeliveryRejected(error)
+            raise RuntimeError(error)
+
+    async def _smtp_send(self, template: EmailTemplate, recipient: Dict) -> None:
+        await self.smtp_pool.send(template.sender, [recipient["email"]], template.render(recipient["email"], recipient))
+
+    async def send(self, to: str, subject: str, text: str, html: Optional[str] = None) -> Dict:
+        """
+        Send one email
+
+        Args:
+            to: Recipient address
+            subject: Subject line
+            text: Plain-text body
+            html: Optional HTML alternative
+
+        Returns:
+            Result dict
+        """
+        if not self.configured:
+            return {"success": False, "error": "Email is not configured", "permanent": True}
+        template = EmailTemplate(subject, text, html, sender=self.sender)
+        try:
+            if self.backend == "sendgrid":
+                await self._sendgrid_batch(template, [{"email": to}])
+            else:
+                await self._smtp_send(template, {"email": to})
+        except Exception as e:
+            self.metrics["failed"] += 1
+            logger.error(f"Error sending email to {to}: {str(e)}")
+            return {"success": False, "error": str(e), "permanent": isinstance(e, DeliveryRejected)}
+
+        self.metrics["sent"] += 1
+        logger.info(f"Email sent to {to} via {self.backend}")
+        return {"success": True, "channel": "email", "recipient": to, "backend": self.backend}
+
+    async def send_batch(self, template: EmailTemplate, recipients: Iterable[Dict]) -> Dict:
+        """
+        Send one template to many recipients
+
+        Args:
+            template: Prepared template
+            recipients: Dicts with "email" plus the template's placeholder values
+
+        Returns:
+            Sent / failed totals, elapsed time and per-recipient failures
+        """
+        if not self.configured:
+            return {"success": False, "sent": 0, "failed": 0, "errors": [], "error": "Email is not configured"}
+        pending = iter(recipients)
+        results = {"sent": 0, "failed": 0, "errors": []}
+        started = time.perf_counter()
+
+        def failed(emails: List[str], error: str):
+            results["failed"] += len(emails)
+            self.metrics["failed"] += len(emails)
+            results["errors"] += [{"email": email, "error": error} for email in emails]
+
+        async def smtp_worker():
+            for recipient in pending:
+                await self._throttle()
+                try:
+                    await self._smtp_send(template, recipient)
+                except Exception as e:
+                    failed([recipient["email"]], str(e))
+                    continue
+                results["sent"] += 1
+                self.metrics["sent"] += 1
+
+        async def sendgrid_worker():
+            while True:
+                chunk = [recipient for _, recipient in zip(range(self.batch_size), pending)]
+                if not chunk:
+                    return
+                for _ in chunk:
+                    await self._throttle()
+                try:
+                    await self._sendgrid_batch(template, chunk)
+                except Exception as e:
+                    failed([recipient["email"] for recipient in chunk], str(e))
+                    continue
+                results["sent"] += len(chunk)
+                self.metrics["sent"] += len(chunk)
+
+        if self.backend == "sendgrid":
+            await asyncio.gather(*[sendgrid_worker() for _ in range(SENDGRID_CONCURRENCY)])
+        else:
+            # One worker per pooled connection keeps every session busy
+            await asyncio.gather(*[smtp_worker() for _ in range(self.smtp_pool.size)])
+
+        elapsed = time.perf_counter() - started
+        total = results["sent"] + results["failed"]
+        logger.info(f"Email batch: {results['sent']}/{total} sent via {self.backend} in {elapsed:.1f}s")
+        return {
+            "success": results["failed"] == 0,
+            **results,
+            "elapsed_seconds": round(elapsed, 3),
+            "messages_per_second": round(total / elapsed, 2) if elapsed else 0.0
+        }
+
+    def stats(self) -> Dict:
+        stats = {
+            "configured": self.configured,
+            "backend": self.backend,
+            "rate_limit": self.rate or None,
+            **self.metrics,
+        }
+        if self.backend == "smtp":
+            stats.update(
+                pool_size=self.smtp_pool.size,
+                open_connections=self.smtp_pool.open_connections,
+                **self.smtp_pool.metrics
+            )
+        else:
+            stats["batch_size"] = self.batch_size
+        return stats
+
+    async def close(self) -> None:
+        await self.smtp_pool.close()
+
+
+@job_queue.register(SEND_EMAIL_BATCH)
+async def send_email_batch(payload: Dict) -> None:
+    """One chunk of a campaign queued by /api/messages/email/batch"""
+    template = EmailTemplate(payload["subject"], payload["text"], payload.get("html"))
+    result = await get_email_engine().send_batch(template, payload["recipients"])
+    if result["failed"]:
+        logger.warning(f"Email batch job: {result['failed']} of {result['sent'] + result['failed']} messages failed")
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_email_engine: Optional[EmailEngine] = None
+
+
+def get_email_engine() -> EmailEngine:
+    global _email_engine
+    if _email_engine is None:
+        _email_engine = EmailEngine()
+    return _email_engine
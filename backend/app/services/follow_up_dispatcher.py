@@ -0,0 +1,221 @@
+"""
+Follow-up Dispatcher
+Drains due follow-ups in bounded chunks. Each chunk is claimed with
+SELECT ... FOR UPDATE SKIP LOCKED on PostgreSQL (BEGIN IMMEDIATE on SQLite)
+and leased to this worker for FOLLOW_UP_CLAIM_LEASE in a short transaction.
+The sends run outside any transaction, with bounded concurrency and
+per-channel rate limits, and the results are written in a second short
+transaction - so several workers can share a backlog without double-sending,
+SQLite's write lock is never held across network calls, and a crash only
+delays the chunk in flight until its lease runs out.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import or_, text, tuple_, update
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.core.database import SessionLocal, get_database_registry
+from app.models import Customer, FollowUp, Lead
+from app.services.message_channel import ChannelFactory
+from app.services.stats_service import record as record_stats
+from app.utils.rate_limit import TokenBucket, parse_rate_limits
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_channel(customer: Customer) -> Tuple[Optional[str], Optional[str]]:
+    """(channel, recipient) for a follow-up: email when known, else SMS"""
+    if customer.email:
+        return "email", customer.email
+    if customer.phone and any(char.isdigit() for char in customer.phone):
+        return "sms", customer.phone
+    return None, None
+
+
+class FollowUpDispatcher:
+    """Chunked, concurrent, rate-limited sender for due follow-ups"""
+
+    def __init__(self):
+        self.chunk_size = settings.FOLLOW_UP_CHUNK_SIZE
+        self.concurrency = settings.FOLLOW_UP_SEND_CONCURRENCY
+        self.lease = timedelta(seconds=settings.FOLLOW_UP_CLAIM_LEASE)
+        self.rate_limiters = {
+            channel: TokenBucket(rate)
+            for channel, rate in parse_rate_limits(settings.FOLLOW_UP_RATE_LIMITS).items()
+        }
+
+    def _claim_chunk(
+        self,
+        db: Session,
+        now: datetime,
+        after: Optional[Tuple[datetime, str]]
+    ) -> List[Dict]:
+        """
+        Lease the next chunk of due, unsent, unclaimed follow-ups to this worker
+
+        Args:
+            db: Session dedicated to the claim
+            now: Dispatch cut-off time
+            after: (scheduled_time, id) of the last row seen in this run
+
+        Returns:
+            What each claimed follow-up needs for its send (committed before returning)
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            # SQLite has no row locks; take the database write lock for the claim only
+            db.execute(text("BEGIN IMMEDIATE"))
+
+        claimed_at = datetime.utcnow()
+        query = db.query(FollowUp).options(
+            joinedload(FollowUp.lead, innerjoin=True).joinedload(Lead.customer, innerjoin=True)
+        ).filter(
+            (FollowUp.sent == False) &
+            (FollowUp.scheduled_time <= now) &
+            or_(FollowUp.claimed_until == None, FollowUp.claimed_until < claimed_at)
+        )
+        if after:
+            query = query.filter(tuple_(FollowUp.scheduled_time, FollowUp.id) > after)
+        query = query.order_by(FollowUp.scheduled_time, FollowUp.id).limit(self.chunk_size)
+
+        if dialect == "postgresql":
+            query = query.with_for_update(skip_locked=True, of=FollowUp)
+
+        chunk = []
+        for follow_up in query.all():
+            follow_up.claimed_until = claimed_at + self.lease
+            channel, recipient = resolve_channel(follow_up.lead.customer)
+            chunk.append({
+                "id": follow_up.id,
+                "scheduled_time": follow_up.scheduled_time,
+                "channel": channel,
+                "recipient": recipient,
+                "content": follow_up.message_content,
+                "subject": f"Follow-up: {follow_up.message_type}",
+            })
+        db.commit()
+        return chunk
+
+    async def _send(self, follow_up: Dict, semaphore: asyncio.Semaphore) -> bool:
+        if follow_up["channel"] is None:
+            logger.warning(f"Follow-up {follow_up['id']}: customer has no email or phone")
+            return False
+        async with semaphore:
+            limiter = self.rate_limiters.get(follow_up["channel"])
+            if limiter:
+                await limiter.acquire()
+            try:
+                result = await ChannelFactory.send_message(
+                    channel=follow_up["channel"],
+                    recipient=follow_up["recipient"],
+                    content=follow_up["content"],
+                    subject=follow_up["subject"]
+                )
+                return bool(result.get("success"))
+            except Exception as e:
+                logger.error(f"Error sending follow-up {follow_up['id']}: {str(e)}")
+                return False
+
+    def _record_results(self, db: Session, chunk: List[Dict], results: List[bool]) -> int:
+        """Mark sent rows and release the lease on failed ones (retried next run); returns sent"""
+        sent_at = datetime.utcnow()
+        sent_ids = [follow_up["id"] for follow_up, ok in zip(chunk, results) if ok]
+        failed_ids = [follow_up["id"] for follow_up, ok in zip(chunk, results) if not ok]
+        if sent_ids:
+            db.execute(
+                update(FollowUp).where(FollowUp.id.in_(sent_ids))
+                .values(sent=True, sent_at=sent_at, claimed_until=None)
+                .execution_options(synchronize_session=False)
+            )
+        if failed_ids:
+            db.execute(
+                update(FollowUp).where(FollowUp.id.in_(failed_ids))
+                .values(claimed_until=None)
+                .execution_options(synchronize_session=False)
+            )
+        record_stats(db.connection(), [
+            ("follow_ups.sent", "", sent_at, len(sent_ids)),
+            ("follow_ups.failed", "", sent_at, len(failed_ids)),
+        ])
+        db.commit()
+        return len(sent_ids)
+
+    async def _process_chunk(
+        self,
+        now: datetime,
+        after: Optional[Tuple[datetime, str]]
+    ) -> Tuple[int, int, int, Optional[Tuple[datetime, str]]]:
+        """Claim, send and record one chunk; returns (claimed, sent, failed, last_key)"""
+        db = SessionLocal()
+        try:
+            chunk = self._claim_chunk(db, now, after)
+            if not chunk:
+                return 0, 0, 0, after
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+            results = await asyncio.gather(*[self._send(follow_up, semaphore) for follow_up in chunk])
+
+            sent = self._record_results(db, chunk, results)
+            last = chunk[-1]
+            return len(chunk), sent, len(chunk) - sent, (last["scheduled_time"], last["id"])
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def dispatch_due(
+        self,
+        max_chunks: Optional[int] = None,
+        should_continue: Optional[Callable[[], bool]] = None
+    ) -> Dict:
+        """
+        Send every follow-up due now, one independently committed chunk at a time
+
+        Failed sends stay unsent and are retried by the next dispatch run.
+
+        Args:
+            max_chunks: Stop after this many chunks (None drains the backlog)
+            should_continue: Checked before each chunk; the drain stops once it
+                returns False (e.g. the scheduler lost its leader lease)
+
+        Returns:
+            Totals for the run
+        """
+        await get_database_registry().ensure_initialized()
+        now = datetime.utcnow()
+        after = None
+        totals = {"sent": 0, "failed": 0, "chunks": 0}
+
+        while max_chunks is None or totals["chunks"] < max_chunks:
+            if should_continue is not None and not should_continue():
+                logger.warning(f"Follow-up dispatch stopped after {totals['chunks']} chunks")
+                break
+            claimed, sent, failed, after = await self._process_chunk(now, after)
+            if not claimed:
+                break
+            totals["chunks"] += 1
+            totals["sent"] += sent
+            totals["failed"] += failed
+            logger.info(f"Follow-up chunk {totals['chunks']}: {sent} sent, {failed} failed")
+
+        return totals
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_follow_up_dispatcher: Optional[FollowUpDispatcher] = None
+
+
+def get_follow_up_dispatcher() -> FollowUpDispatcher:
+    global _follow_up_dispatcher
+    if _follow_up_dispatcher is None:
+        _follow_up_dispatcher = FollowUpDispatcher()
+    return _follow_up_dispatcher
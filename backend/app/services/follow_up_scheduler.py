@@ -0,0 +1,273 @@
+"""
+Follow-up Scheduler
+In-process scheduler that sleeps until the next follow-up is due and then
+hands the backlog to the FollowUpDispatcher. Due times are kept in a min-heap
+loaded incrementally from a look-ahead window of the (scheduled_time, id)
+index, so there is no full-table polling. One replica at a time is the leader
+(Redis lease); the others idle until the lease frees up.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal, get_database_registry
+from app.models import FollowUp
+from app.services.follow_up_dispatcher import get_follow_up_dispatcher
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "follow_up_scheduler:leader"
+
+# Extend or release the lease only while we still own it
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderLock:
+    """Redis lease held by the replica that runs the scheduler loop"""
+
+    def __init__(self, lease_seconds: float):
+        self.lease_ms = int(lease_seconds * 1000)
+        self.token = str(uuid.uuid4())
+        self.backend = "local"
+        self.is_leader = False
+        self._client = None
+
+    async def connect(self):
+        mode = settings.FOLLOW_UP_SCHEDULER_LOCK.lower()
+        if mode in ("redis", "auto"):
+            try:
+                import redis.asyncio as aioredis
+                client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+                await client.ping()
+                self._client = client
+                self.backend = "redis"
+            except Exception as e:
+                if mode == "redis":
+                    raise
+                # Single-replica deployments; dispatcher claims stay safe regardless
+                logger.warning(f"Redis unavailable ({e}), follow-up scheduler assumes single replica")
+
+    async def acquire(self) -> bool:
+        """Take or renew the lease; returns True while this replica is leader"""
+        if self._client is None:
+            self.is_leader = True
+            return True
+        try:
+            if self.is_leader:
+                self.is_leader = bool(await self._client.eval(_RENEW_SCRIPT, 1, LEADER_KEY, self.token, self.lease_ms))
+            if not self.is_leader:
+                self.is_leader = bool(await self._client.set(LEADER_KEY, self.token, nx=True, px=self.lease_ms))
+                if self.is_leader:
+                    logger.info("Follow-up scheduler acquired leadership")
+        except Exception as e:
+            logger.error(f"Follow-up scheduler lease error: {str(e)}")
+            self.is_leader = False
+        return self.is_leader
+
+    async def release(self):
+        if self._client is not None:
+            try:
+                if self.is_leader:
+                    await self._client.eval(_RELEASE_SCRIPT, 1, LEADER_KEY, self.token)
+                await self._client.close()
+            except Exception as e:
+                logger.warning(f"Follow-up scheduler lease release failed: {str(e)}")
+            self._client = None
+        self.is_leader = False
+
+
+class FollowUpScheduler:
+    """Min-heap of upcoming due times driving the follow-up dispatcher"""
+
+    def __init__(self):
+        self.horizon = timedelta(seconds=settings.FOLLOW_UP_SCHEDULER_HORIZON)
+        self.batch_size = settings.FOLLOW_UP_SCHEDULER_BATCH
+        self.refresh_interval = settings.FOLLOW_UP_SCHEDULER_REFRESH
+        self.retry_interval = settings.FOLLOW_UP_SCHEDULER_RETRY_INTERVAL
+        self.lock = LeaderLock(settings.FOLLOW_UP_SCHEDULER_LEASE)
+        self._heap: List[datetime] = []
+        self._window_end: Optional[datetime] = None
+        self._dispatched_until: Optional[datetime] = None
+        self._refresh_at = 0.0
+        self._retry_at = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {"loads": 0, "dispatches": 0, "sent": 0, "failed": 0}
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _load_window(self, start: Optional[datetime], end: datetime) -> List[datetime]:
+        """Due times of unsent follow-ups in (start, end], earliest first"""
+        db = SessionLocal()
+        try:
+            query = db.query(FollowUp.scheduled_time).filter(
+                (FollowUp.sent == False) &
+                (FollowUp.scheduled_time <= end)
+            )
+            if start is not None:
+                query = query.filter(FollowUp.scheduled_time > start)
+            rows = query.order_by(FollowUp.scheduled_time).limit(self.batch_size).all()
+            return [row[0] for row in rows]
+        finally:
+            db.close()
+
+    async def _refresh(self):
+        """Reload the look-ahead window past the last dispatch cut-off"""
+        end = datetime.utcnow() + self.horizon
+        times = await asyncio.to_thread(self._load_window, self._dispatched_until, end)
+        if len(times) >= self.batch_size:
+            # Window truncated; reload once we reach its last entry
+            end = times[-1]
+        self._heap = times
+        heapq.heapify(self._heap)
+        self._window_end = end
+        self._refresh_at = time.monotonic() + self.refresh_interval
+        self.metrics["loads"] += 1
+
+    # ------------------------------------------------------------------
+    # Loop
+    # ------------------------------------------------------------------
+
+    async def _hold_lease(self):
+        """Keep renewing the lease during a long drain; returns once it is lost"""
+        while True:
+            await asyncio.sleep(settings.FOLLOW_UP_SCHEDULER_LEASE / 3)
+            if not await self.lock.acquire():
+                logger.warning("Follow-up scheduler lost leadership during dispatch")
+                return
+
+    async def _dispatch(self, now: datetime):
+        while self._heap and self._heap[0] <= now:
+            heapq.heappop(self._heap)
+        renewer = asyncio.create_task(self._hold_lease()) if self.lock.backend == "redis" else None
+        try:
+            # Another replica takes over once the lease is gone; stop at the next chunk
+            result = await get_follow_up_dispatcher().dispatch_due(should_continue=lambda: self.lock.is_leader)
+        finally:
+            if renewer is not None:
+                renewer.cancel()
+        self._dispatched_until = now
+        self._retry_at = time.monotonic() + self.retry_interval
+        self.metrics["dispatches"] += 1
+        self.metrics["sent"] += result["sent"]
+        self.metrics["failed"] += result["failed"]
+
+    def _seconds_until_wakeup(self, now: datetime) -> float:
+        deadlines = [self._refresh_at - time.monotonic(), self._retry_at - time.monotonic()]
+        if self._heap:
+            deadlines.append((self._heap[0] - now).total_seconds())
+        if self.lock.backend == "redis":
+            deadlines.append(settings.FOLLOW_UP_SCHEDULER_LEASE / 3)
+        return max(0.0, min(deadlines))
+
+    async def _run(self):
+        # Migrations run in the background at start-up; the first window read needs the tables
+        try:
+            await get_database_registry().ensure_initialized()
+        except Exception as e:
+            logger.error(f"Follow-up scheduler failed to initialize the database: {str(e)}")
+        while True:
+            try:
+                if not await self.lock.acquire():
+                    # Follower: re-read the window on promotion
+                    self._dispatched_until = None
+                    self._refresh_at = 0.0
+                    await asyncio.sleep(settings.FOLLOW_UP_SCHEDULER_LEASE / 3)
+                    continue
+
+                if self._dispatched_until is None or time.monotonic() >= self._retry_at:
+                    # Catch up on the backlog (and retry failed sends) periodically
+                    await self._dispatch(datetime.utcnow())
+                    self._refresh_at = 0.0
+
+                if time.monotonic() >= self._refresh_at:
+                    await self._refresh()
+
+                now = datetime.utcnow()
+                if self._heap and self._heap[0] <= now:
+                    await self._dispatch(now)
+                    continue
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._seconds_until_wakeup(now))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Follow-up scheduler error: {str(e)}")
+                await asyncio.sleep(settings.FOLLOW_UP_SCHEDULER_REFRESH)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def notify(self, scheduled_time: datetime):
+        """Register a newly scheduled follow-up so it is sent on time"""
+        if self._task is None or self._window_end is None:
+            return
+        if scheduled_time <= self._window_end:
+            heapq.heappush(self._heap, scheduled_time)
+            if self._heap[0] == scheduled_time:
+                self._wakeup.set()
+
+    async def start(self):
+        """Connect the leader lease and start the loop (called from the app lifespan)"""
+        if not settings.FOLLOW_UP_SCHEDULER_ENABLED or self._task is not None:
+            return
+        await self.lock.connect()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Follow-up scheduler started (lock: {self.lock.backend})")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.lock.release()
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._task is not None,
+            "leader": self.lock.is_leader,
+            "lock": self.lock.backend,
+            "pending_in_window": len(self._heap),
+            "next_due": self._heap[0].isoformat() if self._heap else None,
+            "window_end": self._window_end.isoformat() if self._window_end else None,
+            **self.metrics,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_follow_up_scheduler: Optional[FollowUpScheduler] = None
+
+
+def get_follow_up_scheduler() -> FollowUpScheduler:
+    global _follow_up_scheduler
+    if _follow_up_scheduler is None:
+        _follow_up_scheduler = FollowUpScheduler()
+    return _follow_up_scheduler
@@ -3,16 +3,34 @@ Follow-up Automation Service
 Manages automated follow-ups and reminders
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional
+import uuid
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from app.core.config import settings
 from app.models import FollowUp, Lead
 from app.services.ai_service import get_ai_service
-from app.services.message_channel import ChannelFactory
+from app.services.follow_up_dispatcher import get_follow_up_dispatcher
+from app.services.follow_up_scheduler import get_follow_up_scheduler
 
 logger = logging.getLogger(__name__)
 
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+_CHUNK = 500
+
+def _chunks(ids: List[str]) -> Iterator[List[str]]:
+    for start in range(0, len(ids), _CHUNK):
+        yield ids[start:start + _CHUNK]
+
+def _in_chunks(queries: List, column, ids: Optional[List[str]]) -> List:
+    """Each query once per chunk of ids, in id order (unchanged when ids is None)"""
+    if ids is None:
+        return queries
+    chunks = list(_chunks(sorted(set(ids))))
+    return [query.filter(column.in_(chunk)) for query in queries for chunk in chunks]
+
 class FollowUpService:
     """Service for automated follow-ups and engagement"""
     
@@ -74,6 +92,7 @@ class FollowUpService:
             
             db.add(follow_up)
             db.commit()
+            get_follow_up_scheduler().notify(scheduled_time)
             
             logger.info(f"Follow-up scheduled: {follow_up.id}")
             
@@ -137,6 +156,10 @@ class FollowUpService:
             
             db.commit()
             
+            scheduler = get_follow_up_scheduler()
+            for follow_up in follow_ups:
+                scheduler.notify(follow_up.scheduled_time)
+            
             logger.info(f"Follow-up sequence created: {len(follow_ups)} messages")
             
             return {
@@ -152,67 +175,269 @@ class FollowUpService:
                 "error": str(e)
             }
     
-    async def send_pending_follow_ups(self, db: Session) -> Dict:
+    async def iter_bulk_enrollment(
+        self,
+        db: Session,
+        sequence_type: str,
+        lead_ids: Optional[List[str]] = None,
+        filters: Optional[Dict] = None,
+        skip_enrolled: bool = True,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[Dict]:
         """
-        Send all pending follow-ups that are due
+        Enroll many leads into a follow-up sequence, yielding progress
+        
+        Step times are computed once for the whole run; leads are read in
+        id order one batch at a time and their follow-ups inserted with
+        bulk_insert_mappings, one commit per batch.
+        
+        Args:
+            db: Database session
+            sequence_type: Type of sequence (nurture, reminder, post_demo)
+            lead_ids: Explicit leads to enroll (takes precedence over filters)
+            filters: Lead column filters (status, priority, assigned_to)
+            skip_enrolled: Skip leads with unsent follow-ups of this sequence
+            batch_size: Leads per batch (defaults to FOLLOW_UP_ENROLL_BATCH_SIZE)
+            
+        Yields:
+            {"type": "progress"|"done"|"error", ...} events
+        """
+        sequence = self.follow_up_sequences.get(sequence_type)
+        if not sequence:
+            yield {"type": "error", "error": f"Unknown sequence type: {sequence_type}"}
+            return
+        
+        batch_size = batch_size or settings.FOLLOW_UP_ENROLL_BATCH_SIZE
+        base_time = datetime.utcnow()
+        steps = [(self._parse_timing(step, base_time), message) for step, message in sequence.items()]
+        
+        query = db.query(Lead.id)
+        for column in ("status", "priority", "assigned_to"):
+            value = (filters or {}).get(column)
+            if value:
+                query = query.filter(getattr(Lead, column) == value)
+        queries = _in_chunks([query], Lead.id, lead_ids)
+        total = sum(query.count() for query in queries)
+        
+        enrolled = skipped = created = 0
+        try:
+            for query in queries:
+                after = None
+                while True:
+                    page = query.filter(Lead.id > after) if after else query
+                    batch = [row[0] for row in page.order_by(Lead.id).limit(batch_size).all()]
+                    if not batch:
+                        break
+                    after = batch[-1]
+                    
+                    if skip_enrolled:
+                        already = {
+                            row[0]
+                            for chunk in _chunks(batch)
+                            for row in db.query(FollowUp.lead_id).filter(
+                                (FollowUp.lead_id.in_(chunk)) &
+                                (FollowUp.message_type == sequence_type) &
+                                (FollowUp.sent == False)
+                            ).distinct()
+                        }
+                        skipped += len(already)
+                        batch = [lead_id for lead_id in batch if lead_id not in already]
+                    
+                    db.bulk_insert_mappings(FollowUp, [
+                        {
+                            "id": str(uuid.uuid4()),
+                            "lead_id": lead_id,
+                            "message_type": sequence_type,
+                            "scheduled_time": scheduled_time,
+                            "message_content": message,
+                            "sent": False,
+                            "created_at": base_time
+                        }
+                        for lead_id in batch
+                        for scheduled_time, message in steps
+                    ])
+                    db.commit()
+                    
+                    enrolled += len(batch)
+                    created += len(batch) * len(steps)
+                    yield {
+                        "type": "progress",
+                        "total": total,
+                        "processed": enrolled + skipped,
+                        "enrolled": enrolled,
+                        "skipped": skipped,
+                        "follow_ups_created": created
+                    }
+                    # Let other requests run between batches
+                    await asyncio.sleep(0)
+        except Exception as e:
+            logger.error(f"Error in bulk sequence enrollment: {str(e)}")
+            db.rollback()
+            yield {"type": "error", "error": str(e), "enrolled": enrolled, "follow_ups_created": created}
+            return
+        
+        scheduler = get_follow_up_scheduler()
+        for scheduled_time, _ in steps:
+            scheduler.notify(scheduled_time)
+        
+        logger.info(f"Bulk enrollment into {sequence_type}: {enrolled} leads, {created} follow-ups")
+        
+        yield {
+            "type": "done",
+            "sequence_type": sequence_type,
+            "total": total,
+            "enrolled": enrolled,
+            "skipped": skipped,
+            "follow_ups_created": created
+        }
+    
+    async def bulk_enroll_in_sequence(
+        self,
+        db: Session,
+        sequence_type: str,
+        lead_ids: Optional[List[str]] = None,
+        filters: Optional[Dict] = None,
+        skip_enrolled: bool = True
+    ) -> Dict:
+        """
+        Enroll many leads into a follow-up sequence and return the totals
+        
+        See iter_bulk_enrollment for arguments.
+        """
+        result = {}
+        async for event in self.iter_bulk_enrollment(db, sequence_type, lead_ids, filters, skip_enrolled):
+            result = event
+        
+        if result.get("type") == "error":
+            return {"success": False, "error": result["error"]}
+        
+        return {"success": True, **{k: v for k, v in result.items() if k != "type"}}
+    
+    async def personalize_follow_ups(
+        self,
+        db: Session,
+        follow_up_ids: Optional[List[str]] = None,
+        lead_ids: Optional[List[str]] = None,
+        message_type: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> Dict:
+        """
+        Replace unsent follow-up content with AI-personalized messages
+        
+        Follow-ups are read in batches; each batch generates one message per
+        distinct (name, company, type, step content) with bounded concurrency,
+        reusing messages already generated earlier in the run, and is
+        committed on its own. The step content keeps every step of a
+        sequence distinct. Rows whose generation fails keep their existing
+        content.
         
         Args:
             db: Database session
+            follow_up_ids: Specific follow-ups to personalize
+            lead_ids: Restrict to these leads
+            message_type: Restrict to one follow-up/sequence type
+            concurrency: Concurrent AI calls (defaults to FOLLOW_UP_PERSONALIZE_CONCURRENCY)
+            batch_size: Follow-ups per batch (defaults to FOLLOW_UP_PERSONALIZE_BATCH_SIZE)
             
         Returns:
-            Send result with count of sent messages
+            Counts of personalized rows and AI calls made
         """
         try:
-            now = datetime.utcnow()
+            ai_service = get_ai_service()
+            semaphore = asyncio.Semaphore(concurrency or settings.FOLLOW_UP_PERSONALIZE_CONCURRENCY)
+            batch_size = batch_size or settings.FOLLOW_UP_PERSONALIZE_BATCH_SIZE
+            messages: Dict[Tuple, Dict] = {}
             
-            # Get pending follow-ups
-            pending = db.query(FollowUp).filter(
-                (FollowUp.sent == False) &
-                (FollowUp.scheduled_time <= now)
-            ).all()
+            def message_key(follow_up: FollowUp) -> Tuple:
+                customer = follow_up.lead.customer
+                return (customer.name, customer.company, follow_up.message_type, follow_up.message_content)
             
-            sent_count = 0
-            failed_count = 0
+            async def generate(key: Tuple, lead: Lead):
+                async with semaphore:
+                    messages[key] = await ai_service.personalize_follow_up(
+                        self._lead_prompt_data(lead), key[2], draft=key[3]
+                    )
             
-            for follow_up in pending:
-                # Get lead and customer info
-                lead = db.query(Lead).filter(Lead.id == follow_up.lead_id).first()
-                if not lead:
-                    continue
-                
-                # Send follow-up through appropriate channel
-                # TODO: Determine preferred channel from customer preferences
-                send_result = await ChannelFactory.send_message(
-                    channel="email",
-                    recipient=lead.customer.email,
-                    content=follow_up.message_content,
-                    subject=f"Follow-up: {follow_up.message_type}"
-                )
-                
-                if send_result.get("success"):
-                    follow_up.sent = True
-                    follow_up.sent_at = now
-                    sent_count += 1
-                else:
-                    failed_count += 1
+            query = db.query(FollowUp).options(
+                joinedload(FollowUp.lead).joinedload(Lead.customer)
+            ).filter(FollowUp.sent == False)
+            if message_type:
+                query = query.filter(FollowUp.message_type == message_type)
+            queries = _in_chunks(_in_chunks([query], FollowUp.id, follow_up_ids), FollowUp.lead_id, lead_ids)
             
-            db.commit()
+            personalized = failed = 0
+            for query in queries:
+                after = None
+                while True:
+                    page = query.filter(FollowUp.id > after) if after else query
+                    batch = page.order_by(FollowUp.id).limit(batch_size).all()
+                    if not batch:
+                        break
+                    after = batch[-1].id
+                    
+                    pending = {}
+                    keys = [message_key(follow_up) for follow_up in batch]
+                    for key, follow_up in zip(keys, batch):
+                        if key not in messages and key not in pending:
+                            pending[key] = follow_up.lead
+                    await asyncio.gather(*[generate(key, lead) for key, lead in pending.items()])
+                    
+                    for key, follow_up in zip(keys, batch):
+                        result = messages[key]
+                        if not result["success"]:
+                            failed += 1
+                            continue
+                        follow_up.message_content = result["message"]
+                        personalized += 1
+                    db.commit()
             
-            logger.info(f"Follow-ups sent: {sent_count}, Failed: {failed_count}")
+            logger.info(f"Follow-ups personalized: {personalized} ({len(messages)} AI calls), Failed: {failed}")
             
             return {
                 "success": True,
-                "sent": sent_count,
-                "failed": failed_count
+                "personalized": personalized,
+                "failed": failed,
+                "ai_calls": len(messages)
             }
         except Exception as e:
-            logger.error(f"Error sending follow-ups: {str(e)}")
+            logger.error(f"Error personalizing follow-ups: {str(e)}")
             db.rollback()
             return {
                 "success": False,
                 "error": str(e)
             }
     
+    async def send_pending_follow_ups(self, db: Optional[Session] = None, max_chunks: Optional[int] = None) -> Dict:
+        """
+        Send all pending follow-ups that are due
+        
+        Due rows are claimed and committed in chunks by the dispatcher, each
+        chunk on its own session, so the request session is not used.
+        
+        Args:
+            db: Database session (unused, kept for compatibility)
+            max_chunks: Stop after this many chunks (None drains the backlog)
+            
+        Returns:
+            Send result with count of sent messages
+        """
+        try:
+            result = await get_follow_up_dispatcher().dispatch_due(max_chunks=max_chunks)
+            
+            logger.info(f"Follow-ups sent: {result['sent']}, Failed: {result['failed']}")
+            
+            return {
+                "success": True,
+                **result
+            }
+        except Exception as e:
+            logger.error(f"Error sending follow-ups: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
     async def _generate_follow_up_message(
         self,
         db: Session,
@@ -236,18 +461,20 @@ class FollowUpService:
                 return "Following up on your inquiry. How can we help?"
             
             ai_service = get_ai_service()
-            lead_data = {
-                "name": lead.customer.name,
-                "company": lead.customer.company,
-                "last_interaction": "Recent inquiry"
-            }
-            
-            message = await ai_service.generate_follow_up(lead_data, follow_up_type)
+            message = await ai_service.generate_follow_up(self._lead_prompt_data(lead), follow_up_type)
             return message
         except Exception as e:
             logger.error(f"Error generating follow-up message: {str(e)}")
             return "Following up on your inquiry. How can we help?"
     
+    def _lead_prompt_data(self, lead: Lead) -> Dict:
+        """Lead fields used to personalize a follow-up"""
+        return {
+            "name": lead.customer.name,
+            "company": lead.customer.company,
+            "last_interaction": "Recent inquiry"
+        }
+    
     def _parse_timing(self, step: str, base_time: datetime) -> datetime:
         """
         Parse timing from step name
@@ -7,9 +7,8 @@ import logging
 from typing import Dict, List, Optional
 from datetime import datetime
 
-import httpx
-
 from app.core.config import settings
+from app.core.http_client import get_http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -48,12 +47,11 @@ class GoHighLevelService:
             return None
 
         url = f"{self.base_url}{path}"
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.request(
-                method, url, headers=self._headers(), json=json, params=params
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await get_http_pool().request(
+            method, url, headers=self._headers(), json=json, params=params, timeout=20
+        )
+        resp.raise_for_status()
+        return resp.json()
 
     # ------------------------------------------------------------------
     # Contacts
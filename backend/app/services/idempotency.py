@@ -0,0 +1,352 @@
+"""
+Idempotent Intake
+Deduplicates webhook and API deliveries (n8n, messaging channels) before any
+work happens. The first delivery of a key claims it and runs; its response
+is stored and replayed to every retry of the same key for the TTL. A
+duplicate that arrives while the first is still running waits for its result
+instead of running the pipeline again.
+
+Claims live in Redis (SET NX with expiry) with the idempotency_keys table as
+the fallback when Redis is unavailable.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import get_async_engine, get_database_registry
+from app.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "idempotency:"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Client-supplied keys, in order of preference
+KEY_HEADERS = ["Idempotency-Key", "X-Idempotency-Key", "I-Twilio-Idempotency-Token"]
+
+PURGE_INTERVAL = 300.0
+POLL_INTERVAL = 0.1
+
+
+class IdempotencyConflict(Exception):
+    """A duplicate arrived while the original delivery is still being processed"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("A request with this idempotency key is still being processed")
+        self.retry_after = retry_after
+
+
+def request_key(
+    headers,
+    body: Any,
+    body_key: Optional[str] = None,
+    content_hash: bool = True
+) -> Tuple[Optional[str], bool]:
+    """
+    Idempotency key for a delivery
+
+    Args:
+        headers: Request headers
+        body: Parsed request body (hashed when no key is supplied)
+        body_key: Key carried in the body by the sender, if any
+        content_hash: Fall back to a hash of the body; off where identical
+            bodies can be distinct deliveries (a customer sending "yes" twice)
+
+    Returns:
+        (key, supplied) - supplied is False for content-hash keys; key is
+        None when nothing identifies the delivery and content_hash is off
+    """
+    for header in KEY_HEADERS:
+        value = headers.get(header)
+        if value:
+            return value, True
+    if body_key:
+        return str(body_key), True
+    if not content_hash:
+        return None, False
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return "sha256:" + hashlib.sha256(canonical.encode()).hexdigest(), False
+
+
+class IdempotencyBackend(ABC):
+    """Abstract base class for claimed keys and stored responses"""
+
+    name = "base"
+
+    @abstractmethod
+    async def claim(self, key: str, scope: str, lock_ttl: float) -> Dict:
+        """Returns {"state": "new" | "pending" | "done", "status_code", "body"}"""
+        pass
+
+    @abstractmethod
+    async def complete(self, key: str, status_code: int, body: Any, ttl: float) -> None:
+        """Store the response for a claimed key, kept for ttl seconds"""
+        pass
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Drop a pending claim so the next delivery runs again"""
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Redis backend
+# ---------------------------------------------------------------------------
+
+class RedisIdempotencyBackend(IdempotencyBackend):
+    """One string per key: a pending marker (lock TTL), then the stored response (replay TTL)."""
+
+    name = "redis"
+
+    def __init__(self, client):
+        self.client = client
+
+    async def claim(self, key: str, scope: str, lock_ttl: float) -> Dict:
+        pending = json.dumps({"state": "pending", "scope": scope})
+        if await self.client.set(KEY_PREFIX + key, pending, nx=True, px=int(lock_ttl * 1000)):
+            return {"state": "new"}
+        raw = await self.client.get(KEY_PREFIX + key)
+        if raw is None:
+            # Expired between SET and GET; the next poll claims it
+            return {"state": "pending"}
+        return json.loads(raw)
+
+    async def complete(self, key: str, status_code: int, body: Any, ttl: float) -> None:
+        value = json.dumps({"state": "done", "status_code": status_code, "body": body})
+        await self.client.set(KEY_PREFIX + key, value, px=int(ttl * 1000))
+
+    async def release(self, key: str) -> None:
+        await self.client.delete(KEY_PREFIX + key)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+# ---------------------------------------------------------------------------
+# Database backend
+# ---------------------------------------------------------------------------
+
+class DatabaseIdempotencyBackend(IdempotencyBackend):
+    """idempotency_keys rows; the primary key makes the first INSERT the winner."""
+
+    name = "database"
+
+    def __init__(self):
+        self._purge_at = 0.0
+
+    async def _purge(self, now: datetime):
+        if time.monotonic() < self._purge_at:
+            return
+        self._purge_at = time.monotonic() + PURGE_INTERVAL
+        async with get_async_engine().begin() as conn:
+            await conn.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < now))
+
+    async def claim(self, key: str, scope: str, lock_ttl: float) -> Dict:
+        now = datetime.utcnow()
+        locked_until = now + timedelta(seconds=lock_ttl)
+        await self._purge(now)
+        try:
+            async with get_async_engine().begin() as conn:
+                await conn.execute(insert(IdempotencyKey).values(
+                    key=key, scope=scope, state="pending", locked_until=locked_until,
+                    expires_at=locked_until, created_at=now
+                ))
+            return {"state": "new"}
+        except IntegrityError:
+            pass
+
+        async with get_async_engine().begin() as conn:
+            # Take over a claim whose handler died, or a stored response past its TTL
+            taken = await conn.execute(
+                update(IdempotencyKey)
+                .where(and_(
+                    IdempotencyKey.key == key,
+                    or_(
+                        and_(IdempotencyKey.state == "pending", IdempotencyKey.locked_until < now),
+                        IdempotencyKey.expires_at < now
+                    )
+                ))
+                .values(state="pending", locked_until=locked_until, expires_at=locked_until,
+                        status_code=None, response=None, created_at=now)
+            )
+            if taken.rowcount:
+                return {"state": "new"}
+            row = (await conn.execute(
+                select(IdempotencyKey.state, IdempotencyKey.status_code, IdempotencyKey.response)
+                .where(IdempotencyKey.key == key)
+            )).first()
+
+        if row is None or row.state != "done":
+            return {"state": "pending"}
+        return {"state": "done", "status_code": row.status_code, "body": json.loads(row.response)}
+
+    async def complete(self, key: str, status_code: int, body: Any, ttl: float) -> None:
+        async with get_async_engine().begin() as conn:
+            await conn.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(state="done", status_code=status_code, response=json.dumps(body),
+                        locked_until=None, expires_at=datetime.utcnow() + timedelta(seconds=ttl))
+            )
+
+    async def release(self, key: str) -> None:
+        async with get_async_engine().begin() as conn:
+            await conn.execute(
+                delete(IdempotencyKey).where((IdempotencyKey.key == key) & (IdempotencyKey.state == "pending"))
+            )
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+class IdempotencyStore:
+    """Claim / replay front-end over the configured backend"""
+
+    def __init__(self):
+        self.ttl = settings.IDEMPOTENCY_TTL
+        self.content_ttl = settings.IDEMPOTENCY_CONTENT_TTL
+        self.lock_ttl = settings.IDEMPOTENCY_LOCK_TTL
+        self.wait = settings.IDEMPOTENCY_WAIT
+        self.backend: Optional[IdempotencyBackend] = None
+        self._connect_lock = asyncio.Lock()
+        self.metrics = {"processed": 0, "replayed": 0, "waited": 0, "conflicts": 0, "bypassed": 0}
+
+    async def _connect(self) -> IdempotencyBackend:
+        backend = settings.IDEMPOTENCY_BACKEND.lower()
+        if backend in ("redis", "auto"):
+            try:
+                import redis.asyncio as aioredis
+                client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+                await client.ping()
+                logger.info("Idempotency store using Redis")
+                return RedisIdempotencyBackend(client)
+            except Exception as e:
+                if backend == "redis":
+                    raise
+                logger.warning(f"Redis unavailable ({e}), idempotency store falling back to the database")
+        await get_database_registry().ensure_initialized()
+        logger.info("Idempotency store using the database")
+        return DatabaseIdempotencyBackend()
+
+    async def get_backend(self) -> IdempotencyBackend:
+        if self.backend is None:
+            async with self._connect_lock:
+                if self.backend is None:
+                    self.backend = await self._connect()
+        return self.backend
+
+    async def _claim(self, key: str, scope: str) -> Optional[Dict]:
+        """Wait out a concurrent original; returns its stored response, or None once claimed"""
+        backend = await self.get_backend()
+        deadline = time.monotonic() + self.wait
+        waited = False
+        while True:
+            try:
+                claim = await backend.claim(key, scope, self.lock_ttl)
+            except Exception:
+                # Lock contention is transient; an outage surfaces once the wait is over
+                if time.monotonic() >= deadline:
+                    raise
+                waited = True
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+            if claim["state"] == "new":
+                return None
+            if claim["state"] == "done":
+                self.metrics["waited" if waited else "replayed"] += 1
+                return claim
+            if time.monotonic() >= deadline:
+                self.metrics["conflicts"] += 1
+                raise IdempotencyConflict(retry_after=self.lock_ttl)
+            waited = True
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def run(
+        self,
+        scope: str,
+        key: str,
+        work: Callable[[], Awaitable[Any]],
+        supplied: bool = True,
+        status_code: int = 200
+    ) -> Tuple[Any, int, bool]:
+        """
+        Run work once per (scope, key) and replay its response to duplicates
+
+        Args:
+            scope: Endpoint name, so keys from different endpoints never collide
+            key: Idempotency key from request_key
+            work: Coroutine factory producing a JSON-serializable response
+            supplied: False for content-hash keys (replayed for IDEMPOTENCY_CONTENT_TTL only)
+            status_code: Status code stored with the response
+
+        Returns:
+            (body, status_code, replayed)
+
+        Raises:
+            IdempotencyConflict: The original delivery is still running after IDEMPOTENCY_WAIT
+        """
+        digest = hashlib.sha256(f"{scope}:{key}".encode()).hexdigest()
+        try:
+            stored = await self._claim(digest, scope)
+        except IdempotencyConflict:
+            raise
+        except Exception as e:
+            # Storage outage: process rather than drop the delivery
+            logger.error(f"Idempotency claim failed, processing without deduplication: {str(e)}")
+            self.metrics["bypassed"] += 1
+            return await work(), status_code, False
+        if stored is not None:
+            return stored["body"], stored["status_code"], True
+
+        try:
+            body = await work()
+        except BaseException:
+            # Failed deliveries are not stored, so the sender's retry runs again
+            try:
+                await self.backend.release(digest)
+            except Exception as e:
+                logger.warning(f"Idempotency release failed: {str(e)}")
+            raise
+
+        self.metrics["processed"] += 1
+        try:
+            await self.backend.complete(digest, status_code, body, self.ttl if supplied else self.content_ttl)
+        except Exception as e:
+            logger.error(f"Idempotency store failed to save response: {str(e)}")
+        return body, status_code, False
+
+    async def close(self):
+        if self.backend is not None:
+            await self.backend.close()
+            self.backend = None
+
+    def stats(self) -> Dict:
+        return {"backend": self.backend.name if self.backend else None, **self.metrics}
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_idempotency_store: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    global _idempotency_store
+    if _idempotency_store is None:
+        _idempotency_store = IdempotencyStore()
+    return _idempotency_store
@@ -0,0 +1,171 @@
+"""
+Local Intent Classifier
+Hashing-vectorizer + TF-IDF + softmax regression, trained offline from stored
+messages labelled by the LLM (see train_intent_classifier.py). Answers in
+microseconds so the LLM classify call is only needed for low-confidence messages.
+"""
+
+import logging
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.response_cache import normalize_message
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ["SALES", "SUPPORT", "BOOKING", "OTHER"]
+
+
+class IntentClassifier:
+    """Multinomial logistic regression over hashed unigram + bigram features."""
+
+    def __init__(self, n_features: int = 2 ** 18):
+        self.n_features = n_features
+        self.classes: List[str] = list(INTENTS)
+        self.idf = np.ones(n_features, dtype=np.float32)
+        self.weights = np.zeros((n_features, len(self.classes)), dtype=np.float32)
+        self.bias = np.zeros(len(self.classes), dtype=np.float32)
+
+    # ------------------------------------------------------------------
+    # Features
+    # ------------------------------------------------------------------
+
+    def _hash_counts(self, text: str) -> Dict[int, float]:
+        tokens = normalize_message(text).split()
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        counts: Dict[int, float] = {}
+        for gram in grams:
+            index = zlib.crc32(gram.encode()) % self.n_features
+            counts[index] = counts.get(index, 0.0) + 1.0
+        return counts
+
+    def _vectorize(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse (indices, values) with sublinear TF, IDF weighting and L2 norm"""
+        counts = self._hash_counts(text)
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * self.idf[indices]
+        norm = float(np.linalg.norm(values))
+        return indices, values / norm if norm else values
+
+    # ------------------------------------------------------------------
+    # Training / inference
+    # ------------------------------------------------------------------
+
+    def fit(
+        self,
+        texts: List[str],
+        labels: List[str],
+        epochs: int = 200,
+        learning_rate: float = 5.0,
+        l2: float = 1e-4
+    ) -> "IntentClassifier":
+        """Fit IDF and softmax weights with full-batch gradient descent"""
+        self.classes = sorted(set(labels) | set(INTENTS))
+        n_samples, n_classes = len(texts), len(self.classes)
+        class_index = {label: i for i, label in enumerate(self.classes)}
+
+        # Document frequencies for IDF
+        doc_freq = np.zeros(self.n_features, dtype=np.float32)
+        hashed = [self._hash_counts(text) for text in texts]
+        for counts in hashed:
+            doc_freq[list(counts.keys())] += 1
+        self.idf = (np.log((1 + n_samples) / (1 + doc_freq)) + 1).astype(np.float32)
+
+        # COO design matrix
+        rows, cols, vals = [], [], []
+        for row, text in enumerate(texts):
+            indices, values = self._vectorize(text)
+            rows.append(np.full(len(indices), row, dtype=np.int64))
+            cols.append(indices)
+            vals.append(values)
+        rows, cols, vals = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)[:, None]
+
+        targets = np.zeros((n_samples, n_classes), dtype=np.float32)
+        targets[np.arange(n_samples), [class_index[label] for label in labels]] = 1.0
+
+        used = np.unique(cols)
+        weights = np.zeros((self.n_features, n_classes), dtype=np.float32)
+        bias = np.zeros(n_classes, dtype=np.float32)
+        for _ in range(epochs):
+            logits = np.tile(bias, (n_samples, 1))
+            np.add.at(logits, rows, weights[cols] * vals)
+            probs = self._softmax(logits)
+            error = (probs - targets) / n_samples
+            grad = np.zeros_like(weights)
+            np.add.at(grad, cols, error[rows] * vals)
+            weights[used] -= learning_rate * (grad[used] + l2 * weights[used])
+            bias -= learning_rate * error.sum(axis=0)
+
+        self.weights, self.bias = weights, bias
+        return self
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        shifted = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(shifted)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Return (intent, confidence)"""
+        indices, values = self._vectorize(text)
+        logits = self.bias + values @ self.weights[indices]
+        probs = self._softmax(logits)
+        best = int(np.argmax(probs))
+        return self.classes[best], float(probs[best])
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        used = np.flatnonzero(np.any(self.weights != 0, axis=1))
+        np.savez_compressed(
+            path,
+            n_features=self.n_features,
+            classes=np.array(self.classes),
+            idf=self.idf,
+            used=used,
+            weights=self.weights[used],
+            bias=self.bias,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        data = np.load(path, allow_pickle=False)
+        model = cls(int(data["n_features"]))
+        model.classes = [str(c) for c in data["classes"]]
+        model.idf = data["idf"]
+        model.weights = np.zeros((model.n_features, len(model.classes)), dtype=np.float32)
+        model.weights[data["used"]] = data["weights"]
+        model.bias = data["bias"]
+        return model
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_intent_classifier: Optional[IntentClassifier] = None
+_load_attempted = False
+
+
+def get_intent_classifier() -> Optional[IntentClassifier]:
+    """Load the trained model once; None when no model has been trained yet"""
+    global _intent_classifier, _load_attempted
+    if not _load_attempted:
+        _load_attempted = True
+        path = settings.INTENT_MODEL_PATH
+        if settings.INTENT_LOCAL_ENABLED and os.path.exists(path):
+            try:
+                _intent_classifier = IntentClassifier.load(path)
+                logger.info(f"Local intent classifier loaded from {path}")
+            except Exception as e:
+                logger.error(f"Failed to load intent classifier: {str(e)}")
+    return _intent_classifier
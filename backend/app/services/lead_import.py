@@ -0,0 +1,411 @@
+"""
+Bulk Lead Import
+Loads CSV or NDJSON lead lists (trade-show exports, CRM dumps) row by row
+from any line iterator, so memory use is bounded by the batch size and the
+customer index, never by the file.
+
+Customers are deduplicated on normalized email and phone through in-memory
+hash indexes that grow as the import runs; only keys not yet seen are looked
+up in the database, once per batch, through the normalized-key indexes (so
+"John@X.com" or "555-0100" stored by other paths still match). A row whose
+email and phone belong to two different customers is rejected. Each batch of IMPORT_BATCH_SIZE rows is
+written in one transaction with multi-row INSERTs and UPDATEs. A customer
+that already has a lead gets that lead updated instead of a duplicate.
+
+These are Core writes, so the lead read model and stats counters are synced
+explicitly in the same transaction.
+"""
+
+import csv
+import json
+import logging
+import re
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.database import get_engine
+from app.models import Customer, Lead, LeadStatus, email_key, phone_key
+from app.services import lead_read_model
+from app.services.stats_service import record as record_stats
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson")
+
+CUSTOMER_FIELDS = ["name", "email", "phone", "company", "business_type", "location"]
+LEAD_FIELDS = ["status", "quality_score", "requirements", "timeline", "budget", "priority", "notes", "assigned_to"]
+
+# Identity columns are never overwritten on an existing customer (both are unique)
+_CUSTOMER_UPDATE_FIELDS = ["name", "company", "business_type", "location"]
+
+# Common export headings -> model fields
+COLUMN_ALIASES = {
+    "full_name": "name",
+    "contact_name": "name",
+    "email_address": "email",
+    "e-mail": "email",
+    "phone_number": "phone",
+    "mobile": "phone",
+    "company_name": "company",
+    "organization": "company",
+    "score": "quality_score",
+    "owner": "assigned_to",
+}
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+_CHUNK = 500
+
+_PHONE_LENGTH = Customer.__table__.c.phone.type.length
+
+
+def normalize_email(value) -> Optional[str]:
+    email = str(value or "").strip().lower()
+    return email or None
+
+
+def normalize_phone(value) -> Optional[str]:
+    """Digits only, keeping a leading + (so "+1 (555) 010-0000" == "+15550100000")"""
+    raw = str(value or "").strip()
+    digits = re.sub(r"\D", "", raw)
+    if not digits:
+        return None
+    return ("+" if raw.startswith("+") else "") + digits
+
+
+def _column(heading: str) -> str:
+    key = heading.strip().lower().replace(" ", "_")
+    return COLUMN_ALIASES.get(key, key)
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _chunks(values: List) -> Iterator[List]:
+    for start in range(0, len(values), _CHUNK):
+        yield values[start:start + _CHUNK]
+
+
+def iter_rows(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, object]]:
+    """
+    Parse an import stream incrementally
+
+    Args:
+        lines: Text lines (an open file, or a decoded upload)
+        fmt: "csv" (header row required) or "ndjson"
+
+    Yields:
+        (line number, dict of fields) or (line number, ValueError) for unparseable rows
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        if reader.fieldnames is None:
+            return
+        reader.fieldnames = [_column(heading) for heading in reader.fieldnames]
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield reader.line_num, ValueError(f"Malformed CSV: {e}")
+                continue
+            row.pop(None, None)
+            yield reader.line_num, row
+    elif fmt == "ndjson":
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield number, ValueError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(row, dict):
+                yield number, ValueError("Each line must be a JSON object")
+                continue
+            yield number, {_column(key): value for key, value in row.items()}
+    else:
+        raise ValueError(f"Unsupported import format: {fmt} (expected one of {', '.join(FORMATS)})")
+
+
+def parse_row(row: Dict) -> Tuple[Dict, Dict]:
+    """
+    Split and validate one import row
+
+    Returns:
+        (customer fields, lead fields) with empty values dropped
+
+    Raises:
+        ValueError: The row cannot be imported
+    """
+    customer = {field: _text(row.get(field)) for field in CUSTOMER_FIELDS}
+    customer["email"] = normalize_email(customer["email"])
+    customer["phone"] = normalize_phone(customer["phone"])
+    if not customer["email"] and not customer["phone"]:
+        raise ValueError("email or phone required")
+    if customer["email"] and "@" not in customer["email"]:
+        raise ValueError(f"Invalid email: {customer['email']}")
+    if customer["phone"] and len(customer["phone"]) > _PHONE_LENGTH:
+        raise ValueError(f"Phone number too long: {customer['phone']}")
+
+    lead = {field: _text(row.get(field)) for field in LEAD_FIELDS}
+    if lead["status"]:
+        try:
+            lead["status"] = LeadStatus(lead["status"].lower())
+        except ValueError:
+            raise ValueError(f"Invalid status: {lead['status']}")
+    if lead["quality_score"]:
+        try:
+            lead["quality_score"] = float(lead["quality_score"])
+        except ValueError:
+            raise ValueError(f"Invalid quality_score: {lead['quality_score']}")
+    if lead["priority"]:
+        lead["priority"] = lead["priority"].lower()
+
+    return (
+        {key: value for key, value in customer.items() if value is not None},
+        {key: value for key, value in lead.items() if value is not None},
+    )
+
+
+def _fill(target: Dict, values: Dict):
+    """Merge a later row into a pending write (later non-empty values win)"""
+    target.update(values)
+
+
+def _short_error(error: Exception) -> str:
+    """Driver message without SQLAlchemy's statement / parameter dump"""
+    message = str(getattr(error, "orig", None) or error).splitlines()[0]
+    return message[:200]
+
+
+class LeadImporter:
+    """One import run; holds the customer and lead indexes between batches"""
+
+    def __init__(self, batch_size: Optional[int] = None, max_errors: Optional[int] = None):
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.max_errors = settings.IMPORT_MAX_ERRORS if max_errors is None else max_errors
+        # normalized email / phone -> customer id, customer id -> lead id
+        self.by_email: Dict[str, str] = {}
+        self.by_phone: Dict[str, str] = {}
+        self.lead_by_customer: Dict[str, str] = {}
+        self.result = {
+            "rows": 0,
+            "imported": 0,
+            "failed": 0,
+            "customers_created": 0,
+            "customers_updated": 0,
+            "leads_created": 0,
+            "leads_updated": 0,
+            "errors": [],
+        }
+
+    def _error(self, row: int, message: str):
+        self.result["failed"] += 1
+        if len(self.result["errors"]) < self.max_errors:
+            self.result["errors"].append({"row": row, "error": message})
+
+    def run(self, lines: Iterable[str], fmt: str = "csv") -> Dict:
+        """
+        Import every row of a CSV / NDJSON stream
+
+        Args:
+            lines: Text lines
+            fmt: "csv" or "ndjson"
+
+        Returns:
+            Row, customer and lead totals plus row-level errors
+        """
+        started = time.perf_counter()
+        batch: List[Tuple[int, Dict, Dict]] = []
+        for number, row in iter_rows(lines, fmt):
+            self.result["rows"] += 1
+            if isinstance(row, Exception):
+                self._error(number, str(row))
+                continue
+            try:
+                customer, lead = parse_row(row)
+            except ValueError as e:
+                self._error(number, str(e))
+                continue
+            batch.append((number, customer, lead))
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+        self.result["errors_truncated"] = self.result["failed"] > len(self.result["errors"])
+        self.result["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"Lead import: {self.result['imported']}/{self.result['rows']} rows, "
+            f"{self.result['leads_created']} leads created, {self.result['failed']} failed"
+        )
+        return {"success": True, **self.result}
+
+    def _write(self, batch: List[Tuple[int, Dict, Dict]]):
+        try:
+            with get_engine().begin() as conn:
+                counts, indexes, rejected = self._upsert(conn, batch)
+        except Exception as e:
+            logger.error(f"Lead import batch failed (rows {batch[0][0]}-{batch[-1][0]}): {_short_error(e)}")
+            for number, _, _ in batch:
+                self._error(number, f"Batch failed: {_short_error(e)}")
+            return
+
+        for number, message in rejected:
+            self._error(number, message)
+
+        # Only committed rows enter the indexes
+        by_email, by_phone, lead_by_customer = indexes
+        self.by_email.update(by_email)
+        self.by_phone.update(by_phone)
+        self.lead_by_customer.update(lead_by_customer)
+        for key, value in counts.items():
+            self.result[key] += value
+        self.result["imported"] += len(batch) - len(rejected)
+
+    def _lookup_customers(self, conn: Connection, batch) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Database matches for emails / phones this import has not seen yet"""
+        emails = sorted({c["email"] for _, c, _ in batch if "email" in c and c["email"] not in self.by_email})
+        phones = sorted({c["phone"] for _, c, _ in batch if "phone" in c and c["phone"] not in self.by_phone})
+        by_email: Dict[str, str] = {}
+        by_phone: Dict[str, str] = {}
+        for key, values in ((email_key(Customer.email), emails), (phone_key(Customer.phone), phones)):
+            for chunk in _chunks(values):
+                for customer_id, email, phone in conn.execute(
+                    select(Customer.id, Customer.email, Customer.phone).where(key.in_(chunk))
+                ):
+                    if email:
+                        by_email.setdefault(normalize_email(email), customer_id)
+                    if phone:
+                        by_phone.setdefault(normalize_phone(phone), customer_id)
+        return by_email, by_phone
+
+    def _upsert(self, conn: Connection, batch):
+        by_email, by_phone = self._lookup_customers(conn, batch)
+        now = datetime.utcnow()
+        new_customers: Dict[str, Dict] = {}
+        customer_updates: Dict[str, Dict] = {}
+        rows: List[Tuple[str, Dict]] = []
+        rejected: List[Tuple[int, str]] = []
+
+        for number, customer, lead in batch:
+            email, phone = customer.get("email"), customer.get("phone")
+            email_match = email and (by_email.get(email) or self.by_email.get(email))
+            phone_match = phone and (by_phone.get(phone) or self.by_phone.get(phone))
+            if email_match and phone_match and email_match != phone_match:
+                rejected.append((number, f"Email {email} and phone {phone} belong to different customers"))
+                continue
+            customer_id = email_match or phone_match
+            if customer_id in new_customers:
+                pending = new_customers[customer_id]
+                if (email and pending.get("email", email) != email) or (phone and pending.get("phone", phone) != phone):
+                    rejected.append((number, "Email or phone conflicts with an earlier row for the same customer"))
+                    continue
+            if not customer_id:
+                customer_id = str(uuid.uuid4())
+                new_customers[customer_id] = {
+                    "id": customer_id, "name": "Unknown", "status": "active", "tier": "standard",
+                    "created_at": now, "updated_at": now,
+                }
+            if customer_id in new_customers:
+                _fill(new_customers[customer_id], customer)
+                # A later row may add the phone for an email-only contact (or vice versa)
+                email, phone = new_customers[customer_id].get("email"), new_customers[customer_id].get("phone")
+            else:
+                updates = {key: customer[key] for key in _CUSTOMER_UPDATE_FIELDS if key in customer}
+                if updates:
+                    _fill(customer_updates.setdefault(customer_id, {}), updates)
+            if email:
+                by_email.setdefault(email, customer_id)
+            if phone:
+                by_phone.setdefault(phone, customer_id)
+            rows.append((customer_id, lead))
+
+        # Existing leads of customers first seen in this batch (newest lead wins)
+        lead_by_customer: Dict[str, str] = {}
+        unseen = [cid for cid in {cid for cid, _ in rows}
+                  if cid not in new_customers and cid not in self.lead_by_customer]
+        for chunk in _chunks(unseen):
+            for customer_id, lead_id in conn.execute(
+                select(Lead.customer_id, Lead.id).where(Lead.customer_id.in_(chunk))
+                .order_by(Lead.created_at.desc(), Lead.id.desc())
+            ):
+                lead_by_customer.setdefault(customer_id, lead_id)
+
+        new_leads: Dict[str, Dict] = {}
+        lead_updates: Dict[str, Dict] = {}
+        for customer_id, lead in rows:
+            lead_id = lead_by_customer.get(customer_id) or self.lead_by_customer.get(customer_id)
+            if lead_id is None:
+                lead_id = str(uuid.uuid4())
+                lead_by_customer[customer_id] = lead_id
+                new_leads[lead_id] = {
+                    "id": lead_id, "customer_id": customer_id, "status": LeadStatus.NEW,
+                    "quality_score": 0.0, "created_at": now, "updated_at": now,
+                }
+            if lead_id in new_leads:
+                _fill(new_leads[lead_id], lead)
+            elif lead:
+                _fill(lead_updates.setdefault(lead_id, {}), lead)
+
+        if new_customers:
+            conn.execute(insert(Customer), _uniform(new_customers.values(), CUSTOMER_FIELDS))
+        if customer_updates:
+            _update_many(conn, Customer, customer_updates, _CUSTOMER_UPDATE_FIELDS, now)
+        if new_leads:
+            conn.execute(insert(Lead), _uniform(new_leads.values(), LEAD_FIELDS))
+        if lead_updates:
+            _update_many(conn, Lead, lead_updates, LEAD_FIELDS, now)
+
+        lead_read_model.sync_customers(conn, customer_updates)
+        lead_read_model.sync_leads(conn, list(new_leads) + list(lead_updates))
+        if new_leads:
+            record_stats(conn, [("leads.created", "", now, len(new_leads))])
+
+        counts = {
+            "customers_created": len(new_customers),
+            "customers_updated": len(customer_updates),
+            "leads_created": len(new_leads),
+            "leads_updated": len(lead_updates),
+        }
+        return counts, (by_email, by_phone, lead_by_customer), rejected
+
+
+def _uniform(rows: Iterable[Dict], fields: List[str]) -> List[Dict]:
+    """Same keys in every row, so the insert runs as one multi-row statement"""
+    return [{field: None for field in fields} | row for row in rows]
+
+
+def _update_many(conn: Connection, model, updates: Dict[str, Dict], fields: List[str], now: datetime):
+    """One executemany UPDATE; fields a row does not carry keep their current value"""
+    columns = {field: getattr(model, field) for field in fields}
+    stmt = (
+        update(model)
+        .where(model.id == bindparam("_id"))
+        .values({
+            field: func.coalesce(bindparam(f"_{field}", type_=column.type), column)
+            for field, column in columns.items()
+        } | {"updated_at": bindparam("_updated_at")})
+        .execution_options(synchronize_session=False)
+    )
+    conn.execute(stmt, [
+        {"_id": row_id, "_updated_at": now, **{f"_{field}": values.get(field) for field in fields}}
+        for row_id, values in updates.items()
+    ])
+
+
+def import_leads(lines: Iterable[str], fmt: str = "csv", batch_size: Optional[int] = None) -> Dict:
+    """Run one import; see LeadImporter.run"""
+    return LeadImporter(batch_size=batch_size).run(lines, fmt)
@@ -0,0 +1,226 @@
+"""
+Lead Read Model
+Maintains lead_listings (each lead flattened with its customer's name,
+company, email and phone) and lead_counts (leads per status and priority)
+for the dashboard and lead list. Both are updated from an ORM after_flush
+hook, inside the same transaction as the lead/customer write, so list pages
+and counts are a single indexed read with no join or Python-side aggregation.
+
+Writes that bypass the ORM unit of work (bulk_insert_mappings, Core
+insert/update) must call sync_leads / sync_customers themselves.
+"""
+
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Customer, Lead, LeadCount, LeadListing, LeadStatus
+from app.utils.counters import increment_counters
+
+logger = logging.getLogger(__name__)
+
+UNSET = "none"
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+_CHUNK = 500
+
+_LISTING_FIELDS = [
+    "lead_id", "customer_id", "status", "quality_score", "requirements", "timeline", "budget",
+    "priority", "assigned_to", "name", "company", "email", "phone", "created_at", "updated_at",
+]
+
+_CUSTOMER_FIELDS = ["name", "company", "email", "phone"]
+
+
+def status_key(status) -> str:
+    """lead_counts value for a lead status (enum, name or value)"""
+    if status is None:
+        return UNSET
+    if isinstance(status, LeadStatus):
+        return status.value
+    try:
+        return LeadStatus(status).value
+    except ValueError:
+        return LeadStatus[status].value
+
+
+def priority_key(priority: Optional[str]) -> str:
+    return priority or UNSET
+
+
+def _chunks(ids: Iterable[str]):
+    ids = list(ids)
+    for start in range(0, len(ids), _CHUNK):
+        yield ids[start:start + _CHUNK]
+
+
+def _listing_source(lead_ids: Optional[List[str]] = None):
+    """leads LEFT JOIN customers, in lead_listings column order"""
+    stmt = select(
+        Lead.id, Lead.customer_id, Lead.status, Lead.quality_score, Lead.requirements, Lead.timeline,
+        Lead.budget, Lead.priority, Lead.assigned_to, Customer.name, Customer.company, Customer.email,
+        Customer.phone, Lead.created_at, Lead.updated_at
+    ).select_from(Lead).outerjoin(Customer, Lead.customer_id == Customer.id)
+    if lead_ids is not None:
+        stmt = stmt.where(Lead.id.in_(lead_ids))
+    return stmt
+
+
+def _count_keys(rows) -> Counter:
+    counts = Counter()
+    for status, priority in rows:
+        counts[("status", status_key(status))] += 1
+        counts[("priority", priority_key(priority))] += 1
+    return counts
+
+
+def _apply_count_deltas(conn: Connection, deltas: Counter):
+    increment_counters(conn, LeadCount, [
+        {"dimension": dimension, "value": value, "count": delta}
+        for (dimension, value), delta in deltas.items()
+    ])
+
+
+def sync_leads(conn: Connection, lead_ids: Iterable[str]):
+    """
+    Rewrite the listings of the given leads and adjust counts by the difference
+
+    Args:
+        conn: Connection in the writing transaction
+        lead_ids: Leads inserted, updated or deleted in that transaction
+    """
+    deltas = Counter()
+    for chunk in _chunks(set(lead_ids)):
+        current = select(LeadListing.status, LeadListing.priority).where(LeadListing.lead_id.in_(chunk))
+        deltas.subtract(_count_keys(conn.execute(current)))
+        conn.execute(delete(LeadListing).where(LeadListing.lead_id.in_(chunk)))
+        conn.execute(insert(LeadListing).from_select(_LISTING_FIELDS, _listing_source(chunk)))
+        deltas.update(_count_keys(conn.execute(current)))
+    _apply_count_deltas(conn, deltas)
+
+
+def sync_customers(conn: Connection, customer_ids: Iterable[str]):
+    """
+    Copy customer contact fields onto their leads' listings
+
+    Args:
+        conn: Connection in the writing transaction
+        customer_ids: Customers updated in that transaction
+    """
+    for chunk in _chunks(set(customer_ids)):
+        conn.execute(
+            update(LeadListing)
+            .where(LeadListing.customer_id.in_(chunk))
+            .values({
+                field: select(getattr(Customer, field))
+                    .where(Customer.id == LeadListing.customer_id)
+                    .scalar_subquery()
+                for field in _CUSTOMER_FIELDS
+            })
+        )
+
+
+def reconcile_counts(conn: Connection) -> int:
+    """Recount lead_counts from the leads table; returns the number of leads"""
+    conn.execute(delete(LeadCount))
+    counts = Counter()
+    for status, priority, count in conn.execute(
+        select(Lead.status, Lead.priority, func.count()).group_by(Lead.status, Lead.priority)
+    ):
+        counts[("status", status_key(status))] += count
+        counts[("priority", priority_key(priority))] += count
+    _apply_count_deltas(conn, counts)
+    return sum(count for (dimension, _), count in counts.items() if dimension == "status")
+
+
+def rebuild(conn: Connection) -> Dict:
+    """Recreate both read models from leads and customers"""
+    conn.execute(delete(LeadListing))
+    conn.execute(insert(LeadListing).from_select(_LISTING_FIELDS, _listing_source()))
+    total = reconcile_counts(conn)
+    logger.info(f"Lead read model rebuilt: {total} leads")
+    return {"success": True, "leads": total}
+
+
+def _after_flush(session: Session, flush_context):
+    lead_ids = set()
+    customer_ids = set()
+    for obj in session.new:
+        if isinstance(obj, Lead):
+            lead_ids.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, (Lead, Customer)) and session.is_modified(obj, include_collections=False):
+            (lead_ids if isinstance(obj, Lead) else customer_ids).add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Lead):
+            lead_ids.add(obj.id)
+    if not lead_ids and not customer_ids:
+        return
+
+    conn = session.connection()
+    if customer_ids:
+        sync_customers(conn, customer_ids)
+    if lead_ids:
+        sync_leads(conn, lead_ids)
+
+
+def register_listeners():
+    """Keep the read models in step with every ORM flush; safe to call more than once"""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def listing_response(row: LeadListing) -> Dict:
+    """LeadResponse dict for a lead_listings row"""
+    return {
+        "id": row.lead_id,
+        "customer_id": row.customer_id,
+        "status": status_key(row.status) if row.status is not None else None,
+        "quality_score": row.quality_score,
+        "requirements": row.requirements,
+        "timeline": row.timeline,
+        "budget": row.budget,
+        "priority": row.priority,
+        "assigned_to": row.assigned_to,
+        "name": row.name,
+        "company": row.company,
+        "email": row.email,
+        "phone": row.phone,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+
+
+async def get_lead_summary(db: AsyncSession, recent: int = 5) -> Dict:
+    """
+    Dashboard lead summary
+
+    Args:
+        db: Async database session
+        recent: Number of newest leads to include
+
+    Returns:
+        Total, counts by status and priority, and the newest leads
+    """
+    by_dimension: Dict[str, Dict[str, int]] = {"status": {}, "priority": {}}
+    for row in (await db.execute(select(LeadCount).where(LeadCount.count > 0))).scalars():
+        by_dimension.setdefault(row.dimension, {})[row.value] = row.count
+
+    newest = await db.execute(
+        select(LeadListing).order_by(LeadListing.created_at.desc(), LeadListing.lead_id.desc()).limit(recent)
+    )
+    return {
+        "total": sum(by_dimension["status"].values()),
+        "by_status": by_dimension["status"],
+        "by_priority": by_dimension["priority"],
+        "recent": [listing_response(row) for row in newest.scalars()],
+    }
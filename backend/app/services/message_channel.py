@@ -6,6 +6,8 @@ Handles multiple communication channels (SMS, Email, Chat, Forms)
 import logging
 from typing import Dict, Optional
 from abc import ABC, abstractmethod
+from app.services.email_engine import get_email_engine
+from app.services.sms_engine import get_sms_engine
 
 logger = logging.getLogger(__name__)
 
@@ -26,38 +28,14 @@ class ChannelHandler(ABC):
 class SMSHandler(ChannelHandler):
     """SMS message handler using Twilio"""
     
-    def __init__(self):
-        from app.core.config import settings
-        try:
-            from twilio.rest import Client
-            self.client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-            self.phone_number = settings.TWILIO_PHONE_NUMBER
-        except Exception as e:
-            logger.error(f"Error initializing SMS handler: {str(e)}")
-    
     async def send_message(self, recipient: str, content: str, **kwargs) -> Dict:
-        """Send SMS message"""
-        try:
-            message = self.client.messages.create(
-                body=content,
-                from_=self.phone_number,
-                to=recipient
-            )
-            
-            logger.info(f"SMS sent to {recipient}: {message.sid}")
-            
-            return {
-                "success": True,
-                "channel": "sms",
-                "message_id": message.sid,
-                "status": message.status
-            }
-        except Exception as e:
-            logger.error(f"Error sending SMS: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        """Send SMS message (non-blocking, rate-limited per sender number)"""
+        return await get_sms_engine().send(
+            recipient,
+            content,
+            media_url=kwargs.get("media_url"),
+            status_callback=kwargs.get("status_callback")
+        )
     
     async def receive_message(self, data: Dict) -> Dict:
         """Process incoming SMS"""
@@ -73,43 +51,14 @@ class SMSHandler(ChannelHandler):
 class EmailHandler(ChannelHandler):
     """Email message handler using SendGrid or SMTP"""
     
-    def __init__(self):
-        from app.core.config import settings
-        self.api_key = settings.SENDGRID_API_KEY
-        self.sender_email = settings.SMTP_USER
-    
     async def send_message(self, recipient: str, content: str, **kwargs) -> Dict:
-        """Send email message"""
-        try:
-            from sendgrid import SendGridAPIClient
-            from sendgrid.helpers.mail import Mail
-            
-            subject = kwargs.get("subject", "Message from AI Automation System")
-            
-            message = Mail(
-                from_email=self.sender_email,
-                to_emails=recipient,
-                subject=subject,
-                plain_text_content=content
-            )
-            
-            sg = SendGridAPIClient(self.api_key)
-            response = sg.send(message)
-            
-            logger.info(f"Email sent to {recipient}: {response.status_code}")
-            
-            return {
-                "success": True,
-                "channel": "email",
-                "recipient": recipient,
-                "status_code": response.status_code
-            }
-        except Exception as e:
-            logger.error(f"Error sending email: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        """Send email message (pooled SMTP sessions or the SendGrid API, per EMAIL_BACKEND)"""
+        return await get_email_engine().send(
+            recipient,
+            kwargs.get("subject", "Message from AI Automation System"),
+            content,
+            html=kwargs.get("html")
+        )
     
     async def receive_message(self, data: Dict) -> Dict:
         """Process incoming email (webhook)"""
@@ -197,19 +146,20 @@ class FormHandler(ChannelHandler):
 class ChannelFactory:
     """Factory for creating channel handlers"""
     
+    # Shared handler instances, so SDK clients are built once per process
     _handlers = {
-        "sms": SMSHandler,
-        "email": EmailHandler,
-        "chat": ChatHandler,
-        "form": FormHandler
+        "sms": lambda: get_sms_handler(),
+        "email": lambda: get_email_handler(),
+        "chat": lambda: get_chat_handler(),
+        "form": lambda: get_form_handler()
     }
     
     @classmethod
     def get_handler(cls, channel: str) -> Optional[ChannelHandler]:
         """Get appropriate handler for channel"""
-        handler_class = cls._handlers.get(channel.lower())
-        if handler_class:
-            return handler_class()
+        handler_factory = cls._handlers.get(channel.lower())
+        if handler_factory:
+            return handler_factory()
         
         logger.warning(f"Unknown channel: {channel}")
         return None
@@ -225,7 +175,7 @@ class ChannelFactory:
         """Send message through specified channel"""
         handler = cls.get_handler(channel)
         if not handler:
-            return {"success": False, "error": f"Unknown channel: {channel}"}
+            return {"success": False, "error": f"Unknown channel: {channel}", "permanent": True}
         
         return await handler.send_message(recipient, content, **kwargs)
 
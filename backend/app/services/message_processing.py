@@ -0,0 +1,77 @@
+"""
+Inbound Message Processing Jobs
+Background handlers for the AI reply pipeline queued by /api/messages/receive
+"""
+
+import logging
+from typing import Dict
+
+from app.core.database import SessionLocal, get_database_registry
+from app.core.job_queue import get_job_queue
+from app.models import Message
+from app.services.ai_service import get_ai_service
+from app.services.message_channel import ChannelFactory
+
+logger = logging.getLogger(__name__)
+
+PROCESS_INBOUND_MESSAGE = "process_inbound_message"
+
+job_queue = get_job_queue()
+
+
+@job_queue.register(PROCESS_INBOUND_MESSAGE)
+async def process_inbound_message(payload: Dict) -> None:
+    """
+    Generate the AI reply for a stored inbound message and deliver it
+
+    Safe to retry: the AI step is skipped when a previous attempt already
+    stored the reply, so a failed delivery only re-runs the send. Only
+    transient failures raise (and are retried); a message that can never be
+    delivered - no handler for its channel, no recipient address, a channel
+    that is not configured, a rejected recipient - is logged and dropped.
+    """
+    await get_database_registry().ensure_initialized()
+    db = SessionLocal()
+    try:
+        msg = db.query(Message).filter(Message.id == payload["message_id"]).first()
+        if not msg:
+            logger.warning(f"Message {payload['message_id']} no longer exists, dropping job")
+            return
+
+        customer = msg.customer
+        channel = msg.channel.value if hasattr(msg.channel, "value") else msg.channel
+        recipient = customer.email if channel == "email" else customer.phone
+        if not msg.processed:
+            ai_service = get_ai_service()
+            ai_result = await ai_service.process_message(
+                msg.content,
+                context={
+                    "company": customer.company,
+                    "name": customer.name
+                }
+            )
+            if not ai_result.get("success"):
+                raise RuntimeError(ai_result.get("error", "AI processing failed"))
+
+            msg.ai_response = ai_result.get("response")
+            msg.processed = True
+            db.commit()
+
+        # The reply is stored either way; only the delivery is abandoned
+        if ChannelFactory.get_handler(channel) is None or not recipient:
+            logger.error(f"Message {msg.id}: no way to reply on {channel} to customer {customer.id}, dropping job")
+            return
+
+        send_result = await ChannelFactory.send_message(
+            channel=channel,
+            recipient=recipient,
+            content=msg.ai_response
+        )
+        if send_result.get("success"):
+            return
+        if send_result.get("permanent"):
+            logger.error(f"Message {msg.id}: reply cannot be delivered ({send_result.get('error')}), dropping job")
+            return
+        raise RuntimeError(send_result.get("error", "Delivery failed"))
+    finally:
+        db.close()
@@ -1,46 +1,40 @@
 """
 Openclaw Agent Service - Advanced AI Lead Automation Agent
 Handles intelligent lead scoring, routing, and automated follow-ups
-with AWS S3 integration for agent persistence
+with batched S3 (or local filesystem) persistence via the agent store
 """
 
+import asyncio
 import logging
 import json
-import boto3
-from typing import List, Dict, Optional, Any
+import uuid
+import numpy as np
+from typing import List, Dict, Optional, Any, AsyncIterator
 from datetime import datetime
 from app.core.config import settings
+from app.services.agent_store import get_agent_store
 
 logger = logging.getLogger(__name__)
 
+TARGET_INDUSTRIES = ["technology", "finance", "healthcare", "retail"]
+RANK_LABELS = ["A", "B", "C", "D", "F"]
+RECOMMENDATIONS = [
+    "Immediate follow-up recommended",
+    "Schedule follow-up within 24 hours",
+    "Add to nurture campaign",
+    "Keep in database for future engagement",
+    "Consider removing from active pipeline",
+]
+
 
 class OpenclawAgent:
     """Advanced agent for lead automation and management"""
     
     def __init__(self):
-        """Initialize Openclaw agent with AWS S3 integration"""
-        self.s3_client = None
-        self.bucket_name = settings.AWS_S3_BUCKET
+        """Initialize Openclaw agent with the batched persistence store"""
+        self.store = get_agent_store()
         self.agent_id = "openclaw_agent_001"
         self.version = "1.0.0"
-        
-        # Initialize S3 if AWS credentials are available
-        if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-            self._initialize_s3()
-    
-    def _initialize_s3(self):
-        """Initialize AWS S3 client"""
-        try:
-            self.s3_client = boto3.client(
-                's3',
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION
-            )
-            logger.info(f"AWS S3 client initialized for bucket: {self.bucket_name}")
-        except Exception as e:
-            logger.error(f"Failed to initialize S3 client: {str(e)}")
-            self.s3_client = None
     
     async def score_lead(self, lead_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -104,8 +98,7 @@ class OpenclawAgent:
         
         # Industry fit factor (0-15)
         industry = lead_data.get("industry", "")
-        target_industries = ["technology", "finance", "healthcare", "retail"]
-        if industry.lower() in target_industries:
+        if industry.lower() in TARGET_INDUSTRIES:
             score += 15
         
         # Contact quality factor (0-10)
@@ -118,6 +111,89 @@ class OpenclawAgent:
         
         return min(score, 100.0)  # Cap at 100
     
+    def _to_columns(self, leads: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Convert lead dicts into columnar arrays (missing values count as 0 / empty)"""
+        industry_codes = {name: code for code, name in enumerate(TARGET_INDUSTRIES)}
+        return {
+            "company_size": np.array([lead.get("company_size") or 0 for lead in leads], dtype=np.float64),
+            "engagement_rate": np.array([lead.get("engagement_rate") or 0 for lead in leads], dtype=np.float64),
+            "budget": np.array([lead.get("budget") or 0 for lead in leads], dtype=np.float64),
+            "industry_code": np.array(
+                [industry_codes.get((lead.get("industry") or "").lower(), -1) for lead in leads],
+                dtype=np.int16,
+            ),
+            "has_email": np.array([bool(lead.get("email")) and "@" in lead.get("email") for lead in leads]),
+            "has_phone": np.array([bool(lead.get("phone")) for lead in leads]),
+        }
+    
+    def _calculate_lead_scores(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized _calculate_lead_score over columnar input"""
+        company_size = columns["company_size"]
+        budget = columns["budget"]
+        
+        score = np.select(
+            [company_size > 100, company_size > 50, company_size > 10], [20.0, 15.0, 10.0], 0.0
+        )
+        score += np.minimum(columns["engagement_rate"] * 30, 30)
+        score += np.select([budget > 50000, budget > 10000, budget > 1000], [25.0, 20.0, 10.0], 0.0)
+        score += np.where(columns["industry_code"] >= 0, 15.0, 0.0)
+        
+        contacts = columns["has_email"].astype(np.int8) + columns["has_phone"].astype(np.int8)
+        score += np.select([contacts == 2, contacts == 1], [10.0, 5.0], 0.0)
+        
+        return np.minimum(score, 100.0)
+    
+    def _rank_indices(self, scores: np.ndarray) -> np.ndarray:
+        """Index into RANK_LABELS / RECOMMENDATIONS for each score"""
+        return np.select([scores >= 80, scores >= 60, scores >= 40, scores >= 20], [0, 1, 2, 3], 4)
+    
+    def _score_chunk(self, leads: List[Dict[str, Any]], timestamp: str) -> List[Dict[str, Any]]:
+        """Score one chunk of leads and build result records"""
+        scores = self._calculate_lead_scores(self._to_columns(leads))
+        ranks = self._rank_indices(scores)
+        return [
+            {
+                "lead_id": lead.get("id"),
+                "score": float(score),
+                "rank": RANK_LABELS[rank],
+                "timestamp": timestamp,
+                "agent_id": self.agent_id,
+                "recommendation": RECOMMENDATIONS[rank]
+            }
+            for lead, score, rank in zip(leads, scores.tolist(), ranks.tolist())
+        ]
+    
+    async def score_leads_batch(self, leads: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Score many leads in one vectorized pass
+        
+        Args:
+            leads: List of lead dictionaries
+            
+        Returns:
+            Batch ID and per-lead score records; results are persisted
+            to S3 as a single NDJSON object
+        """
+        batch_id = str(uuid.uuid4())
+        results = self._score_chunk(leads, datetime.utcnow().isoformat())
+        await self._save_ndjson_to_s3(f"batches/{batch_id}/scores.ndjson", results)
+        return {"batch_id": batch_id, "scores": results}
+    
+    async def stream_batch_scores(self, leads: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """
+        Score leads chunk by chunk, yielding NDJSON lines as each chunk finishes
+        
+        Each chunk is persisted as one S3 part object.
+        """
+        batch_id = str(uuid.uuid4())
+        chunk_size = settings.AGENT_BATCH_CHUNK_SIZE
+        for part, start in enumerate(range(0, len(leads), chunk_size)):
+            results = self._score_chunk(leads[start:start + chunk_size], datetime.utcnow().isoformat())
+            await self._save_ndjson_to_s3(f"batches/{batch_id}/part-{part:05d}.ndjson", results)
+            yield "".join(json.dumps(record) + "\n" for record in results)
+            # Let other requests run between chunks
+            await asyncio.sleep(0)
+    
     def _get_rank(self, score: float) -> str:
         """Get rank based on score"""
         if score >= 80:
@@ -239,7 +315,7 @@ class OpenclawAgent:
                 "agent_id": self.agent_id,
                 "version": self.version,
                 "status": "active",
-                "s3_enabled": self.s3_client is not None,
+                "s3_enabled": self.store.enabled,
                 "timestamp": datetime.utcnow().isoformat(),
                 "capabilities": [
                     "lead_scoring",
@@ -254,39 +330,27 @@ class OpenclawAgent:
             return {"error": str(e), "agent_id": self.agent_id}
     
     async def _save_to_s3(self, key: str, data: Dict[str, Any]) -> bool:
-        """Save agent data to AWS S3"""
-        if not self.s3_client or not self.bucket_name:
-            logger.warning("S3 client not available, skipping save")
-            return False
-        
-        try:
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=key,
-                Body=json.dumps(data, indent=2),
-                ContentType='application/json'
-            )
-            logger.info(f"Saved data to S3: {key}")
-            return True
-        except Exception as e:
-            logger.error(f"Error saving to S3: {str(e)}")
-            return False
+        """Buffer agent data for the next batched write"""
+        return await self.store.record(key, data)
+    
+    async def _save_ndjson_to_s3(self, key: str, records: List[Dict[str, Any]]) -> bool:
+        """Save a batch of records as one compressed NDJSON object"""
+        return await self.store.put_records(f"{key}.gz", records)
     
     async def load_from_s3(self, key: str) -> Optional[Dict[str, Any]]:
-        """Load agent data from AWS S3"""
-        if not self.s3_client or not self.bucket_name:
-            logger.warning("S3 client not available, skipping load")
-            return None
-        
-        try:
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-            data = json.loads(response['Body'].read().decode('utf-8'))
-            logger.info(f"Loaded data from S3: {key}")
-            return data
-        except Exception as e:
-            logger.error(f"Error loading from S3: {str(e)}")
-            return None
+        """Load agent data (read-through cached)"""
+        return await self.store.get(key)
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_openclaw_agent: Optional[OpenclawAgent] = None
 
 
-# Initialize global agent instance
-openclaw_agent = OpenclawAgent()
+def get_openclaw_agent() -> OpenclawAgent:
+    global _openclaw_agent
+    if _openclaw_agent is None:
+        _openclaw_agent = OpenclawAgent()
+    return _openclaw_agent
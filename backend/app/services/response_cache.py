@@ -0,0 +1,193 @@
+"""
+AI Response Cache
+Two-tier cache (in-process LRU + Redis) for AI replies to near-identical
+inbound messages. Keys cover the normalized message, the reply context,
+the configured models and the live system prompt, so a change to the
+business settings naturally moves to a fresh key space.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ai_cache:"
+REDIS_RETRY_SECONDS = 60
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = _PUNCTUATION.sub(" ", message.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class ResponseCache:
+    """In-process LRU in front of a shared Redis tier."""
+
+    def __init__(self):
+        self.enabled = settings.AI_CACHE_ENABLED
+        self.ttl = settings.AI_CACHE_TTL
+        self.local_ttl = min(settings.AI_CACHE_LOCAL_TTL, self.ttl)
+        self.max_entries = settings.AI_CACHE_MAX_ENTRIES
+        self._local: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self.metrics = {"local_hits": 0, "redis_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    async def _redis_client(self):
+        if self._redis is not None:
+            return self._redis
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            import redis.asyncio as aioredis
+            client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+            await client.ping()
+            self._redis = client
+        except Exception as e:
+            logger.warning(f"AI cache Redis tier unavailable ({e}), using local cache only")
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+        return self._redis
+
+    def _redis_failed(self, e: Exception):
+        logger.warning(f"AI cache Redis error: {str(e)}")
+        self._redis = None
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+    def _local_get(self, key: str) -> Optional[Dict]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    def _local_put(self, key: str, value: Dict):
+        self._local[key] = (time.monotonic() + self.local_ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+            self.metrics["evictions"] += 1
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def make_key(self, message: str, context: Optional[Dict], system_prompt: str) -> str:
+        """Build the cache key for a reply"""
+        context = context or {}
+        material = json.dumps({
+            "message": normalize_message(message),
+            "context": {k: context.get(k) for k in ("company", "previous_interactions", "needs")},
+            "models": [settings.AI_SMART_MODEL, settings.AI_CHEAP_MODEL],
+            "temperature": settings.AI_TEMPERATURE,
+            "prompt": hashlib.sha256(system_prompt.encode()).hexdigest(),
+        }, sort_keys=True, default=str)
+        return KEY_PREFIX + hashlib.sha256(material.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+
+        value = self._local_get(key)
+        if value is not None:
+            self.metrics["local_hits"] += 1
+            return value
+
+        client = await self._redis_client()
+        if client is not None:
+            try:
+                raw = await client.get(key)
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._local_put(key, value)
+                    self.metrics["redis_hits"] += 1
+                    return value
+            except Exception as e:
+                self._redis_failed(e)
+
+        self.metrics["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Dict):
+        if not self.enabled:
+            return
+
+        self._local_put(key, value)
+        self.metrics["stores"] += 1
+
+        client = await self._redis_client()
+        if client is not None:
+            try:
+                await client.set(key, json.dumps(value), ex=int(self.ttl))
+            except Exception as e:
+                self._redis_failed(e)
+
+    async def invalidate(self) -> int:
+        """
+        Drop every cached reply (e.g. after changing business settings)
+
+        Clears this process's LRU and the shared Redis tier; other workers'
+        local entries expire within AI_CACHE_LOCAL_TTL.
+        """
+        removed = len(self._local)
+        self._local.clear()
+
+        client = await self._redis_client()
+        if client is not None:
+            try:
+                batch = []
+                async for key in client.scan_iter(match=f"{KEY_PREFIX}*", count=500):
+                    batch.append(key)
+                    if len(batch) >= 500:
+                        removed += await client.delete(*batch)
+                        batch = []
+                if batch:
+                    removed += await client.delete(*batch)
+            except Exception as e:
+                self._redis_failed(e)
+
+        logger.info(f"AI response cache invalidated ({removed} entries)")
+        return removed
+
+    def stats(self) -> Dict:
+        lookups = self.metrics["local_hits"] + self.metrics["redis_hits"] + self.metrics["misses"]
+        hits = self.metrics["local_hits"] + self.metrics["redis_hits"]
+        return {
+            "enabled": self.enabled,
+            "local_entries": len(self._local),
+            "redis_connected": self._redis is not None,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            **self.metrics,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
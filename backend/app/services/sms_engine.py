@@ -0,0 +1,244 @@
+"""
+Twilio SMS Engine
+Sends SMS through Twilio's REST API over the shared keep-alive HTTP pool, so
+a send never blocks the event loop (the SDK's client.messages.create is
+synchronous). Every sender number has its own token bucket at
+TWILIO_MPS_PER_NUMBER, which keeps bulk sends within Twilio's per-number
+throughput; adding numbers to TWILIO_SENDER_NUMBERS scales throughput
+linearly. Recipients stick to one sender so replies land in one thread.
+
+Delivery-status callbacks (queued / sent / delivered / undelivered / failed)
+are verified against X-Twilio-Signature and counted in the sms.status stats.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import time
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.job_queue import get_job_queue
+from app.utils.rate_limit import TokenBucket, post_with_retry
+
+logger = logging.getLogger(__name__)
+
+SEND_BULK_SMS = "send_bulk_sms"
+
+FAILED_STATUSES = {"failed", "undelivered"}
+
+job_queue = get_job_queue()
+
+
+def sign_request(auth_token: str, url: str, params: Dict[str, str]) -> str:
+    """Twilio request signature: HMAC-SHA1 of the URL followed by the sorted POST params"""
+    payload = url + "".join(f"{key}{params[key]}" for key in sorted(params))
+    digest = hmac.new(auth_token.encode(), payload.encode(), hashlib.sha1).digest()
+    return base64.b64encode(digest).decode()
+
+
+class TwilioSMSEngine:
+    """Rate-limited, retrying Twilio Messages API client"""
+
+    def __init__(self):
+        self.account_sid = settings.TWILIO_ACCOUNT_SID
+        self.auth_token = settings.TWILIO_AUTH_TOKEN
+        self.url = f"{settings.TWILIO_API_BASE_URL.rstrip('/')}/2010-04-01/Accounts/{self.account_sid}/Messages.json"
+        self.numbers = [
+            number.strip() for number in (settings.TWILIO_SENDER_NUMBERS or settings.TWILIO_PHONE_NUMBER).split(",")
+            if number.strip()
+        ]
+        self.mps = settings.TWILIO_MPS_PER_NUMBER
+        self.buckets: Dict[str, TokenBucket] = {number: self._bucket() for number in self.numbers}
+        self.status_callback = settings.TWILIO_STATUS_CALLBACK_URL or None
+        self.max_retries = settings.TWILIO_MAX_RETRIES
+        self.bulk_concurrency = settings.SMS_BULK_CONCURRENCY
+        self.metrics = {"sent": 0, "failed": 0, "retries": 0}
+        self.statuses: Counter = Counter()
+
+    def _bucket(self) -> TokenBucket:
+        # MPS is a sustained rate: pace sends evenly instead of bursting up to it
+        return TokenBucket(self.mps, burst=1)
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.account_sid and self.auth_token and self.numbers)
+
+    @property
+    def throughput(self) -> float:
+        """Messages per second the sender pool allows"""
+        return len(self.numbers) * self.mps
+
+    @property
+    def chunk_size(self) -> int:
+        """Messages per bulk-send job: small enough to send within half the job timeout"""
+        return max(1, min(settings.SMS_BULK_CHUNK_SIZE, int(self.throughput * settings.JOB_VISIBILITY_TIMEOUT / 2)))
+
+    def sender_for(self, recipient: str) -> str:
+        """Stable sender for a recipient, spreading recipients across the pool"""
+        return self.numbers[zlib.crc32(recipient.encode()) % len(self.numbers)]
+
+    async def _post(self, data: Dict, bucket: TokenBucket) -> httpx.Response:
+        """Create a message; every attempt counts against the sender's MPS"""
+        return await post_with_retry(
+            self.url, self.max_retries, bucket=bucket, metrics=self.metrics,
+            data=data, auth=(self.account_sid, self.auth_token)
+        )
+
+    async def send(
+        self,
+        to: str,
+        body: str,
+        from_: Optional[str] = None,
+        media_url: Optional[str] = None,
+        status_callback: Optional[str] = None
+    ) -> Dict:
+        """
+        Send one SMS
+
+        Args:
+            to: Recipient number (E.164)
+            body: Message text
+            from_: Sender number (default: the recipient's pool number)
+            media_url: MMS attachment URL
+            status_callback: Delivery-status webhook (default: TWILIO_STATUS_CALLBACK_URL)
+
+        Returns:
+            Result dict with the Twilio message SID and status
+        """
+        if not self.configured:
+            return {"success": False, "error": "Twilio is not configured", "permanent": True}
+        sender = from_ or self.sender_for(to)
+        bucket = self.buckets.get(sender)
+        if bucket is None:
+            bucket = self.buckets[sender] = self._bucket()
+
+        data = {"To": to, "From": sender, "Body": body}
+        if media_url:
+            data["MediaUrl"] = media_url
+        if status_callback or self.status_callback:
+            data["StatusCallback"] = status_callback or self.status_callback
+        try:
+            response = await self._post(data, bucket)
+            payload = response.json()
+        except Exception as e:
+            self.metrics["failed"] += 1
+            logger.error(f"Error sending SMS to {to}: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+        if response.status_code >= 400:
+            self.metrics["failed"] += 1
+            error = f"Twilio error {payload.get('code')}: {payload.get('message')}"
+            logger.error(f"Error sending SMS to {to}: {error}")
+            # 4xx other than 429 (invalid number, opted out, ...) fails the same way on retry
+            return {
+                "success": False,
+                "error": error,
+                "status_code": response.status_code,
+                "permanent": response.status_code < 500 and response.status_code != 429
+            }
+
+        self.metrics["sent"] += 1
+        logger.info(f"SMS sent to {to}: {payload.get('sid')}")
+        return {
+            "success": True,
+            "channel": "sms",
+            "message_id": payload.get("sid"),
+            "status": payload.get("status"),
+            "from": sender
+        }
+
+    async def send_bulk(self, messages: Iterable[Dict], concurrency: Optional[int] = None) -> Dict:
+        """
+        Send many SMS at the pool's combined throughput
+
+        Args:
+            messages: Dicts with "to" and "body" (optional "media_url")
+            concurrency: In-flight requests (default SMS_BULK_CONCURRENCY)
+
+        Returns:
+            Sent / failed totals, elapsed time and per-recipient failures
+        """
+        pending = iter(messages)
+        results = {"sent": 0, "failed": 0, "errors": []}
+        started = time.perf_counter()
+
+        async def worker():
+            for message in pending:
+                result = await self.send(message["to"], message["body"], media_url=message.get("media_url"))
+                if result.get("success"):
+                    results["sent"] += 1
+                else:
+                    results["failed"] += 1
+                    results["errors"].append({"to": message["to"], "error": result.get("error")})
+
+        await asyncio.gather(*[worker() for _ in range(concurrency or self.bulk_concurrency)])
+        elapsed = time.perf_counter() - started
+        total = results["sent"] + results["failed"]
+        logger.info(f"Bulk SMS: {results['sent']}/{total} sent in {elapsed:.1f}s")
+        return {
+            "success": results["failed"] == 0,
+            **results,
+            "elapsed_seconds": round(elapsed, 3),
+            "messages_per_second": round(total / elapsed, 2) if elapsed else 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Delivery status
+    # ------------------------------------------------------------------
+
+    def valid_signature(self, url: str, params: Dict[str, str], signature: Optional[str]) -> bool:
+        """Check X-Twilio-Signature (skipped when no auth token is configured)"""
+        if not self.auth_token:
+            return True
+        url = self.status_callback or url
+        return bool(signature) and hmac.compare_digest(sign_request(self.auth_token, url, params), signature)
+
+    def record_status(self, params: Dict[str, str]) -> None:
+        """Count a delivery-status callback"""
+        from app.services.stats_service import get_stats_service
+
+        status = params.get("MessageStatus") or params.get("SmsStatus") or "unknown"
+        self.statuses[status] += 1
+        get_stats_service().increment("sms.status", dimension=status)
+        if status in FAILED_STATUSES:
+            logger.warning(
+                f"SMS {params.get('MessageSid')} to {params.get('To')} {status} (error {params.get('ErrorCode')})"
+            )
+
+    def stats(self) -> Dict:
+        return {
+            "configured": self.configured,
+            "senders": len(self.numbers),
+            "messages_per_second": self.throughput,
+            **self.metrics,
+            "delivery_status": dict(self.statuses),
+        }
+
+
+@job_queue.register(SEND_BULK_SMS)
+async def send_bulk_sms(payload: Dict) -> None:
+    """One chunk of a broadcast queued by /api/messages/sms/bulk"""
+    result = await get_sms_engine().send_bulk(payload["messages"])
+    if result["failed"]:
+        logger.warning(f"Bulk SMS job: {result['failed']} of {result['sent'] + result['failed']} messages failed")
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_sms_engine: Optional[TwilioSMSEngine] = None
+
+
+def get_sms_engine() -> TwilioSMSEngine:
+    global _sms_engine
+    if _sms_engine is None:
+        _sms_engine = TwilioSMSEngine()
+    return _sms_engine
@@ -0,0 +1,401 @@
+"""
+Dashboard Stats Service
+Incremental counters in stat_counters, so /api/stats reads a handful of
+primary-key rows however large the source tables grow.
+
+Each metric has an all-time row (bucket = TOTAL) and, for charts, per-hour or
+per-day bucket rows. Task and booking counters change in the same transaction
+as the write (ORM flush hooks); follow-up send results are recorded by the
+dispatcher with its chunk commit; AI token usage is buffered in memory and
+written every STATS_FLUSH_INTERVAL. Current-state counters are recounted from
+the source tables every STATS_RECONCILE_INTERVAL to repair any drift.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_database_registry, get_engine
+from app.models import Booking, FollowUp, Lead, LeadCount, StatCounter, Task, TaskStatus
+from app.services.ai_engine import get_ai_engine
+from app.services.lead_read_model import reconcile_counts
+from app.utils.counters import increment_counters
+
+logger = logging.getLogger(__name__)
+
+TOTAL = datetime(1970, 1, 1)
+
+# Bucket size of each metric's series rows (None: all-time row only)
+METRICS: Dict[str, Optional[str]] = {
+    "leads.created": "hour",
+    "tasks.status": None,
+    "bookings.scheduled": "day",
+    "follow_ups.sent": "hour",
+    "follow_ups.failed": "hour",
+    "ai.tokens": "hour",
+    "sms.status": "hour",
+}
+
+# (metric, dimension, event time or None, delta)
+CounterEvent = Tuple[str, str, Optional[datetime], int]
+
+
+def truncate(at: datetime, interval: str) -> datetime:
+    """Start of the hour / day containing at"""
+    if interval == "day":
+        return datetime(at.year, at.month, at.day)
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+def task_status_key(status) -> str:
+    if status is None:
+        return "none"
+    if isinstance(status, TaskStatus):
+        return status.value
+    try:
+        return TaskStatus(status).value
+    except ValueError:
+        return TaskStatus[status].value
+
+
+def _write(conn: Connection, deltas: Counter):
+    increment_counters(conn, StatCounter, [
+        {"metric": metric, "dimension": dimension, "bucket": bucket, "value": delta}
+        for (metric, dimension, bucket), delta in deltas.items()
+    ], value_column="value")
+
+
+def record(conn: Connection, events: Iterable[CounterEvent]):
+    """
+    Apply counter events in the caller's transaction
+
+    Args:
+        conn: Connection in the writing transaction
+        events: (metric, dimension, event time, delta) tuples
+    """
+    deltas = Counter()
+    for metric, dimension, at, delta in events:
+        deltas[(metric, dimension, TOTAL)] += delta
+        interval = METRICS.get(metric)
+        if interval and at is not None:
+            deltas[(metric, dimension, truncate(at, interval))] += delta
+    _write(conn, deltas)
+
+
+# ---------------------------------------------------------------------------
+# Write-path hooks
+# ---------------------------------------------------------------------------
+
+def _history(obj, attribute: str):
+    """(old, new) for a changed attribute, or None if unchanged"""
+    history = inspect(obj).attrs[attribute].history
+    if not history.has_changes():
+        return None
+    old = history.deleted[0] if history.deleted else None
+    new = history.added[0] if history.added else None
+    return old, new
+
+
+def _before_flush(session: Session, flush_context, instances):
+    # Capture the state of rows about to be deleted while it can still be loaded
+    # (reset per flush so a failed flush does not leave stale events behind)
+    events: List[CounterEvent] = []
+    session.info["stat_events"] = events
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            events.append(("tasks.status", task_status_key(obj.status), None, -1))
+        elif isinstance(obj, Booking):
+            events.append(("bookings.scheduled", "", obj.scheduled_time, -1))
+
+
+def _after_flush(session: Session, flush_context):
+    events: List[CounterEvent] = session.info.pop("stat_events", [])
+    for obj in session.new:
+        if isinstance(obj, Lead):
+            events.append(("leads.created", "", obj.created_at, 1))
+        elif isinstance(obj, Task):
+            events.append(("tasks.status", task_status_key(obj.status), None, 1))
+        elif isinstance(obj, Booking):
+            events.append(("bookings.scheduled", "", obj.scheduled_time, 1))
+    for obj in session.dirty:
+        if isinstance(obj, Task):
+            change = _history(obj, "status")
+            if change:
+                events.append(("tasks.status", task_status_key(change[0]), None, -1))
+                events.append(("tasks.status", task_status_key(change[1]), None, 1))
+        elif isinstance(obj, Booking):
+            change = _history(obj, "scheduled_time")
+            if change:
+                events.append(("bookings.scheduled", "", change[0], -1))
+                events.append(("bookings.scheduled", "", change[1], 1))
+    if events:
+        record(session.connection(), events)
+
+
+def _active_history(target, value, oldvalue, initiator):
+    pass
+
+
+def register_listeners():
+    """Keep the counters in step with every ORM flush; safe to call more than once"""
+    if event.contains(Session, "after_flush", _after_flush):
+        return
+    # Load the previous value on assignment so the flush hook can decrement it
+    event.listen(Task.status, "set", _active_history, active_history=True)
+    event.listen(Booking.scheduled_time, "set", _active_history, active_history=True)
+    event.listen(Session, "before_flush", _before_flush)
+    event.listen(Session, "after_flush", _after_flush)
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+class StatsService:
+    """Buffered counters, periodic reconciliation and O(1) stat reads"""
+
+    def __init__(self):
+        self.flush_interval = settings.STATS_FLUSH_INTERVAL
+        self.reconcile_interval = settings.STATS_RECONCILE_INTERVAL
+        self._buffer: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        self.last_reconciled: Optional[datetime] = None
+
+    def increment(self, metric: str, amount: int = 1, dimension: str = "", at: Optional[datetime] = None):
+        """Buffer a counter event; written on the next flush"""
+        interval = METRICS.get(metric) or "hour"
+        self._buffer[(metric, dimension, truncate(at or datetime.utcnow(), interval))] += amount
+
+    def _drain(self) -> List[CounterEvent]:
+        for (kind, hour), tokens in get_ai_engine().drain_usage().items():
+            self._buffer[("ai.tokens", kind, hour)] += tokens
+        buffered, self._buffer = self._buffer, Counter()
+        return [(metric, dimension, at, delta) for (metric, dimension, at), delta in buffered.items() if delta]
+
+    def flush(self) -> int:
+        """Write buffered counters; returns the number of events written"""
+        events = self._drain()
+        if events:
+            try:
+                with get_engine().begin() as conn:
+                    record(conn, events)
+            except Exception:
+                # Keep the counts for the next attempt
+                for metric, dimension, at, delta in events:
+                    self._buffer[(metric, dimension, at)] += delta
+                raise
+        return len(events)
+
+    def reconcile(self) -> Dict:
+        """Recount current-state counters from their source tables"""
+        with get_engine().begin() as conn:
+            leads = reconcile_counts(conn)
+
+            rows = Counter()
+            for status, count in conn.execute(select(Task.status, func.count()).group_by(Task.status)):
+                rows[("tasks.status", task_status_key(status), TOTAL)] += count
+            day = func.date(Booking.scheduled_time)
+            for scheduled, count in conn.execute(select(day, func.count()).group_by(day)):
+                if isinstance(scheduled, str):
+                    scheduled = date.fromisoformat(scheduled)
+                rows[("bookings.scheduled", "", datetime(scheduled.year, scheduled.month, scheduled.day))] += count
+                rows[("bookings.scheduled", "", TOTAL)] += count
+            rows[("follow_ups.sent", "", TOTAL)] = conn.scalar(
+                select(func.count()).select_from(FollowUp).where(FollowUp.sent == True)
+            )
+            rows[("leads.created", "", TOTAL)] = leads
+
+            # Event-only series (hourly sends, creations, tokens) cannot be recounted and are kept
+            conn.execute(delete(StatCounter).where(
+                StatCounter.metric.in_(["tasks.status", "bookings.scheduled"]) |
+                (StatCounter.metric.in_(["follow_ups.sent", "leads.created"]) & (StatCounter.bucket == TOTAL))
+            ))
+            _write(conn, rows)
+
+        self.last_reconciled = datetime.utcnow()
+        logger.info(f"Stats reconciled: {leads} leads")
+        return {"success": True, "reconciled_at": self.last_reconciled}
+
+    async def _run(self):
+        reconcile_at = 0.0
+        try:
+            await get_database_registry().ensure_initialized()
+        except Exception as e:
+            logger.error(f"Stats start-up failed to initialize the database: {str(e)}")
+        while True:
+            try:
+                if time.monotonic() >= reconcile_at:
+                    await asyncio.to_thread(self.reconcile)
+                    reconcile_at = time.monotonic() + self.reconcile_interval
+                await asyncio.to_thread(self.flush)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Stats flush error: {str(e)}")
+            await asyncio.sleep(self.flush_interval)
+
+    async def start(self):
+        """Start the flush / reconcile loop (called from the app lifespan)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.warning(f"Final stats flush failed: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def get_stats(self, db: AsyncSession, upcoming_days: int = 7) -> Dict:
+        """
+        Current totals for the dashboard
+
+        Args:
+            db: Async database session
+            upcoming_days: Days of booking counts to include, starting today
+
+        Returns:
+            Lead, task, booking, follow-up, AI token and SMS delivery totals
+        """
+        totals: Dict[str, Dict[str, int]] = {}
+        for row in (await db.execute(select(StatCounter).where(StatCounter.bucket == TOTAL))).scalars():
+            totals.setdefault(row.metric, {})[row.dimension] = row.value
+
+        lead_status: Dict[str, int] = {}
+        for row in (await db.execute(
+            select(LeadCount).where((LeadCount.dimension == "status") & (LeadCount.count > 0))
+        )).scalars():
+            lead_status[row.value] = row.count
+
+        today = truncate(datetime.utcnow(), "day")
+        upcoming = {
+            (today + timedelta(days=offset)).date().isoformat(): 0 for offset in range(upcoming_days)
+        }
+        for row in (await db.execute(
+            select(StatCounter).where(
+                (StatCounter.metric == "bookings.scheduled") &
+                (StatCounter.dimension == "") &
+                (StatCounter.bucket >= today) &
+                (StatCounter.bucket < today + timedelta(days=upcoming_days))
+            )
+        )).scalars():
+            upcoming[row.bucket.date().isoformat()] = row.value
+
+        task_status = {key: value for key, value in totals.get("tasks.status", {}).items() if value}
+        tokens = totals.get("ai.tokens", {})
+        return {
+            "leads": {
+                "total": sum(lead_status.values()),
+                "by_status": lead_status,
+            },
+            "tasks": {
+                "total": sum(task_status.values()),
+                "by_status": task_status,
+            },
+            "bookings": {
+                "total": totals.get("bookings.scheduled", {}).get("", 0),
+                "upcoming_by_day": upcoming,
+            },
+            "follow_ups": {
+                "sent": totals.get("follow_ups.sent", {}).get("", 0),
+                "failed": totals.get("follow_ups.failed", {}).get("", 0),
+            },
+            "ai_tokens": {
+                "prompt": tokens.get("prompt", 0),
+                "completion": tokens.get("completion", 0),
+                "total": tokens.get("prompt", 0) + tokens.get("completion", 0),
+            },
+            "sms": {
+                "by_status": {key: value for key, value in totals.get("sms.status", {}).items() if value},
+            },
+            "last_reconciled": self.last_reconciled,
+        }
+
+    async def get_series(
+        self,
+        db: AsyncSession,
+        metric: str,
+        interval: str = "day",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        dimension: str = ""
+    ) -> Dict:
+        """
+        Time-bucketed counts for charts
+
+        Args:
+            db: Async database session
+            metric: Metric name (see METRICS)
+            interval: hour or day
+            start: First bucket (default: 30 days / 48 hours before end)
+            end: End of the range, exclusive (default: now)
+            dimension: Dimension value, e.g. prompt / completion for ai.tokens
+
+        Returns:
+            One point per bucket in range, zero-filled
+        """
+        stored = METRICS.get(metric)
+        if stored is None:
+            raise ValueError(f"No series for metric {metric!r}")
+        if interval not in ("hour", "day") or (stored == "day" and interval == "hour"):
+            raise ValueError(f"Unsupported interval {interval!r} for {metric}")
+
+        step = timedelta(hours=1) if interval == "hour" else timedelta(days=1)
+        end = end or datetime.utcnow()
+        start = truncate(start or end - step * (48 if interval == "hour" else 30), interval)
+        if (end - start) / step > 5000:
+            raise ValueError("Range too large for the interval")
+
+        points: Dict[datetime, int] = {}
+        bucket = start
+        while bucket < end:
+            points[bucket] = 0
+            bucket += step
+        for row in (await db.execute(
+            select(StatCounter).where(
+                (StatCounter.metric == metric) &
+                (StatCounter.dimension == dimension) &
+                (StatCounter.bucket >= start) &
+                (StatCounter.bucket < end) &
+                (StatCounter.bucket != TOTAL)
+            )
+        )).scalars():
+            key = truncate(row.bucket, interval)
+            points[key] = points.get(key, 0) + row.value
+
+        return {
+            "metric": metric,
+            "dimension": dimension,
+            "interval": interval,
+            "points": [{"bucket": bucket.isoformat(), "value": value} for bucket, value in sorted(points.items())],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_stats_service: Optional[StatsService] = None
+
+
+def get_stats_service() -> StatsService:
+    global _stats_service
+    if _stats_service is None:
+        _stats_service = StatsService()
+    return _stats_service
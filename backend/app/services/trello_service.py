@@ -10,9 +10,8 @@ Trello workspace (see https://trello.com/1/authorize).
 import logging
 from typing import Dict, List, Optional
 
-import httpx
-
 from app.core.config import settings
+from app.core.http_client import get_http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -54,10 +53,10 @@ class TrelloService:
         url = f"{TRELLO_BASE_URL}{path}"
         params = {**self._auth_params(), **kwargs.pop("params", {})}
 
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.request(method, url, params=params, **kwargs)
-            resp.raise_for_status()
-            return resp.json()
+        kwargs.setdefault("timeout", 15)
+        resp = await get_http_pool().request(method, url, params=params, **kwargs)
+        resp.raise_for_status()
+        return resp.json()
 
     # ------------------------------------------------------------------
     # Board helpers
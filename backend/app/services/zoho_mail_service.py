@@ -6,9 +6,8 @@ Sends transactional and notification emails via Zoho Mail API.
 import logging
 from typing import Dict, Optional
 
-import httpx
-
 from app.core.config import settings
+from app.core.http_client import get_http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -65,16 +64,17 @@ class ZohoMailService:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=15) as client:
-                resp = await client.post(
-                    f"{ZOHO_MAIL_API}/accounts/me/messages",
-                    headers=self._headers(),
-                    json=payload,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                logger.info(f"Zoho Mail sent to {to}: {subject}")
-                return {"success": True, "data": data}
+            resp = await get_http_pool().request(
+                "POST",
+                f"{ZOHO_MAIL_API}/accounts/me/messages",
+                headers=self._headers(),
+                json=payload,
+                timeout=15,
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            logger.info(f"Zoho Mail sent to {to}: {subject}")
+            return {"success": True, "data": data}
         except Exception as exc:
             logger.error(f"Error sending Zoho Mail: {exc}")
             return {"success": False, "error": str(exc)}
@@ -0,0 +1,47 @@
+"""
+Counter Upserts
+Add deltas to counter rows keyed by a table's primary key, creating missing
+rows, in one statement on PostgreSQL and SQLite (INSERT ... ON CONFLICT).
+"""
+
+from typing import Dict, List
+
+from sqlalchemy import insert, inspect, update
+from sqlalchemy.engine import Connection
+
+
+def increment_counters(conn: Connection, model, rows: List[Dict], value_column: str = "count"):
+    """
+    Add each row's value to the matching counter row
+
+    Args:
+        conn: Connection in the writing transaction
+        model: Mapped counter class (primary key = counter identity)
+        rows: Dicts with every primary key column plus the delta in value_column
+        value_column: Name of the integer counter column
+    """
+    rows = [row for row in rows if row[value_column]]
+    if not rows:
+        return
+    keys = [column.key for column in inspect(model).primary_key]
+    value = getattr(model, value_column)
+
+    dialect = conn.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={value_column: value + getattr(stmt.excluded, value_column)}
+        )
+        conn.execute(stmt, rows)
+        return
+
+    for row in rows:
+        match = [getattr(model, key) == row[key] for key in keys]
+        updated = conn.execute(update(model).where(*match).values({value_column: value + row[value_column]}))
+        if updated.rowcount == 0:
+            conn.execute(insert(model).values(**row))
@@ -0,0 +1,100 @@
+"""
+Keyset (cursor) Pagination Helpers
+Opaque cursors over (sort_column, id) so deep pages cost the same as page one.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, row_id: str) -> str:
+    """Encode the last row's sort key into an opaque cursor"""
+    raw = json.dumps([sort_value.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor; raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+
+def _apply_keyset(query, sort_column, id_column, limit: int, cursor: Optional[str], descending: bool):
+    """Add the cursor predicate, sort order and limit+1 to a Query or Select"""
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        key = tuple_(sort_column, id_column)
+        query = query.filter(key < (sort_value, row_id) if descending else key > (sort_value, row_id))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    return query.limit(limit + 1)
+
+
+def _split_page(rows: List[Any], sort_column, id_column, limit: int) -> Tuple[List[Any], Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+
+def paginate(
+    query: Query,
+    sort_column: Any,
+    id_column: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Apply keyset pagination to a query
+
+    Args:
+        query: Filtered query over a single model
+        sort_column: Primary sort column (created_at / scheduled_time)
+        id_column: Tie-breaker primary key column
+        limit: Page size
+        cursor: Cursor from the previous page's X-Next-Cursor header
+        descending: Newest first when True
+
+    Returns:
+        (rows, next_cursor) - next_cursor is None on the last page
+    """
+    rows = _apply_keyset(query, sort_column, id_column, limit, cursor, descending).all()
+    return _split_page(rows, sort_column, id_column, limit)
+
+
+async def paginate_async(
+    db: AsyncSession,
+    stmt: Select,
+    sort_column: Any,
+    id_column: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Keyset pagination for a select() over a single model on an AsyncSession
+
+    Same arguments and return value as paginate, with the statement run on db.
+    """
+    result = await db.execute(_apply_keyset(stmt, sort_column, id_column, limit, cursor, descending))
+    return _split_page(list(result.scalars().unique()), sort_column, id_column, limit)
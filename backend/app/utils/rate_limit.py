@@ -0,0 +1,123 @@
+"""
+Rate Limiting Utilities
+Async token bucket used to pace outbound channel sends, and the retry policy
+for provider send APIs
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.http_client import get_http_pool
+
+logger = logging.getLogger(__name__)
+
+# Errors raised before the request reached the provider. Message sends are not
+# idempotent, so anything later (a read timeout, a 5xx) may already have
+# delivered the message and is not retried.
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def parse_rate_limits(raw: str) -> Dict[str, float]:
+    """Parse 'email=10,sms=1' into a name -> per-second rate mapping"""
+    limits: Dict[str, float] = {}
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        name, _, value = item.partition("=")
+        try:
+            limits[name.strip()] = float(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid rate limit entry: {item!r}")
+    return limits
+
+
+def retry_after_seconds(value: Optional[str], default: float) -> float:
+    """Retry-After header as seconds (delta-seconds or HTTP-date); default when absent or invalid"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second with bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until `tokens` are available, then take them"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            self._refill()
+            while self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+
+
+async def post_with_retry(
+    url: str,
+    max_retries: int,
+    bucket: Optional[TokenBucket] = None,
+    metrics: Optional[Dict[str, int]] = None,
+    **kwargs
+) -> httpx.Response:
+    """
+    POST through the shared client, retrying only where the provider cannot
+    have acted on the request: 429 responses (honouring Retry-After) and
+    UNSENT_ERRORS, with exponential backoff
+
+    Args:
+        url: Endpoint
+        max_retries: Retries after the first attempt
+        bucket: Paces every attempt, retries included
+        metrics: Counters; "requests" and "retries" are incremented when present
+        **kwargs: Passed on to the client's request()
+
+    Returns:
+        The last response (still a 429 once retries run out)
+    """
+    metrics = metrics if metrics is not None else {}
+    for attempt in range(max_retries + 1):
+        delay = 0.5 * 2 ** attempt
+        if bucket is not None:
+            await bucket.acquire()
+        if "requests" in metrics:
+            metrics["requests"] += 1
+        try:
+            response = await get_http_pool().request("POST", url, **kwargs)
+            if response.status_code != 429 or attempt == max_retries:
+                return response
+            delay = retry_after_seconds(response.headers.get("Retry-After"), delay)
+        except UNSENT_ERRORS:
+            if attempt == max_retries:
+                raise
+        if "retries" in metrics:
+            metrics["retries"] += 1
+        await asyncio.sleep(delay)
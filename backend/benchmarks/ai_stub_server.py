@@ -0,0 +1,68 @@
+"""
+Local OpenAI-compatible stub server for offline AI throughput benchmarks
+Run: uvicorn benchmarks.ai_stub_server:app --port 8100
+Then point the backend at it with AI_BASE_URL=http://localhost:8100/v1
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+STUB_LATENCY_MS = float(os.environ.get("STUB_LATENCY_MS", "400"))
+STUB_REPLY = os.environ.get("STUB_REPLY", "Thanks for reaching out! How can we help?")
+STUB_TOKEN_MS = float(os.environ.get("STUB_TOKEN_MS", "20"))
+
+app = FastAPI(title="AI Stub Server")
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    """Mimic the chat completions endpoint after a fixed simulated latency"""
+    body = await request.json()
+    await asyncio.sleep(STUB_LATENCY_MS / 1000)
+
+    system = next((m["content"] for m in body.get("messages", []) if m["role"] == "system"), "")
+    # Intent classification prompts expect a single-word answer
+    content = "SALES" if "Classify the user intent" in system else STUB_REPLY
+
+    if body.get("stream"):
+        return StreamingResponse(_stream(body.get("model", "stub"), content), media_type="text/event-stream")
+
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 50, "completion_tokens": 20, "total_tokens": 70},
+    }
+
+
+async def _stream(model: str, content: str):
+    """Emit the reply word by word as chat.completion.chunk events"""
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    words = content.split(" ")
+    for i, word in enumerate(words):
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "delta": {"content": word if i == 0 else f" {word}"},
+                "finish_reason": None,
+            }],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(STUB_TOKEN_MS / 1000)
+    yield "data: [DONE]\n\n"
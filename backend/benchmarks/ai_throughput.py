@@ -0,0 +1,62 @@
+"""
+AI throughput benchmark - fires concurrent process_message calls at the AI engine
+Run against the stub server:
+    uvicorn benchmarks.ai_stub_server:app --port 8100 &
+    AI_BASE_URL=http://localhost:8100/v1 python benchmarks/ai_throughput.py --requests 200
+Add --stream to measure time-to-first-token on the streaming path.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.ai_service import get_ai_service
+from app.services.ai_engine import get_ai_engine
+
+
+async def _time_stream(ai_service, message: str) -> float:
+    """Seconds until the first token arrives"""
+    start = time.perf_counter()
+    first_token = None
+    async for event in ai_service.stream_message(message, context={"company": "Bench Co"}):
+        if first_token is None and event["type"] == "token":
+            first_token = time.perf_counter() - start
+    return first_token or 0.0
+
+
+async def run(total: int, stream: bool):
+    ai_service = get_ai_service()
+    # Unique messages so the response cache does not short-circuit the benchmark
+    messages = [f"What are your pricing plans? #{i}" for i in range(total)]
+
+    if stream:
+        start = time.perf_counter()
+        ttfts = sorted(await asyncio.gather(*[_time_stream(ai_service, m) for m in messages]))
+        elapsed = time.perf_counter() - start
+        print(f"Streams: {total}  elapsed: {elapsed:.2f}s  TTFT p50: {ttfts[len(ttfts) // 2] * 1000:.0f}ms  p99: {ttfts[int(len(ttfts) * 0.99)] * 1000:.0f}ms")
+        await get_ai_engine().close()
+        return
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        ai_service.process_message(m, context={"company": "Bench Co"})
+        for m in messages
+    ])
+    elapsed = time.perf_counter() - start
+
+    ok = sum(1 for r in results if r.get("success"))
+    print(f"Requests: {total}  succeeded: {ok}  elapsed: {elapsed:.2f}s  throughput: {total / elapsed:.1f} req/s")
+
+    await get_ai_engine().close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--stream", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.stream))
@@ -0,0 +1,110 @@
+"""
+Email campaign benchmark - pushes a templated batch through the email engine
+Starts the aiosmtpd sink (benchmarks/smtp_sink.py) in-process and sends:
+    python benchmarks/email_throughput.py --messages 2000 --pool-size 5
+Reports messages/sec and SMTP sessions opened. Add --per-message to open a
+new session for every message (the connect-per-send baseline), and
+--render to compare pre-rendered MIME with building an EmailMessage per
+recipient. Use --external to send to SMTP_HOST / SMTP_PORT instead of the
+in-process sink.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from email.message import EmailMessage
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+SUBJECT = "Quick follow-up for $company"
+TEXT = "Hi $name,\n\nThanks for your interest in our services. Are you free for a short call this week?\n\n" * 4
+HTML = "<p>Hi $name,</p><p>Thanks for your interest in our services. Are you free for a short call this week?</p>" * 4
+
+
+def configure(args):
+    """Engine settings come from the environment; fill in sink defaults"""
+    os.environ["EMAIL_BACKEND"] = "smtp"
+    os.environ.setdefault("EMAIL_FROM", "campaigns@example.com")
+    if not args.external:
+        os.environ["SMTP_HOST"] = "127.0.0.1"
+        os.environ["SMTP_PORT"] = str(args.port)
+        os.environ["SMTP_START_TLS"] = "false"
+        os.environ["SMTP_USER"] = ""
+        os.environ["SMTP_PASSWORD"] = ""
+    os.environ["SMTP_POOL_SIZE"] = str(args.pool_size)
+    os.environ["SMTP_MAX_MESSAGES_PER_CONNECTION"] = "1" if args.per_message else str(args.messages)
+    os.environ["EMAIL_RATE_LIMIT"] = str(args.rate)
+
+
+def recipients(count):
+    return [{"email": f"lead{i}@example.org", "name": f"Lead {i}", "company": f"Company {i % 50}"} for i in range(count)]
+
+
+def compare_render(count):
+    """Per-recipient cost of pre-rendered MIME vs a fresh EmailMessage"""
+    from app.services.email_engine import EmailTemplate
+
+    people = recipients(count)
+    template = EmailTemplate(SUBJECT, TEXT, HTML, sender="campaigns@example.com")
+    start = time.perf_counter()
+    for person in people:
+        template.render(person["email"], person)
+    prepared = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for person in people:
+        message = EmailMessage()
+        message["From"] = "campaigns@example.com"
+        message["To"] = person["email"]
+        message["Subject"] = template.subject.safe_substitute(person)
+        message.set_content(template.text.safe_substitute(person))
+        message.add_alternative(template.html.safe_substitute(person), subtype="html")
+        message.as_bytes()
+    fresh = time.perf_counter() - start
+    print(f"Render x{count}: pre-rendered {prepared / count * 1e6:.0f} us/msg, "
+          f"EmailMessage {fresh / count * 1e6:.0f} us/msg ({fresh / prepared:.1f}x)")
+
+
+async def run(args, sink):
+    from app.services.email_engine import EmailTemplate, get_email_engine
+
+    engine = get_email_engine()
+    template = EmailTemplate(SUBJECT, TEXT, HTML)
+    result = await engine.send_batch(template, recipients(args.messages))
+    stats = engine.stats()
+    await engine.close()
+
+    mode = "new session per message" if args.per_message else f"{engine.smtp_pool.size} pooled sessions"
+    print(f"Messages: {args.messages}  {mode}  rate limit: {args.rate or 'none'}")
+    print(f"Sent: {result['sent']}  failed: {result['failed']}  elapsed: {result['elapsed_seconds']:.2f}s  "
+          f"throughput: {result['messages_per_second']:.1f} msg/s")
+    print(f"Sessions opened: {stats['connections_opened']}  reconnects: {stats['reconnects']}")
+    if sink:
+        print(f"Sink received: {sink.handler.stats['messages']} messages over {sink.handler.stats['sessions']} sessions")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--per-message", action="store_true")
+    parser.add_argument("--render", action="store_true")
+    parser.add_argument("--external", action="store_true")
+    args = parser.parse_args()
+    configure(args)
+
+    if args.render:
+        compare_render(args.messages)
+    sink = None
+    if not args.external:
+        from smtp_sink import start_sink
+        sink = start_sink(port=args.port)
+    try:
+        asyncio.run(run(args, sink))
+    finally:
+        if sink:
+            sink.stop()
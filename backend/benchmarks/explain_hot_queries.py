@@ -0,0 +1,146 @@
+"""
+Query-plan check for hot filter/sort paths
+Migrates a scratch database, seeds it, and EXPLAINs the queries behind the
+list endpoints, the lead read model, customer history, the follow-up
+dispatcher claim and the scheduler window. Fails if any of them falls back to
+a full table scan (or, on SQLite, a temp B-tree sort instead of reading an
+index in order).
+Run: python benchmarks/explain_hot_queries.py
+     DATABASE_URL=postgresql://... python benchmarks/explain_hot_queries.py --no-seed
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'explain.db')}"
+os.environ["DEBUG"] = "false"
+
+from datetime import datetime, timedelta
+from sqlalchemy import select, text
+from app.core.database import SessionLocal, get_engine, init_db
+from app.models import Booking, Customer, FollowUp, Lead, LeadListing, LeadStatus, Message, Task, TaskStatus
+
+LIMIT = 50
+
+
+def hot_queries():
+    now = datetime.utcnow()
+    return {
+        "leads: newest first": select(Lead).order_by(Lead.created_at.desc(), Lead.id.desc()).limit(LIMIT),
+        "leads: by status": select(Lead).where(Lead.status == LeadStatus.QUALIFIED)
+            .order_by(Lead.created_at.desc(), Lead.id.desc()).limit(LIMIT),
+        "leads: by priority": select(Lead).where(Lead.priority == "high")
+            .order_by(Lead.created_at.desc(), Lead.id.desc()).limit(LIMIT),
+        "leads: by assignee": select(Lead).where(Lead.assigned_to == "rep-1")
+            .order_by(Lead.created_at.desc(), Lead.id.desc()).limit(LIMIT),
+        "leads: by customer": select(Lead).where(Lead.customer_id == "customer-1"),
+        "customers: leads join": select(Lead, Customer).join(Customer, Lead.customer_id == Customer.id)
+            .where(Customer.id == "customer-1"),
+        "lead listings: newest first": select(LeadListing)
+            .order_by(LeadListing.created_at.desc(), LeadListing.lead_id.desc()).limit(LIMIT),
+        "lead listings: by status": select(LeadListing).where(LeadListing.status == LeadStatus.QUALIFIED)
+            .order_by(LeadListing.created_at.desc(), LeadListing.lead_id.desc()).limit(LIMIT),
+        "lead listings: customer edit": select(LeadListing.lead_id).where(LeadListing.customer_id == "customer-1"),
+        "messages: customer history": select(Message).where(Message.customer_id == "customer-1")
+            .order_by(Message.created_at.desc(), Message.id.desc()).limit(LIMIT),
+        "tasks: by status": select(Task).where(Task.status == TaskStatus.OPEN)
+            .order_by(Task.created_at.desc(), Task.id.desc()).limit(LIMIT),
+        "tasks: by assignee": select(Task).where(Task.assigned_to == "rep-1")
+            .order_by(Task.created_at.desc(), Task.id.desc()).limit(LIMIT),
+        "bookings: upcoming": select(Booking).where(Booking.scheduled_time >= now)
+            .order_by(Booking.scheduled_time, Booking.id).limit(LIMIT),
+        "bookings: by customer": select(Booking).where(Booking.customer_id == "customer-1")
+            .order_by(Booking.scheduled_time, Booking.id).limit(LIMIT),
+        "follow-ups: dispatcher claim": select(FollowUp)
+            .join(Lead, FollowUp.lead_id == Lead.id).join(Customer, Lead.customer_id == Customer.id)
+            .where((FollowUp.sent == False) & (FollowUp.scheduled_time <= now))
+            .order_by(FollowUp.scheduled_time, FollowUp.id).limit(LIMIT),
+        "follow-ups: scheduler window": select(FollowUp.scheduled_time)
+            .where((FollowUp.sent == False) & (FollowUp.scheduled_time <= now + timedelta(hours=1)) &
+                   (FollowUp.scheduled_time > now))
+            .order_by(FollowUp.scheduled_time).limit(LIMIT),
+        "follow-ups: enrollment check": select(FollowUp.lead_id)
+            .where((FollowUp.lead_id == "lead-1") & (FollowUp.message_type == "nurture")),
+    }
+
+
+def seed(rows: int):
+    """Enough rows, with realistic skew, for the planner's statistics to matter"""
+    db = SessionLocal()
+    now = datetime.utcnow()
+    try:
+        for i in range(rows):
+            created = now - timedelta(minutes=i)
+            customer = Customer(name=f"Contact {i}", email=f"c{i}@example.com", phone=f"+1555{i:07d}", created_at=created)
+            db.add(customer)
+            db.flush()
+            lead = Lead(
+                customer_id=customer.id,
+                status=list(LeadStatus)[i % len(LeadStatus)],
+                priority=("high", "medium", "low")[i % 3],
+                assigned_to=f"rep-{i % 20}",
+                created_at=created
+            )
+            db.add(lead)
+            db.flush()
+            db.add(Message(customer_id=customer.id, channel="EMAIL", direction="inbound", content="Hi", created_at=created))
+            db.add(Task(lead_id=lead.id, title="Call", status=list(TaskStatus)[i % len(TaskStatus)],
+                        assigned_to=f"rep-{i % 20}", created_at=created))
+            db.add(Booking(lead_id=lead.id, customer_id=customer.id, scheduled_time=now + timedelta(hours=i)))
+            # Most follow-ups are already sent, as in a long-running deployment
+            db.add(FollowUp(lead_id=lead.id, message_type="nurture", scheduled_time=created + timedelta(days=1),
+                            sent=i % 10 != 0))
+        db.commit()
+    finally:
+        db.close()
+
+
+def explain(conn, statement):
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+        problems = [step for step in plan if re.match(r"SCAN \w+$", step) or "TEMP B-TREE" in step]
+    else:
+        plan = [row[0] for row in conn.execute(text(f"EXPLAIN {sql}"))]
+        problems = [step.strip() for step in plan if "Seq Scan" in step]
+    return plan, problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--no-seed", action="store_true", help="Use the existing data (e.g. a staging copy)")
+    args = parser.parse_args()
+
+    init_db()
+    if not args.no_seed:
+        seed(args.rows)
+
+    failed = False
+    with get_engine().connect() as conn:
+        if conn.dialect.name == "sqlite":
+            conn.execute(text("ANALYZE"))
+        else:
+            # Make the planner use an index whenever one can serve the query
+            conn.execute(text("ANALYZE"))
+            conn.execute(text("SET enable_seqscan = off"))
+
+        print(f"database: {conn.dialect.name}")
+        for name, statement in hot_queries().items():
+            plan, problems = explain(conn, statement)
+            failed = failed or bool(problems)
+            print(f"{name:32s} {'FULL SCAN: ' + '; '.join(problems) if problems else 'OK'}")
+            for step in plan:
+                print(f"    {step}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Follow-up personalization benchmark - one-at-a-time generation vs the batched path
+Seeds an in-memory SQLite database with follow-ups for --leads leads spread over
+--companies distinct (name, company) pairs, then times:
+  sequential: _generate_follow_up_message per follow-up (the schedule_follow_up path)
+  batched:    personalize_follow_ups (deduped, bounded concurrency)
+Run against the stub server:
+    uvicorn benchmarks.ai_stub_server:app --port 8100 &
+    AI_BASE_URL=http://localhost:8100/v1 python benchmarks/follow_up_personalization.py --leads 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["DEBUG"] = "false"
+os.environ["FOLLOW_UP_SCHEDULER_ENABLED"] = "false"
+
+from datetime import datetime, timedelta
+from app.core.database import SessionLocal, init_db
+from app.models import Customer, Lead, FollowUp
+from app.services.ai_engine import get_ai_engine
+from app.services.follow_up_service import get_follow_up_service
+
+
+def seed(db, leads: int, companies: int):
+    scheduled = datetime.utcnow() + timedelta(days=1)
+    for i in range(leads):
+        # Repeat names and companies so identical prompts occur, as in real lists
+        customer = Customer(name=f"Contact {i % companies}", company=f"Company {i % companies}", email=f"c{i}@example.com", phone=f"+1555{i:07d}")
+        db.add(customer)
+        db.flush()
+        lead = Lead(customer_id=customer.id)
+        db.add(lead)
+        db.flush()
+        db.add(FollowUp(lead_id=lead.id, message_type="nurture", scheduled_time=scheduled, message_content="Hi", sent=False))
+    db.commit()
+
+
+async def run(leads: int, companies: int, sample: int):
+    init_db()
+    db = SessionLocal()
+    seed(db, leads, companies)
+    service = get_follow_up_service()
+
+    # Sequential path, measured on a sample and extrapolated to the full set
+    follow_ups = db.query(FollowUp).limit(sample).all()
+    start = time.perf_counter()
+    for follow_up in follow_ups:
+        await service._generate_follow_up_message(db, follow_up.lead_id, follow_up.message_type)
+    per_item = (time.perf_counter() - start) / len(follow_ups)
+    print(f"sequential: {len(follow_ups)} follow-ups in {per_item * len(follow_ups):.2f}s  "
+          f"({1 / per_item:.1f}/s, ~{per_item * leads:.1f}s for {leads})")
+
+    start = time.perf_counter()
+    result = await service.personalize_follow_ups(db)
+    elapsed = time.perf_counter() - start
+    print(f"batched:    {result['personalized']} follow-ups in {elapsed:.2f}s  "
+          f"({result['personalized'] / elapsed:.1f}/s, {result['ai_calls']} AI calls, {result['failed']} failed)")
+
+    db.close()
+    await get_ai_engine().close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leads", type=int, default=500)
+    parser.add_argument("--companies", type=int, default=100)
+    parser.add_argument("--sample", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.leads, args.companies, args.sample))
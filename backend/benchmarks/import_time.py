@@ -0,0 +1,101 @@
+"""
+Import-time regression check for the API and worker entry points
+Imports each entry point in a fresh interpreter and reports wall time, peak
+RSS and the slowest modules (from -X importtime). Fails if an optional SDK
+(openai, boto3, twilio, ...) is loaded at import, or if the import time or
+memory exceeds the targets.
+Run: python benchmarks/import_time.py --max-import-ms 2500 --max-rss-mb 200
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# SDKs that must only load when the feature using them is first called
+LAZY_SDKS = ["openai", "boto3", "botocore", "twilio", "sendgrid", "stripe", "tweepy"]
+
+_CHILD = r"""
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({
+    "import_ms": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded": [name for name in json.loads(sys.argv[2]) if name in sys.modules],
+}))
+"""
+
+
+def _env() -> dict:
+    workdir = tempfile.mkdtemp()
+    return dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'import.db')}",
+        JOB_QUEUE_SQLITE_PATH=os.path.join(workdir, "jobs.db"),
+        DEBUG="false",
+    )
+
+
+def measure(module: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD, module, json.dumps(LAZY_SDKS)],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_modules(module: str, top: int):
+    """Modules imported directly by the entry point, by cumulative import time"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, timeout=120
+    )
+    totals = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is shown by two spaces per level; the entry point is level 0
+        if len(name) - len(name.lstrip()) == 3:
+            totals[name.strip()] = int(cumulative) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", nargs="+", default=["main", "worker"])
+    parser.add_argument("--max-import-ms", type=float, default=2500)
+    parser.add_argument("--max-rss-mb", type=float, default=200)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        result = measure(module)
+        problems = []
+        if result["loaded"]:
+            problems.append(f"eager SDK imports: {', '.join(result['loaded'])}")
+        if result["import_ms"] > args.max_import_ms:
+            problems.append(f"import > {args.max_import_ms:.0f}ms")
+        if result["rss_mb"] > args.max_rss_mb:
+            problems.append(f"RSS > {args.max_rss_mb:.0f}MB")
+        failed = failed or bool(problems)
+
+        print(f"{module}: import {result['import_ms']:.0f}ms  peak RSS {result['rss_mb']:.1f}MB  "
+              f"{'REGRESSION (' + '; '.join(problems) + ')' if problems else 'OK'}")
+        for name, ms in slowest_modules(module, args.top):
+            print(f"    {name:40s} {ms:8.1f}ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
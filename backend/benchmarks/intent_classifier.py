@@ -0,0 +1,62 @@
+"""
+Local intent classifier benchmark - accuracy and latency against the LLM labels
+Evaluates the saved model on the held-out messages train_intent_classifier.py
+kept out of training (INTENT_HOLDOUT_PATH), or on another labelled file.
+Run: python benchmarks/intent_classifier.py [--threshold 0.8] [--labels other.jsonl]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.services.intent_classifier import IntentClassifier
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threshold", type=float, default=settings.INTENT_CONFIDENCE_THRESHOLD)
+    parser.add_argument("--labels", default=settings.INTENT_HOLDOUT_PATH, help="Labelled messages not used in training")
+    args = parser.parse_args()
+
+    model = IntentClassifier.load(settings.INTENT_MODEL_PATH)
+    with open(args.labels) as f:
+        records = [json.loads(line) for line in f]
+    if not records:
+        print(f"No labelled messages in {args.labels} - train with --holdout > 0 or pass --labels.")
+        sys.exit(1)
+
+    local_us, correct, confident, confident_correct = [], 0, 0, 0
+    for record in records:
+        start = time.perf_counter()
+        intent, confidence = model.predict(record["text"])
+        local_us.append((time.perf_counter() - start) * 1e6)
+        correct += intent == record["label"]
+        if confidence >= args.threshold:
+            confident += 1
+            confident_correct += intent == record["label"]
+
+    llm_ms = [r["llm_ms"] for r in records if r.get("llm_ms")]
+
+    print(f"Messages:                     {len(records)}")
+    print(f"Agreement with LLM (all):     {correct / len(records):.3f}")
+    print(f"Answered locally @ {args.threshold:.2f}:      {confident / len(records):.3f}")
+    if confident:
+        print(f"Agreement when answered:      {confident_correct / confident:.3f}")
+    print(f"Local latency p50 / p99:      {percentile(local_us, 0.5):.1f} / {percentile(local_us, 0.99):.1f} us")
+    if llm_ms:
+        print(f"LLM latency mean / p99:       {statistics.mean(llm_ms):.1f} / {percentile(llm_ms, 0.99):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
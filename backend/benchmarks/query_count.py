@@ -0,0 +1,110 @@
+"""
+SQL statement count regression check for the dashboard list endpoints
+Seeds a temporary SQLite database at two sizes and fails if the number of
+statements per request grows with the number of rows (N+1 regression).
+Run: python benchmarks/query_count.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# A file database, so the sync and async engines see the same rows
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'query_count.db')}"
+os.environ["DEBUG"] = "false"
+os.environ["FOLLOW_UP_RATE_LIMITS"] = ""
+
+from datetime import datetime, timedelta
+from fastapi import Response
+from sqlalchemy import event
+from app.core.database import AsyncSessionLocal, SessionLocal, get_engine, get_async_engine, init_db
+from app.models import Customer, Lead, Booking, FollowUp
+from app.routes import leads as leads_routes, bookings as bookings_routes
+from app.services import follow_up_dispatcher
+from app.services.follow_up_service import get_follow_up_service
+
+statement_count = 0
+
+
+def _count(conn, cursor, statement, parameters, context, executemany):
+    global statement_count
+    statement_count += 1
+
+
+event.listen(get_engine(), "before_cursor_execute", _count)
+event.listen(get_async_engine().sync_engine, "before_cursor_execute", _count)
+
+
+class _NoopChannelFactory:
+    """Keep the follow-up sender offline while counting its queries"""
+
+    @staticmethod
+    async def send_message(**kwargs):
+        return {"success": True}
+
+
+def seed(db, n: int):
+    now = datetime.utcnow()
+    db.query(FollowUp).delete()
+    db.query(Booking).delete()
+    db.query(Lead).delete()
+    db.query(Customer).delete()
+    for i in range(n):
+        customer = Customer(name=f"Customer {i}", email=f"c{i}@example.com", phone=f"+1555000{i:04d}")
+        db.add(customer)
+        db.flush()
+        lead = Lead(customer_id=customer.id, status="new", priority="high")
+        db.add(lead)
+        db.flush()
+        db.add(Booking(customer_id=customer.id, lead_id=lead.id, scheduled_time=now + timedelta(days=1), status="scheduled"))
+        db.add(FollowUp(lead_id=lead.id, message_type="nurture", scheduled_time=now - timedelta(minutes=1), message_content="Hi", sent=False))
+    db.commit()
+
+
+async def measure(n: int) -> dict:
+    global statement_count
+    db = SessionLocal()
+    seed(db, n)
+    db.expire_all()
+
+    counts = {}
+    async with AsyncSessionLocal() as async_db:
+        statement_count = 0
+        await leads_routes.list_leads(Response(), status=None, priority=None, assigned_to=None, limit=100, cursor=None, db=async_db)
+        counts["list_leads"] = statement_count
+
+    db.expire_all()
+    statement_count = 0
+    await bookings_routes.list_bookings(Response(), lead_id=None, customer_id=None, status=None, limit=100, cursor=None, db=db)
+    counts["list_bookings"] = statement_count
+
+    db.expire_all()
+    statement_count = 0
+    await get_follow_up_service().send_pending_follow_ups(db)
+    counts["send_pending_follow_ups"] = statement_count
+
+    db.close()
+    return counts
+
+
+def main():
+    follow_up_dispatcher.ChannelFactory = _NoopChannelFactory
+    init_db()
+
+    small = asyncio.run(measure(5))
+    large = asyncio.run(measure(50))
+
+    failed = False
+    for name in small:
+        status = "OK" if small[name] == large[name] else "REGRESSION"
+        failed = failed or status != "OK"
+        print(f"{name:28s} 5 rows: {small[name]:3d} stmts   50 rows: {large[name]:3d} stmts   {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+SMS bulk-send benchmark - pushes a broadcast through the Twilio SMS engine
+Run against the stub server:
+    uvicorn benchmarks.twilio_stub_server:app --port 8200 &
+    python benchmarks/sms_throughput.py --messages 300 --numbers 10 --mps 1
+Compares achieved messages/sec with the sender pool's allowance
+(numbers x MPS) and reports any 429s the stub had to send back.
+Add --blocking to time the old synchronous-SDK path (one send at a time).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def configure(args):
+    """Engine settings come from the environment; fill in stub defaults"""
+    os.environ.setdefault("TWILIO_API_BASE_URL", args.url)
+    os.environ.setdefault("TWILIO_ACCOUNT_SID", "ACbenchmark")
+    os.environ.setdefault("TWILIO_AUTH_TOKEN", "benchmark-token")
+    os.environ.setdefault("TWILIO_SENDER_NUMBERS", ",".join(f"+1555000{i:04d}" for i in range(args.numbers)))
+    os.environ["TWILIO_MPS_PER_NUMBER"] = str(args.mps)
+    os.environ["SMS_BULK_CONCURRENCY"] = str(args.concurrency)
+
+
+async def run(args):
+    from app.core.http_client import get_http_pool
+    from app.services.sms_engine import get_sms_engine
+
+    engine = get_sms_engine()
+    messages = [{"to": f"+1444{i:07d}", "body": f"Benchmark broadcast #{i}"} for i in range(args.messages)]
+    async with httpx.AsyncClient(base_url=args.url) as stub:
+        await stub.post("/stats/reset")
+
+        if args.blocking:
+            # One request per send, awaited in turn - the throughput ceiling of a blocking client
+            start = time.perf_counter()
+            for message in messages:
+                await engine.send(message["to"], message["body"])
+            result = {"sent": engine.metrics["sent"], "failed": engine.metrics["failed"]}
+            elapsed = time.perf_counter() - start
+        else:
+            result = await engine.send_bulk(messages)
+            elapsed = result["elapsed_seconds"]
+
+        stub_stats = (await stub.get("/stats")).json()
+    await get_http_pool().close()
+
+    print(f"Messages: {args.messages}  senders: {len(engine.numbers)} x {engine.mps:g} MPS "
+          f"(allowance {engine.throughput:g}/s)")
+    print(f"Sent: {result['sent']}  failed: {result['failed']}  elapsed: {elapsed:.2f}s  "
+          f"throughput: {args.messages / elapsed:.1f} msg/s")
+    print(f"Stub accepted: {stub_stats['accepted']}  rejected (429): {stub_stats['rejected']}  "
+          f"engine retries: {engine.metrics['retries']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8200")
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--numbers", type=int, default=10)
+    parser.add_argument("--mps", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--blocking", action="store_true")
+    args = parser.parse_args()
+    configure(args)
+    asyncio.run(run(args))
@@ -0,0 +1,65 @@
+"""
+Local SMTP sink for offline email load tests
+An aiosmtpd server that accepts every message, optionally after a simulated
+relay latency, and counts sessions and messages so connection reuse is
+visible. Needs aiosmtpd (pip install aiosmtpd).
+Run: python benchmarks/smtp_sink.py --port 1025
+Then point the backend at it with SMTP_HOST=localhost SMTP_PORT=1025 SMTP_START_TLS=false
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from aiosmtpd.controller import Controller
+
+SINK_LATENCY_MS = float(os.environ.get("SINK_LATENCY_MS", "5"))  # per DATA command
+SINK_CONNECT_LATENCY_MS = float(os.environ.get("SINK_CONNECT_LATENCY_MS", "20"))  # per session (TLS + AUTH stand-in)
+
+
+class SinkHandler:
+    """Counts sessions, messages and bytes; discards the mail"""
+
+    def __init__(self, latency_ms: float = SINK_LATENCY_MS, connect_latency_ms: float = SINK_CONNECT_LATENCY_MS):
+        self.latency = latency_ms / 1000
+        self.connect_latency = connect_latency_ms / 1000
+        self.reset()
+
+    def reset(self):
+        self.stats = {"sessions": 0, "messages": 0, "recipients": 0, "bytes": 0}
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.stats["sessions"] += 1
+        await asyncio.sleep(self.connect_latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        self.stats["messages"] += 1
+        self.stats["recipients"] += len(envelope.rcpt_tos)
+        self.stats["bytes"] += len(envelope.original_content or envelope.content)
+        return "250 Message accepted for delivery"
+
+
+def start_sink(host: str = "127.0.0.1", port: int = 1025, **kwargs) -> Controller:
+    """Start the sink on a background thread; call .stop() on the result"""
+    controller = Controller(SinkHandler(**kwargs), hostname=host, port=port)
+    controller.start()
+    return controller
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    args = parser.parse_args()
+    controller = start_sink(args.host, args.port)
+    print(f"SMTP sink listening on {args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            print(controller.handler.stats)
+    except KeyboardInterrupt:
+        controller.stop()
@@ -0,0 +1,86 @@
+"""
+Cold-start benchmark - time from a fresh interpreter to a served request
+Each run spawns a new Python process that imports main, enters the app
+lifespan and answers GET /health, with PostgreSQL and MongoDB pointed at an
+unroutable address so slow or missing services are part of the measurement.
+Fails when the median cold start exceeds --target-ms.
+Run: python benchmarks/startup_time.py --runs 5 --target-ms 3000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Runs inside the child process
+_CHILD = r"""
+import asyncio, json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def boot():
+    import httpx
+    async with main.app.router.lifespan_context(main.app):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.get("/health")
+        return started, time.perf_counter()
+
+started, served = asyncio.run(boot())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "lifespan_ms": (started - imported) * 1000,
+    "first_request_ms": (served - started) * 1000,
+    "total_ms": (served - start) * 1000,
+}))
+"""
+
+
+def run_once(env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=3000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        # 10.255.255.1 drops packets, so connects hang until their timeout
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+        MONGODB_URL="mongodb://10.255.255.1:27017",
+        REDIS_URL="redis://127.0.0.1:1",
+        JOB_QUEUE_SQLITE_PATH=os.path.join(workdir, "jobs.db"),
+        AGENT_STORE_PATH=os.path.join(workdir, "agent_data"),
+        DEBUG="false",
+    )
+
+    runs = [run_once(env) for _ in range(args.runs)]
+    for key in ("import_ms", "lifespan_ms", "first_request_ms", "total_ms"):
+        values = [r[key] for r in runs]
+        print(f"{key:18s} median {statistics.median(values):8.1f}   max {max(values):8.1f}")
+
+    median_total = statistics.median(r["total_ms"] for r in runs)
+    status = "OK" if median_total <= args.target_ms else "REGRESSION"
+    print(f"cold start {median_total:.0f}ms (target {args.target_ms:.0f}ms) {status}")
+    sys.exit(0 if status == "OK" else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Local Twilio Messages API stub for offline SMS load tests
+Accepts POST /2010-04-01/Accounts/{sid}/Messages.json like Twilio, enforces
+a per-sender MPS (answering 429 / error 20429 when a sender is pushed past
+it, so rate-limit violations are visible) and posts signed queued -> sent ->
+delivered status callbacks when a StatusCallback is given.
+Run: uvicorn benchmarks.twilio_stub_server:app --port 8200
+Then point the backend at it with TWILIO_API_BASE_URL=http://localhost:8200
+GET /stats returns accepted / rejected totals per sender.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import random
+import time
+import uuid
+from collections import Counter
+from urllib.parse import parse_qsl
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+STUB_LATENCY_MS = float(os.environ.get("STUB_LATENCY_MS", "80"))
+STUB_MPS = float(os.environ.get("STUB_MPS", "1"))  # per sender; 0 disables enforcement
+STUB_CALLBACK_DELAY_MS = float(os.environ.get("STUB_CALLBACK_DELAY_MS", "200"))
+STUB_UNDELIVERED_RATE = float(os.environ.get("STUB_UNDELIVERED_RATE", "0.02"))
+STUB_AUTH_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN", "")
+
+# Twilio tolerates momentary jitter; allow a small burst above the rate
+BURST = 1.5
+
+app = FastAPI(title="Twilio Stub Server")
+
+_buckets = {}
+_stats = {"accepted": 0, "rejected": 0, "callbacks": 0, "callback_errors": 0}
+_per_sender = Counter()
+_callbacks = None
+
+
+def _sign(url: str, params: dict) -> str:
+    payload = url + "".join(f"{key}{params[key]}" for key in sorted(params))
+    return base64.b64encode(hmac.new(STUB_AUTH_TOKEN.encode(), payload.encode(), hashlib.sha1).digest()).decode()
+
+
+def _allow(sender: str) -> bool:
+    if STUB_MPS <= 0:
+        return True
+    now = time.monotonic()
+    tokens, updated = _buckets.get(sender, (BURST, now))
+    tokens = min(BURST, tokens + (now - updated) * STUB_MPS)
+    if tokens < 1:
+        _buckets[sender] = (tokens, now)
+        return False
+    _buckets[sender] = (tokens - 1, now)
+    return True
+
+
+async def _post_statuses(url: str, message: dict):
+    global _callbacks
+    if _callbacks is None:
+        _callbacks = httpx.AsyncClient(timeout=10)
+    final = "undelivered" if random.random() < STUB_UNDELIVERED_RATE else "delivered"
+    for status in ("sent", final):
+        await asyncio.sleep(STUB_CALLBACK_DELAY_MS / 1000)
+        params = {
+            "MessageSid": message["sid"],
+            "MessageStatus": status,
+            "To": message["to"],
+            "From": message["from"],
+            "AccountSid": message["account_sid"],
+        }
+        if status == "undelivered":
+            params["ErrorCode"] = "30003"
+        headers = {"X-Twilio-Signature": _sign(url, params)} if STUB_AUTH_TOKEN else {}
+        try:
+            await _callbacks.post(url, data=params, headers=headers)
+            _stats["callbacks"] += 1
+        except httpx.HTTPError:
+            _stats["callback_errors"] += 1
+
+
+@app.post("/2010-04-01/Accounts/{account_sid}/Messages.json")
+async def create_message(account_sid: str, request: Request):
+    """Mimic message creation after a fixed simulated latency"""
+    form = dict(parse_qsl((await request.body()).decode(), keep_blank_values=True))
+    sender = form.get("From", "")
+    allowed = _allow(sender)
+    await asyncio.sleep(STUB_LATENCY_MS / 1000)
+
+    if not allowed:
+        _stats["rejected"] += 1
+        return JSONResponse(
+            {"code": 20429, "message": "Too Many Requests", "status": 429},
+            status_code=429,
+            headers={"Retry-After": "1"}
+        )
+
+    _stats["accepted"] += 1
+    _per_sender[sender] += 1
+    message = {
+        "sid": f"SM{uuid.uuid4().hex}",
+        "account_sid": account_sid,
+        "to": form.get("To"),
+        "from": sender,
+        "body": form.get("Body"),
+        "status": "queued",
+        "num_segments": "1",
+        "date_created": time.strftime("%a, %d %b %Y %H:%M:%S +0000", time.gmtime()),
+    }
+    if form.get("StatusCallback"):
+        asyncio.create_task(_post_statuses(form["StatusCallback"], message))
+    return JSONResponse(message, status_code=201)
+
+
+@app.get("/stats")
+async def stats():
+    return {**_stats, "per_sender": dict(_per_sender)}
+
+
+@app.post("/stats/reset")
+async def reset_stats():
+    _buckets.clear()
+    _per_sender.clear()
+    for key in _stats:
+        _stats[key] = 0
+    return {"success": True}
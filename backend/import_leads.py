@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Bulk lead import
+Streams a CSV (with header row) or NDJSON file into customers and leads in
+batched transactions and prints the import report.
+Run: python import_leads.py tradeshow.csv
+     python import_leads.py leads.ndjson --batch-size 5000
+     gunzip -c leads.csv.gz | python import_leads.py - --format csv
+"""
+
+import argparse
+import json
+import logging
+import sys
+from app.core.database import init_db
+from app.services.lead_import import FORMATS, import_leads
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="File to import, or - for stdin")
+    parser.add_argument("--format", choices=FORMATS, help="Default: from the file extension (.ndjson/.jsonl, else csv)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows per transaction (default IMPORT_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    init_db()
+    if args.path == "-":
+        sys.stdin.reconfigure(encoding="utf-8-sig", newline="")
+        result = import_leads(sys.stdin, fmt, args.batch_size)
+    else:
+        with open(args.path, encoding="utf-8-sig", errors="replace", newline="") as lines:
+            result = import_leads(lines, fmt, args.batch_size)
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["failed"] == 0 else 1)
@@ -5,21 +5,55 @@ Main application entry point
 """
 
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import messages, leads, crm, bookings, tasks, follow_ups, openclaw, auth, n8n
+from app.routes import messages, leads, crm, bookings, tasks, follow_ups, openclaw, auth, n8n, stats, exports
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import get_database_registry
+from app.core.http_client import get_http_pool
+from app.core.job_queue import get_job_queue
+from app.services.ai_engine import get_ai_engine
+from app.services.agent_store import get_agent_store
+from app.services.follow_up_scheduler import get_follow_up_scheduler
+from app.services.stats_service import get_stats_service
+from app.services.idempotency import get_idempotency_store
+from app.services.sms_engine import get_sms_engine
+from app.services.email_engine import get_email_engine
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup / shutdown of shared resources"""
+    # Engine resolution, table creation and health probes run in the background
+    await get_database_registry().start()
+    await get_http_pool().start()
+    await get_job_queue().start()
+    await get_agent_store().start()
+    await get_follow_up_scheduler().start()
+    await get_stats_service().start()
+    logger.info("Application started successfully")
+    yield
+    await get_stats_service().stop()
+    await get_follow_up_scheduler().stop()
+    await get_job_queue().stop()
+    await get_agent_store().close()
+    await get_idempotency_store().close()
+    await get_email_engine().close()
+    await get_ai_engine().close()
+    await get_http_pool().close()
+    await get_database_registry().close()
+    logger.info("Application shut down")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Lead Automation System",
     description="Automated customer communication and lead qualification",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -29,6 +63,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -41,12 +76,8 @@ app.include_router(tasks.router, prefix="/api/tasks", tags=["Tasks"])
 app.include_router(follow_ups.router, prefix="/api/follow-ups", tags=["Follow-ups"])
 app.include_router(openclaw.router, prefix="/api/agent", tags=["Openclaw Agent"])
 app.include_router(n8n.router, prefix="/api/n8n", tags=["n8n Automation"])
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database tables on startup"""
-    init_db()
-    logger.info("Application started successfully")
+app.include_router(stats.router, prefix="/api/stats", tags=["Stats"])
+app.include_router(exports.router, prefix="/api/exports", tags=["Exports"])
 
 @app.get("/")
 async def root():
@@ -60,12 +91,44 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
+    databases = get_database_registry().status()
     return {
-        "status": "operational",
-        "database": "connected",
+        "status": "operational" if databases["database"]["status"] == "up" else "degraded",
+        "database": databases["database"],
+        "mongodb": databases["mongodb"],
         "ai_service": "ready"
     }
 
+@app.get("/health/jobs")
+async def job_queue_stats():
+    """Background job queue depth (ready, processing, delayed, dead)"""
+    return await get_job_queue().stats()
+
+@app.get("/health/http-pool")
+async def http_pool_stats():
+    """Outbound HTTP pool statistics (in-use, idle, wait time per host)"""
+    return get_http_pool().stats()
+
+@app.get("/health/scheduler")
+async def follow_up_scheduler_stats():
+    """Follow-up scheduler leadership, next due time and dispatch totals"""
+    return get_follow_up_scheduler().stats()
+
+@app.get("/health/sms")
+async def sms_engine_stats():
+    """SMS sender pool throughput, send totals and delivery-status counts"""
+    return get_sms_engine().stats()
+
+@app.get("/health/email")
+async def email_engine_stats():
+    """Email backend, SMTP pool usage and send totals"""
+    return get_email_engine().stats()
+
+@app.get("/health/idempotency")
+async def idempotency_stats():
+    """Webhook deduplication backend and processed / replayed / conflict totals"""
+    return get_idempotency_store().stats()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,122 @@
+"""
+Baseline schema (tables as previously created by Base.metadata.create_all)
+
+Databases created before migrations existed are stamped at this revision
+instead of running it; see app.core.migrations.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+lead_status = sa.Enum("NEW", "CONTACTED", "QUALIFIED", "IN_NEGOTIATION", "WON", "LOST", name="leadstatus")
+message_channel = sa.Enum("SMS", "EMAIL", "CHAT", "FORM", "SOCIAL", name="messagechannel")
+task_status = sa.Enum("OPEN", "IN_PROGRESS", "COMPLETED", "CLOSED", name="taskstatus")
+
+
+def upgrade():
+    op.create_table(
+        "customers",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255)),
+        sa.Column("phone", sa.String(20)),
+        sa.Column("company", sa.String(255)),
+        sa.Column("business_type", sa.String(100)),
+        sa.Column("location", sa.String(255)),
+        sa.Column("status", sa.String(20)),
+        sa.Column("tier", sa.String(20)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_customers_email", "customers", ["email"], unique=True)
+    op.create_index("ix_customers_phone", "customers", ["phone"], unique=True)
+
+    op.create_table(
+        "leads",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("customer_id", sa.String(), sa.ForeignKey("customers.id"), nullable=False),
+        sa.Column("status", lead_status),
+        sa.Column("quality_score", sa.Float()),
+        sa.Column("requirements", sa.Text()),
+        sa.Column("timeline", sa.String(100)),
+        sa.Column("budget", sa.String(100)),
+        sa.Column("priority", sa.String(20)),
+        sa.Column("notes", sa.Text()),
+        sa.Column("assigned_to", sa.String(255)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_leads_status", "leads", ["status"])
+
+    op.create_table(
+        "messages",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("customer_id", sa.String(), sa.ForeignKey("customers.id"), nullable=False),
+        sa.Column("channel", message_channel, nullable=False),
+        sa.Column("direction", sa.String(20)),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("ai_response", sa.Text()),
+        sa.Column("processed", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_messages_channel", "messages", ["channel"])
+
+    op.create_table(
+        "tasks",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("lead_id", sa.String(), sa.ForeignKey("leads.id"), nullable=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("status", task_status),
+        sa.Column("assigned_to", sa.String(255)),
+        sa.Column("task_type", sa.String(50)),
+        sa.Column("priority", sa.String(20)),
+        sa.Column("due_date", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_tasks_status", "tasks", ["status"])
+
+    op.create_table(
+        "bookings",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("lead_id", sa.String(), sa.ForeignKey("leads.id"), nullable=True),
+        sa.Column("customer_id", sa.String(), sa.ForeignKey("customers.id"), nullable=True),
+        sa.Column("scheduled_time", sa.DateTime(), nullable=False),
+        sa.Column("duration_minutes", sa.Integer()),
+        sa.Column("meeting_type", sa.String(100)),
+        sa.Column("meeting_link", sa.String(255)),
+        sa.Column("status", sa.String(20)),
+        sa.Column("notes", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+
+    op.create_table(
+        "follow_ups",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("lead_id", sa.String(), sa.ForeignKey("leads.id"), nullable=False),
+        sa.Column("message_type", sa.String(50)),
+        sa.Column("scheduled_time", sa.DateTime(), nullable=False),
+        sa.Column("message_content", sa.Text()),
+        sa.Column("sent", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("sent_at", sa.DateTime()),
+    )
+
+
+def downgrade():
+    for table in ("follow_ups", "bookings", "tasks", "messages", "leads", "customers"):
+        op.drop_table(table)
+    bind = op.get_bind()
+    for enum in (task_status, message_channel, lead_status):
+        enum.drop(bind, checkfirst=True)
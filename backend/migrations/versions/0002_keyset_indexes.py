@@ -0,0 +1,37 @@
+"""
+Keyset pagination indexes
+
+These were added to the models while tables were still created with
+create_all, so databases stamped at 0001 may already have them.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_customers_created_at_id", "customers", ["created_at", "id"]),
+    ("ix_leads_created_at_id", "leads", ["created_at", "id"]),
+    ("ix_messages_created_at_id", "messages", ["created_at", "id"]),
+    ("ix_tasks_created_at_id", "tasks", ["created_at", "id"]),
+    ("ix_bookings_scheduled_time_id", "bookings", ["scheduled_time", "id"]),
+    ("ix_follow_ups_scheduled_time_id", "follow_ups", ["scheduled_time", "id"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,66 @@
+"""
+Secondary indexes for hot filter/join columns
+
+- leads: customer joins, and status / priority / assignee list filters in
+  created_at order (the status composite replaces ix_leads_status)
+- messages: per-customer history, newest first
+- tasks: status / assignee lists (the status composite replaces ix_tasks_status)
+- bookings: per-customer lists in schedule order
+- follow_ups: partial index over unsent rows for the dispatcher claim and
+  scheduler window, plus (lead_id, message_type) for enrollment checks
+
+Booking.scheduled_time and Lead.created_at are already led by the 0002
+keyset indexes.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_leads_customer_id", "leads", ["customer_id"]),
+    ("ix_leads_status_created_at_id", "leads", ["status", "created_at", "id"]),
+    ("ix_leads_priority_created_at_id", "leads", ["priority", "created_at", "id"]),
+    ("ix_leads_assigned_to_created_at_id", "leads", ["assigned_to", "created_at", "id"]),
+    ("ix_messages_customer_id_created_at_id", "messages", ["customer_id", "created_at", "id"]),
+    ("ix_tasks_status_created_at_id", "tasks", ["status", "created_at", "id"]),
+    ("ix_tasks_assigned_to_created_at_id", "tasks", ["assigned_to", "created_at", "id"]),
+    ("ix_bookings_customer_id_scheduled_time_id", "bookings", ["customer_id", "scheduled_time", "id"]),
+    ("ix_follow_ups_lead_id_message_type", "follow_ups", ["lead_id", "message_type"]),
+]
+
+# Single-column indexes made redundant by a composite with the same prefix
+SUPERSEDED = [
+    ("ix_leads_status", "leads", ["status"]),
+    ("ix_tasks_status", "tasks", ["status"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+    op.create_index(
+        "ix_follow_ups_unsent_scheduled_time_id", "follow_ups", ["scheduled_time", "id"],
+        postgresql_where=sa.text("sent = false"),
+        sqlite_where=sa.text("sent = 0"),
+        if_not_exists=True
+    )
+    for name, table, _ in SUPERSEDED:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+
+def downgrade():
+    for name, table, columns in SUPERSEDED:
+        op.create_index(name, table, columns)
+    op.drop_index("ix_follow_ups_unsent_scheduled_time_id", table_name="follow_ups")
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,93 @@
+"""
+Lead read model (lead_listings, lead_counts)
+
+Backfilled from leads and customers; kept current by
+app.services.lead_read_model.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+STATUSES = ("NEW", "CONTACTED", "QUALIFIED", "IN_NEGOTIATION", "WON", "LOST")
+
+# Reuses the leadstatus type created in 0001 on PostgreSQL
+lead_status = sa.Enum(*STATUSES, name="leadstatus").with_variant(
+    postgresql.ENUM(*STATUSES, name="leadstatus", create_type=False), "postgresql"
+)
+
+INDEXES = [
+    ("ix_lead_listings_created_at_lead_id", ["created_at", "lead_id"]),
+    ("ix_lead_listings_status_created_at_lead_id", ["status", "created_at", "lead_id"]),
+    ("ix_lead_listings_priority_created_at_lead_id", ["priority", "created_at", "lead_id"]),
+    ("ix_lead_listings_assigned_to_created_at_lead_id", ["assigned_to", "created_at", "lead_id"]),
+    ("ix_lead_listings_customer_id", ["customer_id"]),
+]
+
+
+def upgrade():
+    op.create_table(
+        "lead_listings",
+        sa.Column("lead_id", sa.String(), primary_key=True),
+        sa.Column("customer_id", sa.String(), nullable=False),
+        sa.Column("status", lead_status),
+        sa.Column("quality_score", sa.Float()),
+        sa.Column("requirements", sa.Text()),
+        sa.Column("timeline", sa.String(100)),
+        sa.Column("budget", sa.String(100)),
+        sa.Column("priority", sa.String(20)),
+        sa.Column("assigned_to", sa.String(255)),
+        sa.Column("name", sa.String(255)),
+        sa.Column("company", sa.String(255)),
+        sa.Column("email", sa.String(255)),
+        sa.Column("phone", sa.String(20)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    for name, columns in INDEXES:
+        op.create_index(name, "lead_listings", columns)
+
+    op.create_table(
+        "lead_counts",
+        sa.Column("dimension", sa.String(20), primary_key=True),
+        sa.Column("value", sa.String(50), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+
+    op.execute("""
+        INSERT INTO lead_listings (
+            lead_id, customer_id, status, quality_score, requirements, timeline, budget,
+            priority, assigned_to, name, company, email, phone, created_at, updated_at
+        )
+        SELECT l.id, l.customer_id, l.status, l.quality_score, l.requirements, l.timeline, l.budget,
+               l.priority, l.assigned_to, c.name, c.company, c.email, c.phone, l.created_at, l.updated_at
+        FROM leads l LEFT JOIN customers c ON c.id = l.customer_id
+    """)
+    # Status values are stored by enum name; counts are keyed by enum value
+    op.execute("""
+        INSERT INTO lead_counts (dimension, value, count)
+        SELECT 'status', COALESCE(LOWER(CAST(status AS VARCHAR)), 'none'), COUNT(*)
+        FROM leads GROUP BY COALESCE(LOWER(CAST(status AS VARCHAR)), 'none')
+    """)
+    op.execute("""
+        INSERT INTO lead_counts (dimension, value, count)
+        SELECT 'priority', COALESCE(NULLIF(priority, ''), 'none'), COUNT(*)
+        FROM leads GROUP BY COALESCE(NULLIF(priority, ''), 'none')
+    """)
+
+
+def downgrade():
+    op.drop_table("lead_counts")
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="lead_listings")
+    op.drop_table("lead_listings")
@@ -0,0 +1,33 @@
+"""
+Incremental counters for /api/stats
+
+Current-state counters are filled by the stats service's first reconcile
+after startup; event series (sends, tokens) start from this revision.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "stat_counters",
+        sa.Column("metric", sa.String(50), primary_key=True),
+        sa.Column("dimension", sa.String(50), primary_key=True),
+        sa.Column("bucket", sa.DateTime(), primary_key=True),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("stat_counters")
@@ -0,0 +1,28 @@
+"""
+Normalized email / phone indexes for matching imported contacts
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+PHONE_KEY = "replace(replace(replace(replace(replace(phone, ' ', ''), '-', ''), '(', ''), ')', ''), '.', '')"
+
+
+def upgrade():
+    op.create_index("ix_customers_email_key", "customers", [sa.text("lower(trim(email))")])
+    op.create_index("ix_customers_phone_key", "customers", [sa.text(PHONE_KEY)])
+
+
+def downgrade():
+    op.drop_index("ix_customers_phone_key", table_name="customers")
+    op.drop_index("ix_customers_email_key", table_name="customers")
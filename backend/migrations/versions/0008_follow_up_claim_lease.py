@@ -0,0 +1,25 @@
+"""
+Dispatch lease on follow-ups (claimed rows are sent outside the claim transaction)
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("follow_ups", sa.Column("claimed_until", sa.DateTime()))
+
+
+def downgrade():
+    with op.batch_alter_table("follow_ups") as batch_op:
+        batch_op.drop_column("claimed_until")
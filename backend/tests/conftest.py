@@ -0,0 +1,54 @@
+"""
+Test configuration
+Points the app at a scratch SQLite database and at closed ports for Redis and
+MongoDB, so the suite runs offline. The variables are set before the first
+app import because settings are read once per process.
+Run from backend/: python -m pytest -q
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_scratch = tempfile.mkdtemp(prefix="ai-automation-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_scratch, 'test.db')}",
+    "MONGODB_URL": "mongodb://127.0.0.1:1",
+    "REDIS_URL": "redis://127.0.0.1:1",
+    "IDEMPOTENCY_BACKEND": "database",
+    "JOB_QUEUE_SQLITE_PATH": os.path.join(_scratch, "jobs.db"),
+    "AGENT_STORE_PATH": os.path.join(_scratch, "agent_data"),
+    "FOLLOW_UP_SCHEDULER_ENABLED": "false",
+    "JOB_WORKERS": "0",
+    "DEBUG": "false",
+})
+
+import pytest
+
+from app.core.database import get_async_engine, init_db
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Migrate the scratch database once for the whole run"""
+    init_db()
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine on a fresh loop; async engine connections never outlive their loop"""
+    def runner(coro):
+        async def wrapper():
+            try:
+                # Connect once before the test runs: concurrent first connects on a
+                # fresh async pool block each other in dialect initialization
+                async with get_async_engine().connect():
+                    pass
+                return await coro
+            finally:
+                await get_async_engine().dispose()
+        return asyncio.run(wrapper())
+    return runner
@@ -0,0 +1,91 @@
+"""Webhook deduplication on the database backend"""
+
+import asyncio
+
+import pytest
+
+from app.services.idempotency import IdempotencyConflict, IdempotencyStore, request_key
+
+
+class Handler:
+    def __init__(self, fail=False, delay=0.0):
+        self.calls = 0
+        self.fail = fail
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("delivery failed")
+        return {"success": True, "call": self.calls}
+
+
+def test_request_key_prefers_supplied_keys():
+    assert request_key({"Idempotency-Key": "abc"}, {"x": 1}) == ("abc", True)
+    assert request_key({}, {"x": 1}, body_key="msg-1") == ("msg-1", True)
+    key, supplied = request_key({}, {"b": 2, "a": 1})
+    assert not supplied and key == request_key({}, {"a": 1, "b": 2})[0]
+    assert request_key({}, {"content": "yes"}, content_hash=False) == (None, False)
+
+
+def test_duplicate_replays_stored_response(run):
+    store = IdempotencyStore()
+    handler = Handler()
+
+    async def scenario():
+        first = await store.run("tests.replay", "key-1", handler, status_code=202)
+        second = await store.run("tests.replay", "key-1", handler, status_code=202)
+        other_scope = await store.run("tests.other", "key-1", handler)
+        return first, second, other_scope
+
+    first, second, other_scope = run(scenario())
+    assert first == ({"success": True, "call": 1}, 202, False)
+    assert second == ({"success": True, "call": 1}, 202, True)
+    assert other_scope[2] is False
+    assert handler.calls == 2
+
+
+def test_failed_delivery_is_not_stored(run):
+    store = IdempotencyStore()
+    failing = Handler(fail=True)
+    handler = Handler()
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.run("tests.failure", "key-2", failing)
+        return await store.run("tests.failure", "key-2", handler)
+
+    body, _, replayed = run(scenario())
+    assert not replayed and handler.calls == 1 and body["call"] == 1
+
+
+def test_concurrent_duplicate_waits_for_the_original(run):
+    store = IdempotencyStore()
+    handler = Handler(delay=0.3)
+
+    async def scenario():
+        return await asyncio.gather(
+            store.run("tests.concurrent", "key-3", handler),
+            store.run("tests.concurrent", "key-3", handler),
+        )
+
+    results = run(scenario())
+    assert handler.calls == 1
+    assert sorted(replayed for _, _, replayed in results) == [False, True]
+
+
+def test_duplicate_past_the_wait_is_a_conflict(run):
+    store = IdempotencyStore()
+    store.wait = 0.1
+    handler = Handler(delay=0.5)
+
+    async def scenario():
+        original = asyncio.create_task(store.run("tests.conflict", "key-4", handler))
+        await asyncio.sleep(0.05)
+        with pytest.raises(IdempotencyConflict):
+            await store.run("tests.conflict", "key-4", handler)
+        return await original
+
+    body, _, replayed = run(scenario())
+    assert not replayed and handler.calls == 1
@@ -0,0 +1,84 @@
+"""Bulk lead import: upserts, contact matching and row-level errors"""
+
+import json
+
+from app.core.database import SessionLocal
+from app.models import Customer, Lead
+from app.services.lead_import import import_leads, normalize_phone
+
+
+def csv_lines(*rows):
+    return ["name,email,phone,company,status"] + [",".join(row) for row in rows]
+
+
+def customer_leads(email):
+    db = SessionLocal()
+    try:
+        customers = db.query(Customer).filter(Customer.email == email).all()
+        leads = db.query(Lead).filter(Lead.customer_id.in_([c.id for c in customers])).all()
+        return customers, leads
+    finally:
+        db.close()
+
+
+def test_reimport_updates_instead_of_duplicating():
+    first = import_leads(csv_lines(("Ann", "ann@import.test", "", "Acme", "new")))
+    assert first["customers_created"] == 1 and first["leads_created"] == 1
+
+    second = import_leads(csv_lines(("Ann B", "  ANN@Import.test ", "", "Acme Ltd", "qualified")))
+    assert second["imported"] == 1
+    assert second["customers_created"] == 0 and second["customers_updated"] == 1
+    assert second["leads_created"] == 0 and second["leads_updated"] == 1
+
+    customers, leads = customer_leads("ann@import.test")
+    assert len(customers) == 1 and customers[0].name == "Ann B" and customers[0].company == "Acme Ltd"
+    assert len(leads) == 1 and leads[0].status.value == "qualified"
+
+
+def test_matches_contacts_stored_unnormalized():
+    db = SessionLocal()
+    try:
+        db.add(Customer(name="Legacy", email=" Legacy@Import.TEST", phone="+1 (555) 010-7001"))
+        db.add(Customer(name="Caller", phone="+1 555-010-7002"))
+        db.commit()
+    finally:
+        db.close()
+
+    result = import_leads(csv_lines(
+        ("Legacy", "legacy@import.test", "", "", ""),
+        ("Caller", "", "+15550107002", "", ""),
+    ))
+    assert result["imported"] == 2
+    assert result["customers_created"] == 0 and result["customers_updated"] == 2
+
+
+def test_rejects_row_whose_email_and_phone_belong_to_different_customers():
+    import_leads(csv_lines(
+        ("Email owner", "owner@import.test", "", "", ""),
+        ("Phone owner", "", "+15550107003", "", ""),
+    ))
+
+    result = import_leads(csv_lines(
+        ("Someone", "fresh@import.test", "", "", ""),
+        ("Mixed", "owner@import.test", "+15550107003", "", ""),
+        ("Other", "other@import.test", "", "", ""),
+        ("Owner again", "owner@import.test", "", "", ""),
+    ))
+    assert result["imported"] == 3 and result["failed"] == 1
+    assert result["errors"][0]["row"] == 3
+
+
+def test_reports_invalid_rows_and_imports_the_rest():
+    lines = [
+        json.dumps({"name": "No contact"}),
+        json.dumps({"email": "not-an-email"}),
+        json.dumps({"email": "bad-status@import.test", "status": "maybe"}),
+        "{broken",
+        json.dumps({"full_name": "Aliased", "email_address": "alias@import.test", "mobile": "+1 555 010 7004"}),
+    ]
+    result = import_leads(lines, fmt="ndjson")
+    assert result["rows"] == 5 and result["imported"] == 1 and result["failed"] == 4
+    assert [error["row"] for error in result["errors"]] == [1, 2, 3, 4]
+
+    customers, _ = customer_leads("alias@import.test")
+    assert customers[0].name == "Aliased" and customers[0].phone == normalize_phone("+1 555 010 7004")
@@ -0,0 +1,103 @@
+"""lead_listings / lead_counts follow every ORM write and can be rebuilt"""
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal, SessionLocal, get_engine
+from app.models import Customer, Lead, LeadCount, LeadListing, LeadStatus
+from app.services.lead_read_model import get_lead_summary, rebuild
+
+
+def counts():
+    db = SessionLocal()
+    try:
+        return {(row.dimension, row.value): row.count for row in db.query(LeadCount)}
+    finally:
+        db.close()
+
+
+def listing(lead_id):
+    db = SessionLocal()
+    try:
+        return db.get(LeadListing, lead_id)
+    finally:
+        db.close()
+
+
+def create_lead(email, **fields):
+    db = SessionLocal()
+    try:
+        customer = Customer(name="Reader", email=email, company="Before")
+        db.add(customer)
+        db.flush()
+        lead = Lead(customer_id=customer.id, **fields)
+        db.add(lead)
+        db.commit()
+        return customer.id, lead.id
+    finally:
+        db.close()
+
+
+def test_listing_follows_lead_and_customer_writes():
+    before = counts()
+    customer_id, lead_id = create_lead("reader1@read-model.test", status=LeadStatus.NEW, priority="high")
+
+    row = listing(lead_id)
+    assert row.name == "Reader" and row.company == "Before" and row.status == LeadStatus.NEW
+    after_insert = counts()
+    assert after_insert[("status", "new")] == before.get(("status", "new"), 0) + 1
+    assert after_insert[("priority", "high")] == before.get(("priority", "high"), 0) + 1
+
+    db = SessionLocal()
+    try:
+        db.get(Customer, customer_id).company = "After"
+        db.get(Lead, lead_id).status = LeadStatus.QUALIFIED
+        db.commit()
+    finally:
+        db.close()
+    row = listing(lead_id)
+    assert row.company == "After" and row.status == LeadStatus.QUALIFIED
+    after_update = counts()
+    assert after_update[("status", "new")] == before.get(("status", "new"), 0)
+    assert after_update[("status", "qualified")] == after_insert.get(("status", "qualified"), 0) + 1
+
+    db = SessionLocal()
+    try:
+        db.delete(db.get(Lead, lead_id))
+        db.commit()
+    finally:
+        db.close()
+    assert listing(lead_id) is None
+    assert counts().get(("priority", "high"), 0) == before.get(("priority", "high"), 0)
+
+
+def test_summary_matches_the_leads_table(run):
+    create_lead("reader2@read-model.test", status=LeadStatus.CONTACTED, priority="low")
+
+    async def summary():
+        async with AsyncSessionLocal() as db:
+            return await get_lead_summary(db, recent=3)
+
+    result = run(summary())
+    db = SessionLocal()
+    try:
+        assert result["total"] == db.query(Lead).count()
+    finally:
+        db.close()
+    assert result["recent"][0]["email"] == "reader2@read-model.test"
+
+
+def test_rebuild_restores_drifted_read_model():
+    _, lead_id = create_lead("reader3@read-model.test", status=LeadStatus.NEW)
+    expected = counts()
+    with get_engine().begin() as conn:
+        conn.execute(LeadListing.__table__.delete())
+        conn.execute(LeadCount.__table__.update().values(count=0))
+
+    with get_engine().begin() as conn:
+        result = rebuild(conn)
+    assert result["success"]
+    assert listing(lead_id) is not None
+    assert {key: value for key, value in counts().items() if value} == \
+        {key: value for key, value in expected.items() if value}
+    with get_engine().connect() as conn:
+        assert conn.execute(select(LeadListing.lead_id)).first() is not None
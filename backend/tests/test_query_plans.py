@@ -0,0 +1,22 @@
+"""Hot filter / sort queries must be served by an index (see benchmarks/explain_hot_queries.py)"""
+
+import pytest
+from sqlalchemy import text
+
+from app.core.database import get_engine
+from benchmarks.explain_hot_queries import explain, hot_queries, seed
+
+
+@pytest.fixture(scope="module")
+def analyzed():
+    seed(2000)
+    with get_engine().connect() as conn:
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+
+
+@pytest.mark.parametrize("name", list(hot_queries()))
+def test_hot_query_uses_an_index(analyzed, name):
+    with get_engine().connect() as conn:
+        plan, problems = explain(conn, hot_queries()[name])
+    assert not problems, f"{name}: {'; '.join(plan)}"
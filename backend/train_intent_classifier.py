@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Train the local intent classifier from stored inbound messages
+Messages are labelled once by the LLM (labels are cached in INTENT_LABELS_PATH
+so re-runs only label new messages; failed LLM calls are skipped and retried
+on the next run), then the model is fit on all but the holdout fraction and
+saved to INTENT_MODEL_PATH. The held-out messages are written to
+INTENT_HOLDOUT_PATH for benchmarks/intent_classifier.py.
+Run: python train_intent_classifier.py [--limit 20000] [--holdout 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Message
+from app.services.ai_engine import get_ai_engine
+from app.services.ai_service import get_ai_service
+from app.services.intent_classifier import IntentClassifier, INTENTS
+
+
+def load_labels(path: str) -> dict:
+    labels = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                record = json.loads(line)
+                labels[record["message_id"]] = record
+    return labels
+
+
+def clean_label(raw: str) -> str:
+    label = re.sub(r"[^A-Z]", "", raw.upper())
+    return label if label in INTENTS else "OTHER"
+
+
+async def label_messages(messages, labels: dict, path: str):
+    """Label unseen messages with the LLM classifier and append them to the label file"""
+    ai_service = get_ai_service()
+    todo = [(message_id, content) for message_id, content in messages if message_id not in labels]
+    print(f"Labelling {len(todo)} new messages with {settings.AI_CHEAP_MODEL}...")
+
+    async def label_one(message_id, content):
+        start = time.perf_counter()
+        try:
+            label = clean_label(await ai_service.classify_intent_llm(content, raise_errors=True))
+        except Exception as e:
+            # Not cached, so the message is labelled again on the next run
+            print(f"  skipping {message_id}: {e}")
+            return None
+        return {
+            "message_id": message_id,
+            "text": content,
+            "label": label,
+            "llm_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    labelled = 0
+    with open(path, "a") as f:
+        for start in range(0, len(todo), 200):
+            records = await asyncio.gather(*[label_one(*item) for item in todo[start:start + 200]])
+            for record in filter(None, records):
+                labels[record["message_id"]] = record
+                f.write(json.dumps(record) + "\n")
+                labelled += 1
+            print(f"  labelled {labelled}/{len(todo)} (processed {min(start + 200, len(todo))})")
+
+    await get_ai_engine().close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=20000, help="Most recent inbound messages to use")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for evaluation")
+    parser.add_argument("--epochs", type=int, default=200)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    messages = db.query(Message.id, Message.content)\
+        .filter(Message.direction == "inbound")\
+        .order_by(Message.created_at.desc())\
+        .limit(args.limit)\
+        .all()
+    db.close()
+
+    labels = load_labels(settings.INTENT_LABELS_PATH)
+    asyncio.run(label_messages(messages, labels, settings.INTENT_LABELS_PATH))
+
+    records = [labels[message_id] for message_id, _ in messages if message_id in labels]
+    if len(records) < 20:
+        print(f"Only {len(records)} labelled messages - need at least 20 to train.")
+        sys.exit(1)
+
+    random.seed(42)
+    random.shuffle(records)
+    split = int(len(records) * (1 - args.holdout))
+    train, test = records[:split], records[split:]
+
+    # The saved model never sees the holdout, so the benchmark measures it out of sample
+    model = IntentClassifier().fit([r["text"] for r in train], [r["label"] for r in train], epochs=args.epochs)
+    if test:
+        correct = sum(model.predict(r["text"])[0] == r["label"] for r in test)
+        print(f"Holdout accuracy vs LLM labels: {correct / len(test):.3f} ({len(test)} messages)")
+    os.makedirs(os.path.dirname(os.path.abspath(settings.INTENT_HOLDOUT_PATH)), exist_ok=True)
+    with open(settings.INTENT_HOLDOUT_PATH, "w") as f:
+        f.writelines(json.dumps(record) + "\n" for record in test)
+
+    model.save(settings.INTENT_MODEL_PATH)
+    print(f"Saved intent classifier to {settings.INTENT_MODEL_PATH} ({len(train)} messages, {len(test)} held out)")
+
+
+if __name__ == "__main__":
+    main()
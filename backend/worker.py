@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Background job worker entry point
+Runs the job queue workers without the HTTP API.
+Run: python worker.py --concurrency 4   (set JOB_WORKERS=0 on the API processes)
+"""
+
+import argparse
+import asyncio
+import logging
+from app.core.database import init_db
+from app.core.job_queue import get_job_queue
+from app.core.http_client import get_http_pool
+from app.services.ai_engine import get_ai_engine
+from app.services.email_engine import get_email_engine
+from app.services.stats_service import get_stats_service
+import app.services.message_processing  # noqa: F401  (registers job handlers)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run(concurrency: int):
+    init_db()
+    await get_http_pool().start()
+    job_queue = get_job_queue()
+    await job_queue.start(workers=concurrency)
+    # Flushes AI token usage from job handlers into the stats counters
+    await get_stats_service().start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await job_queue.stop()
+        await get_stats_service().stop()
+        await get_email_engine().close()
+        await get_ai_engine().close()
+        await get_http_pool().close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.concurrency))
+    except KeyboardInterrupt:
+        logger.info("Worker stopped")
@@ -49,29 +49,26 @@ function Dashboard() {
       setLoading(true);
 
       // Fetch real data from backend API
-      const [leads, tasks, bookings] = await Promise.allSettled([
-        api.listLeads(),
-        api.listTasks(),
-        api.listBookings(),
+      const [summary, counters] = await Promise.allSettled([
+        api.getLeadSummary(5),
+        api.getStats(7),
       ]);
 
-      const leadsData = leads.status === 'fulfilled' ? leads.value : [];
-      const tasksData = tasks.status === 'fulfilled' ? tasks.value : [];
-      const bookingsData = bookings.status === 'fulfilled' ? bookings.value : [];
+      const summaryData = summary.status === 'fulfilled' ? summary.value : { total: 0, by_status: {}, recent: [] };
+      const statsData = counters.status === 'fulfilled' ? counters.value : { tasks: { by_status: {} }, bookings: { upcoming_by_day: {} } };
 
-      const qualifiedCount = Array.isArray(leadsData) ? leadsData.filter(l => l.status === 'qualified').length : 0;
-      const pendingCount = Array.isArray(tasksData) ? tasksData.filter(t => t.status === 'open' || t.status === 'pending').length : 0;
-      const upcomingCount = Array.isArray(bookingsData) ? bookingsData.filter(b => b.status === 'scheduled' || b.status === 'confirmed').length : 0;
+      const pendingCount = statsData.tasks.by_status.open || 0;
+      const upcomingCount = Object.values(statsData.bookings.upcoming_by_day || {}).reduce((sum, n) => sum + n, 0);
 
       setStats({
-        totalLeads: Array.isArray(leadsData) ? leadsData.length : 0,
-        qualifiedLeads: qualifiedCount,
+        totalLeads: summaryData.total || 0,
+        qualifiedLeads: summaryData.by_status?.qualified || 0,
         pendingTasks: pendingCount,
         upcomingBookings: upcomingCount,
       });
 
       // Show last 5 leads as recent activity
-      const recentLeads = (Array.isArray(leadsData) ? leadsData : []).slice(0, 5).map((lead, i) => ({
+      const recentLeads = (summaryData.recent || []).map((lead, i) => ({
         id: lead.id || i + 1,
         customer: { name: lead.name || lead.customer?.name || 'Unknown', company: lead.company || lead.customer?.company || '' },
         status: lead.status || 'new',
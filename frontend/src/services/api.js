@@ -24,6 +24,23 @@ class APIService {
     return this.get('/leads/', filters);
   }
 
+  async listLeadsPage(filters = {}, cursor = null) {
+    return this.getPage('/leads/', filters, cursor);
+  }
+
+  async getLeadSummary(recent = 5) {
+    return this.get('/leads/summary', { recent });
+  }
+
+  // Stats APIs
+  async getStats(upcomingDays = 7) {
+    return this.get('/stats/', { upcoming_days: upcomingDays });
+  }
+
+  async getStatsSeries(metric, interval = 'day', params = {}) {
+    return this.get('/stats/series', { metric, interval, ...params });
+  }
+
   async getLead(leadId) {
     return this.get(`/leads/${leadId}`);
   }
@@ -50,6 +67,10 @@ class APIService {
     return this.get('/crm/customers', filters);
   }
 
+  async listCustomersPage(filters = {}, cursor = null) {
+    return this.getPage('/crm/customers', filters, cursor);
+  }
+
   async getCustomer(customerId) {
     return this.get(`/crm/customers/${customerId}`);
   }
@@ -151,6 +172,23 @@ class APIService {
     return this._handleResponse(response);
   }
 
+  // Keyset-paginated list: returns { items, nextCursor } (nextCursor is null on the last page)
+  async getPage(endpoint, params = {}, cursor = null) {
+    const url = new URL(`${API_BASE_URL}${endpoint}`);
+    Object.keys(params).forEach(key => url.searchParams.append(key, params[key]));
+    if (cursor) {
+      url.searchParams.append('cursor', cursor);
+    }
+
+    const response = await fetch(url, {
+      method: 'GET',
+      headers: this._getHeaders()
+    });
+
+    const items = await this._handleResponse(response);
+    return { items, nextCursor: response.headers.get('X-Next-Cursor') || null };
+  }
+
   async post(endpoint, data) {
     const response = await fetch(`${API_BASE_URL}${endpoint}`, {
       method: 'POST',